@@ -1 +1,7 @@
-from api.main import app
+def __getattr__(name):
+    # Importing api.main loads FastAPI and every router, so submodules such as
+    # api.settings stay cheap to import until the app itself is needed.
+    if name == "app":
+        from api.main import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,75 @@
+"""
+Micro-benchmark of the websocket message codec.
+
+Compares the per-frame cost of the original pydantic path (json.loads, model
+construction, base64, model_dump and json.dumps) with `api.websocket.codec`
+for inbound audio frames and outbound agent audio frames, on a single core.
+
+Usage:
+    python -m api.benchmarks.codec [--frames 20000] [--chunk-ms 40]
+"""
+import argparse
+import base64
+import json
+import os
+import time
+
+from api.websocket import codec
+from api.websocket.messaging import AgentAudioMessage, AudioMessage
+
+
+def _legacy_decode(frame: str) -> bytes:
+    message_data = json.loads(frame)
+    message = AudioMessage(**message_data)
+    return base64.b64decode(message.data)
+
+
+def _legacy_encode(data: bytes) -> str:
+    message = AgentAudioMessage(data=base64.b64encode(data).decode("ascii"))
+    return json.dumps(message.model_dump(), separators=(",", ":"), ensure_ascii=False)
+
+
+def _fast_decode(frame: str) -> bytes:
+    return codec.decode_audio_data(codec.decode_client_message(frame))
+
+
+def _frames_per_second(func, arg, frames: int) -> float:
+    start = time.perf_counter()
+    for _ in range(frames):
+        func(arg)
+    return frames / (time.perf_counter() - start)
+
+
+def run(frames: int = 20000, chunk_ms: int = 40) -> dict:
+    """Runs the benchmark and returns frames per second for each path."""
+    pcm = os.urandom(16000 * 2 * chunk_ms // 1000)
+    inbound = json.dumps({"type": "audio", "mime_type": "audio/pcm", "data": base64.b64encode(pcm).decode("ascii")})
+    assert _legacy_decode(inbound) == _fast_decode(inbound)
+    assert json.loads(_legacy_encode(pcm)) == json.loads(codec.encode_agent_audio(pcm))
+
+    return {
+        "decode_legacy": _frames_per_second(_legacy_decode, inbound, frames),
+        "decode_codec": _frames_per_second(_fast_decode, inbound, frames),
+        "decode_binary": _frames_per_second(codec.decode_binary_frame, codec.encode_audio_frame(pcm), frames),
+        "encode_legacy": _frames_per_second(_legacy_encode, pcm, frames),
+        "encode_codec": _frames_per_second(codec.encode_agent_audio, pcm, frames),
+        "encode_binary": _frames_per_second(codec.encode_audio_frame, pcm, frames),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--chunk-ms", type=int, default=40)
+    args = parser.parse_args()
+
+    results = run(args.frames, args.chunk_ms)
+    print(f"orjson: {'yes' if codec.orjson else 'no'}, {args.chunk_ms} ms PCM frames")
+    for name, fps in results.items():
+        print(f"{name:>14}: {fps:>12,.0f} frames/s")
+    print(f"decode speed-up: {results['decode_codec'] / results['decode_legacy']:.2f}x")
+    print(f"encode speed-up: {results['encode_codec'] / results['encode_legacy']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
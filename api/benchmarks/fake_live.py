@@ -0,0 +1,98 @@
+"""
+In-process stand-in for the Gemini Live model.
+
+`FakeLiveModel.install()` replaces `Runner.run_live` so the real FastAPI app,
+websocket pipeline and session handling can be exercised offline. The fake
+answers every utterance (a configurable amount of realtime audio) and every
+text message with an input transcription, then streams 24 kHz PCM audio at
+real-time pace with partial output transcriptions, and finishes the turn.
+"""
+import asyncio
+from contextlib import contextmanager
+from dataclasses import dataclass
+from unittest.mock import patch
+
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.genai.types import Blob, Content, Part
+
+OUTPUT_SAMPLE_RATE = 24000
+INPUT_BYTES_PER_SECOND = 16000 * 2
+
+
+@dataclass
+class FakeLiveModel:
+    """
+    Args:
+        utterance_ms (int): Realtime audio that makes up one user utterance.
+        response_delay_ms (int): Delay between the end of an utterance and the first reply audio.
+        reply_ms (int): Duration of the audio reply.
+        chunk_ms (int): Duration of each audio event.
+        transcript_every (int): Emit a partial output transcription every N audio chunks.
+    """
+    utterance_ms: int = 1000
+    response_delay_ms: int = 300
+    reply_ms: int = 1000
+    chunk_ms: int = 40
+    transcript_every: int = 5
+
+    def _event(self, role: str, part: Part, **kwargs) -> Event:
+        return Event(author="Vox", content=Content(role=role, parts=[part]), **kwargs)
+
+    async def _reply(self, events: asyncio.Queue, text: str):
+        await events.put(self._event("user", Part(text=text)))
+        await asyncio.sleep(self.response_delay_ms / 1000)
+        chunk = bytes(OUTPUT_SAMPLE_RATE * 2 * self.chunk_ms // 1000)
+        for index in range(max(1, self.reply_ms // self.chunk_ms)):
+            await events.put(self._event("model", Part(inline_data=Blob(data=chunk, mime_type="audio/pcm"))))
+            if index % self.transcript_every == 0:
+                await events.put(self._event("model", Part(text="lorem ipsum "), partial=True))
+            await asyncio.sleep(self.chunk_ms / 1000)
+        await events.put(Event(author="Vox", turn_complete=True))
+
+    async def _read_requests(self, live_request_queue, events: asyncio.Queue):
+        utterance_bytes = INPUT_BYTES_PER_SECOND * self.utterance_ms // 1000
+        received = 0
+        reply = None
+        while True:
+            request = await live_request_queue.get()
+            if request.close:
+                break
+            if request.content:
+                text = request.content.parts[0].text or ""
+            elif request.blob:
+                received += len(request.blob.data)
+                if received < utterance_bytes:
+                    continue
+                received = 0
+                text = "user speech "
+            else:
+                continue
+            if reply and not reply.done():
+                reply.cancel()
+                await events.put(Event(author="Vox", interrupted=True))
+            reply = asyncio.create_task(self._reply(events, text))
+        if reply:
+            reply.cancel()
+        await events.put(None)
+
+    async def run_live(self, live_request_queue, **kwargs):
+        """Async generator with the signature of `Runner.run_live`."""
+        events: asyncio.Queue = asyncio.Queue()
+        reader = asyncio.create_task(self._read_requests(live_request_queue, events))
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+        finally:
+            reader.cancel()
+
+    @contextmanager
+    def install(self):
+        """Routes every `Runner.run_live` call to this fake while the context is active."""
+        fake = self
+
+        def run_live(runner, *, live_request_queue, **kwargs):
+            return fake.run_live(live_request_queue, **kwargs)
+
+        with patch.object(Runner, "run_live", run_live):
+            yield self
@@ -0,0 +1,202 @@
+"""
+Concurrent-session load generator for the `/ws/{user_id}` endpoint.
+
+Starts the real FastAPI app on a local port with `Runner.run_live` replaced by
+`FakeLiveModel`, then opens N websocket clients that stream synthetic PCM in
+real time (and a text message every few turns) and wait for each spoken reply.
+Everything runs in-process and offline, so it can run in CI. The clients send
+no API key, so the run leaves the process's `GOOGLE_API_KEY` untouched.
+
+Usage:
+    python -m api.benchmarks.load --sessions 50 --turns 3 [--json]
+
+Memory per session is the growth of the process RSS while all sessions are
+open divided by the number of sessions; it includes the client side.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import resource
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+import uvicorn
+import websockets
+
+from api.benchmarks.fake_live import FakeLiveModel
+from api.services import app_service
+from api.websocket.codec import encode_audio_frame
+
+FRAME_MS = 40
+
+
+@dataclass
+class LoadStats:
+    connect_latencies: List[float] = field(default_factory=list)
+    turn_latencies: List[float] = field(default_factory=list)
+    turns: int = 0
+    errors: int = 0
+    frames_sent: int = 0
+    frames_received: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Returns the q-th percentile (0-100) using the nearest-rank method."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def rss_bytes() -> int:
+    """Returns the current resident set size of the process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # ru_maxrss is the peak, in kilobytes on Linux and bytes on macOS.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def synthetic_frame() -> bytes:
+    """One frame of 16 kHz int16 PCM with a voice-like tone, so VAD-enabled apps forward it."""
+    t = np.arange(16000 * FRAME_MS // 1000)
+    return (6000 * np.sin(2 * np.pi * 220 * t / 16000)).astype("<i2").tobytes()
+
+
+async def _client(index: int, base_url: str, settings: dict, args, stats: LoadStats, ready: asyncio.Event):
+    frame = encode_audio_frame(synthetic_frame())
+    speech_frames = max(1, args.speech_ms // FRAME_MS)
+    first_audio = asyncio.Event()
+    turn_done = asyncio.Event()
+
+    async def receive(ws):
+        async for message in ws:
+            stats.frames_received += 1
+            stats.bytes_received += len(message)
+            if isinstance(message, bytes):
+                first_audio.set()
+            elif '"turn_complete":true' in message:
+                turn_done.set()
+
+    started = time.perf_counter()
+    try:
+        async with websockets.connect(f"{base_url}/ws/{index}?is_audio=true&binary=true", max_size=None) as ws:
+            stats.connect_latencies.append(time.perf_counter() - started)
+            await ws.send(json.dumps({"type": "settings", "settings": settings}))
+            receiver = asyncio.create_task(receive(ws))
+            ready.set()
+            for turn in range(args.turns):
+                first_audio.clear()
+                turn_done.clear()
+                if args.text_every and turn % args.text_every == args.text_every - 1:
+                    message = json.dumps({"type": "text", "data": "Tell me more."})
+                    await ws.send(message)
+                    stats.frames_sent += 1
+                    stats.bytes_sent += len(message)
+                else:
+                    for _ in range(speech_frames):
+                        await ws.send(frame)
+                        stats.frames_sent += 1
+                        stats.bytes_sent += len(frame)
+                        await asyncio.sleep(FRAME_MS / 1000)
+                input_ended = time.perf_counter()
+                await asyncio.wait_for(first_audio.wait(), args.timeout)
+                stats.turn_latencies.append(time.perf_counter() - input_ended)
+                await asyncio.wait_for(turn_done.wait(), args.timeout)
+                stats.turns += 1
+            receiver.cancel()
+    except Exception as e:
+        stats.errors += 1
+        logging.getLogger(__name__).warning(f"Client {index} failed: {e}")
+        ready.set()
+
+
+async def run(args) -> dict:
+    """Runs the load test and returns the report."""
+    settings = app_service.get_app_settings(args.app)
+    fake = FakeLiveModel(
+        utterance_ms=args.speech_ms,
+        response_delay_ms=args.response_delay_ms,
+        reply_ms=args.reply_ms,
+    )
+    from api.main import app
+
+    with fake.install():
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        base_url = f"ws://127.0.0.1:{port}"
+
+        stats = LoadStats()
+        baseline_rss = rss_bytes()
+        peak_rss = baseline_rss
+        started = time.perf_counter()
+        ready_events = [asyncio.Event() for _ in range(args.sessions)]
+        clients = [
+            asyncio.create_task(_client(i, base_url, settings, args, stats, ready_events[i]))
+            for i in range(args.sessions)
+        ]
+        await asyncio.gather(*(event.wait() for event in ready_events))
+        while not all(client.done() for client in clients):
+            peak_rss = max(peak_rss, rss_bytes())
+            await asyncio.sleep(0.1)
+        elapsed = time.perf_counter() - started
+
+        server.should_exit = True
+        await server_task
+
+    return {
+        "sessions": args.sessions,
+        "turns_completed": stats.turns,
+        "errors": stats.errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "frames_sent_per_second": round(stats.frames_sent / elapsed, 1),
+        "frames_received_per_second": round(stats.frames_received / elapsed, 1),
+        "bytes_sent_per_second": round(stats.bytes_sent / elapsed),
+        "bytes_received_per_second": round(stats.bytes_received / elapsed),
+        "connect_p50_ms": round(percentile(stats.connect_latencies, 50) * 1000, 2),
+        "connect_p99_ms": round(percentile(stats.connect_latencies, 99) * 1000, 2),
+        "turn_latency_p50_ms": round(percentile(stats.turn_latencies, 50) * 1000, 2),
+        "turn_latency_p99_ms": round(percentile(stats.turn_latencies, 99) * 1000, 2),
+        "memory_per_session_kib": round((peak_rss - baseline_rss) / args.sessions / 1024, 1),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent websocket sessions.")
+    parser.add_argument("--turns", type=int, default=3, help="Turns per session.")
+    parser.add_argument("--app", default="language_pal", help="Bundled app whose settings the clients send.")
+    parser.add_argument("--speech-ms", type=int, default=1000, help="Audio streamed per spoken turn.")
+    parser.add_argument("--text-every", type=int, default=3, help="Send a text message instead of audio every N turns (0 disables).")
+    parser.add_argument("--reply-ms", type=int, default=1000, help="Audio in each fake reply.")
+    parser.add_argument("--response-delay-ms", type=int, default=300, help="Fake model thinking time.")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for a reply.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for name, value in report.items():
+        print(f"{name:>28}: {value}")
+
+
+if __name__ == "__main__":
+    main()
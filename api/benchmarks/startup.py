@@ -0,0 +1,124 @@
+"""
+Cold-start benchmark for the API process.
+
+Measures how long `import api.main` takes (from `python -X importtime`) and
+how long a fresh `uvicorn api.main:app` process takes until `/api/health`
+answers, and lists any Google SDK modules loaded by the import alone.
+
+Usage:
+    python -m api.benchmarks.startup [--runs 5] [--json]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict
+
+# SDKs that must only be imported on first use, see api/sdk.py.
+HEAVY_MODULES = ("google.adk", "google.genai", "google.api_core")
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def import_profile(module: str = "api.main") -> Dict[str, int]:
+    """
+    Imports a module in a fresh interpreter under `-X importtime`.
+
+    Returns:
+        Dict[str, int]: Cumulative import time in microseconds per module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_health(timeout: float = 60.0) -> float:
+    """Starts the API in a fresh process and returns the seconds until /api/health answers."""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/api/health"
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"API process exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise TimeoutError(f"/api/health did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run(args) -> dict:
+    import_seconds = []
+    health_seconds = []
+    heavy = []
+    for _ in range(args.runs):
+        profile = import_profile("api.main")
+        import_seconds.append(profile["api.main"] / 1e6)
+        heavy = sorted(name for name in profile if name.startswith(HEAVY_MODULES))
+        health_seconds.append(time_to_health(args.timeout))
+    return {
+        "runs": args.runs,
+        "import_api_main_s_min": round(min(import_seconds), 3),
+        "import_api_main_s_median": round(statistics.median(import_seconds), 3),
+        "time_to_health_s_min": round(min(health_seconds), 3),
+        "time_to_health_s_median": round(statistics.median(health_seconds), 3),
+        "sdk_modules_imported": len(heavy),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to measure.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for /api/health.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    if report["sdk_modules_imported"]:
+        print("warning: importing api.main loads the Google SDKs", file=sys.stderr)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for name, value in report.items():
+        print(f"{name:>26}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,18 @@
+import hashlib
+import json
 import logging
-import os
-from google import genai
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Set, Union
+from api.metrics import REGISTRY
+from api.services import app_service
 from api.services.agent_service import create_gemini_live_agent
-from api.settings import AppSettings
-from api.utils import get_context
+from api.settings import AppSettings, settings
+from api.utils import LRUCache, get_context
+
+if TYPE_CHECKING:
+    from google.adk.agents import Agent
+
+logger = logging.getLogger(__name__)
 
 instruction_template = """You are the most brilliant AI that always adapt to the human's needs.
 
@@ -17,10 +26,82 @@ And here is the context of the conversation:
 You can use the edit_context_dict tool to update the context dictionary when needed.
 """
 
+# Agents only hold configuration and shared tools, so sessions built from the
+# same settings can reuse one agent definition.
+agent_cache = LRUCache(maxsize=settings.agent_cache_size)
+# Digests of each app's memoized agents, so a config change drops only that app's.
+_app_digests: Dict[str, Set[str]] = {}
+_app_digests_lock = threading.Lock()
+REGISTRY.counter("vox_agent_cache_hits_total", "Agents served from the agent cache.", fn=lambda: agent_cache.hits)
+REGISTRY.counter("vox_agent_cache_misses_total", "Agents built because of a cache miss.", fn=lambda: agent_cache.misses)
+
+
+def _tool_name(tool) -> str:
+    return getattr(tool, "name", None) or getattr(tool, "__name__", repr(tool))
+
+
+def agent_digest(app_settings: Union[AppSettings, dict], tools: list) -> str:
+    """
+    Returns a stable digest of everything that goes into an agent.
+
+    Works on raw settings dicts so cache hits skip `AppSettings` validation.
+    The instruction template and model name are part of the digest, so changing
+    either produces new agents rather than serving stale ones.
+    """
+    if isinstance(app_settings, AppSettings):
+        app_settings = app_settings.model_dump()
+    canonical = json.dumps(
+        {
+            "template": instruction_template,
+            "model": settings.live_model_name,
+            "agent_description": app_settings["agent_description"],
+            "goal_description": app_settings["goal_description"],
+            "context_dict": app_settings["context_dict"],
+            "tools": [_tool_name(tool) for tool in tools],
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def clear_agent_cache(app_names: Optional[Iterable[str]] = None):
+    """Drops the memoized agents of the given apps, or every memoized agent."""
+    with _app_digests_lock:
+        if app_names is None:
+            agent_cache.clear()
+            _app_digests.clear()
+            return
+        for app_name in app_names:
+            for digest in _app_digests.pop(app_name, ()):
+                agent_cache.pop(digest)
+
+
+def _on_apps_changed(app_ids: Set[str]):
+    # Catalog ids are file names; agents are indexed by the app name inside.
+    app_names = set()
+    for app_id in app_ids:
+        entry = app_service.catalog.cached(app_id)
+        if entry is not None and not entry.malformed:
+            app_names.add(entry.data.get("app_name"))
+    clear_agent_cache(app_names)
+
+
+app_service.catalog.listeners.append(_on_apps_changed)
+
+
 def create_agent(
         app_settings: AppSettings,
         tools: list
-    ):
+    ) -> "Agent":
+    try:
+        digest = agent_digest(app_settings, tools)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Invalid settings format: {e}")
+    agent = agent_cache.get(digest)
+    if agent is not None:
+        return agent
+
     if isinstance(app_settings, dict):
         try:
             app_settings = AppSettings(**app_settings)
@@ -33,10 +114,15 @@ def create_agent(
         context=context,
     )
 
-    logging.info(f"Creating agent with context: {final_instruction}")
-    if app_settings.gemini_api_key:
-        os.environ["GOOGLE_API_KEY"] = app_settings.gemini_api_key
-    return create_gemini_live_agent(
+    logger.info("Creating agent %s for app '%s'", digest[:12], app_settings.app_name)
+    logger.debug(f"Agent instruction: {final_instruction}")
+    agent = create_gemini_live_agent(
         final_instruction,
         tools=tools
     )
+    agent_cache.put(digest, agent)
+    with _app_digests_lock:
+        # Digests the cache has since evicted are forgotten here.
+        digests = _app_digests.get(app_settings.app_name, set())
+        _app_digests[app_settings.app_name] = {d for d in digests if d in agent_cache} | {digest}
+    return agent
@@ -13,3 +13,11 @@ class AppNotFoundError(Exception):
 class MalformedAppConfigError(Exception):
     """Custom exception for malformed app configuration files."""
     pass
+
+class TranscriptNotFoundError(Exception):
+    """Custom exception for when no transcript was recorded for a session."""
+    pass
+
+class OutboundQueueOverflowError(Exception):
+    """Custom exception for when a client falls too far behind the agent stream."""
+    pass
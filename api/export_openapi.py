@@ -25,6 +25,10 @@ def export_openapi_schema():
                 "\n2. Client sends a `SettingsMessage` to configure the agent."
                 "\n3. Client and agent exchange messages (`TextMessage`, `AudioMessage` from client;"
                 " `AgentTextMessage`, `AgentAudioMessage`, etc. from agent)."
+                "\n\n**Binary audio:** Clients may send PCM audio as binary frames made of a"
+                " 1-byte version (`1`), a 1-byte kind (`1` for audio) and the raw int16 payload."
+                " When `binary=true` is set, agent audio is sent back in the same format"
+                " instead of base64 `AgentAudioMessage` JSON."
             ),
             "parameters": [
                 {
@@ -41,6 +45,13 @@ def export_openapi_schema():
                     "schema": {"type": "boolean"},
                     "description": "Specifies if the session will handle audio.",
                 },
+                {
+                    "name": "binary",
+                    "in": "query",
+                    "required": False,
+                    "schema": {"type": "boolean", "default": False},
+                    "description": "Receive agent audio as binary frames instead of base64 JSON.",
+                },
             ],
             "requestBody": {
                 "description": "Initial settings message to configure the agent.",
@@ -0,0 +1,253 @@
+"""
+Serves the built frontend from an in-memory manifest of `frontend/dist`.
+
+The manifest is built once at startup: requests are answered by a dict
+lookup, never by probing the filesystem, so paths outside the build output
+cannot be reached. Compressible files are served gzip or brotli encoded,
+from `.gz`/`.br` files written by `python -m api.frontend` at build time or
+compressed at startup when those are missing or older than their source,
+whatever their size. Hashed asset names are cached as immutable;
+everything else, including index.html, is revalidated with its ETag.
+"""
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse, JSONResponse
+
+from api.settings import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+INDEX = "index.html"
+COMPRESSIBLE_TYPES = re.compile(r"^(text/|application/(javascript|json|xml|wasm)|image/svg\+xml)")
+MIN_COMPRESS_BYTES = 1024
+# Vite appends an 8 character content hash to bundled file names.
+HASHED_NAME = re.compile(r"[-.][A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass
+class StaticFile:
+    """A file of the build output and its encoded variants."""
+    path: str
+    media_type: str
+    etag: str
+    cache_control: str
+    body: Optional[bytes] = None
+    variants: Dict[str, bytes] = field(default_factory=dict)
+    # Variants larger than the manifest's memory limit, streamed from disk.
+    variant_paths: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def encodings(self) -> Set[str]:
+        return set(self.variants) | set(self.variant_paths)
+
+
+def _compress(data: bytes) -> Dict[str, bytes]:
+    variants = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(data)
+    return variants
+
+
+def is_safe_path(path: str) -> bool:
+    """Returns whether a request path can name a file inside the build output."""
+    if "\\" in path or "\x00" in path or path.startswith("/"):
+        return False
+    return all(part not in ("..", ".") for part in path.split("/"))
+
+
+class StaticManifest:
+    """
+    In-memory index of the files under `root`.
+
+    Args:
+        root (str, optional): The frontend build output directory.
+        memory_max_bytes (int, optional): Files up to this size are held in
+            memory; larger ones are streamed from disk.
+    """
+
+    def __init__(self, root: Optional[str] = None, memory_max_bytes: Optional[int] = None):
+        self.root = root or settings.frontend_dist_path
+        self.memory_max_bytes = (
+            settings.static_memory_max_bytes if memory_max_bytes is None else memory_max_bytes
+        )
+        self.files: Dict[str, StaticFile] = {}
+        self._built = False
+        self._lock = threading.Lock()
+
+    def build(self):
+        """Walks the build output and indexes every file."""
+        files: Dict[str, StaticFile] = {}
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(tuple(ENCODING_SUFFIXES.values())):
+                    continue
+                full_path = os.path.join(directory, name)
+                rel_path = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+                files[rel_path] = self._index_file(full_path, rel_path)
+        with self._lock:
+            self.files = files
+            self._built = True
+        logger.info(f"Indexed {len(files)} frontend files from {self.root}")
+
+    def _index_file(self, full_path: str, rel_path: str) -> StaticFile:
+        with open(full_path, "rb") as f:
+            data = f.read()
+        media_type = mimetypes.guess_type(rel_path)[0] or "application/octet-stream"
+        hashed = rel_path.startswith("assets/") and HASHED_NAME.search(rel_path)
+        static_file = StaticFile(
+            path=full_path,
+            media_type=media_type,
+            etag=f'"{hashlib.sha256(data).hexdigest()[:32]}"',
+            cache_control=IMMUTABLE_CACHE_CONTROL if hashed else REVALIDATE_CACHE_CONTROL,
+        )
+        if len(data) <= self.memory_max_bytes:
+            static_file.body = data
+        if COMPRESSIBLE_TYPES.match(media_type) and len(data) >= MIN_COMPRESS_BYTES:
+            self._index_variants(static_file, data)
+        return static_file
+
+    def _index_variants(self, static_file: StaticFile, data: bytes):
+        """
+        Indexes the encoded variants of a file, compressing it when no `.gz`/`.br`
+        files were written at build time or when any of them is older than the
+        file itself. Variants up to `memory_max_bytes` are held in memory and
+        larger ones are streamed from disk.
+        """
+        source_mtime = os.path.getmtime(static_file.path)
+        stale = False
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            variant_path = static_file.path + suffix
+            try:
+                stat = os.stat(variant_path)
+            except OSError:
+                continue
+            if stat.st_mtime < source_mtime:
+                stale = True
+                break
+            if stat.st_size <= self.memory_max_bytes:
+                with open(variant_path, "rb") as f:
+                    static_file.variants[encoding] = f.read()
+            else:
+                static_file.variant_paths[encoding] = variant_path
+        if stale:
+            logger.info(f"Recompressing {static_file.path}: its encoded variants are out of date")
+            static_file.variants.clear()
+            static_file.variant_paths.clear()
+        elif static_file.variants or static_file.variant_paths:
+            return
+        for encoding, compressed in _compress(data).items():
+            variant_path = static_file.path + ENCODING_SUFFIXES[encoding]
+            if len(compressed) <= self.memory_max_bytes:
+                static_file.variants[encoding] = compressed
+                if stale:
+                    # Refresh the build-time files so the next start can use them.
+                    self._write_variant(variant_path, compressed)
+                continue
+            if self._write_variant(variant_path, compressed):
+                static_file.variant_paths[encoding] = variant_path
+
+    @staticmethod
+    def _write_variant(variant_path: str, compressed: bytes) -> bool:
+        try:
+            with open(variant_path, "wb") as f:
+                f.write(compressed)
+        except OSError as e:
+            logger.warning(f"Could not write {variant_path}: {e}")
+            return False
+        return True
+
+    def get(self, path: str) -> Optional[StaticFile]:
+        """Returns the indexed file for a request path, building the manifest on first use."""
+        if not self._built:
+            self.build()
+        if not is_safe_path(path):
+            return None
+        return self.files.get(path)
+
+
+def _accepted_encoding(request: Request, static_file: StaticFile) -> Optional[str]:
+    accept_encoding = request.headers.get("accept-encoding", "")
+    accepted = {token.split(";")[0].strip() for token in accept_encoding.split(",")}
+    for encoding in ENCODING_SUFFIXES:
+        if encoding in accepted and encoding in static_file.encodings:
+            return encoding
+    return None
+
+
+def file_response(request: Request, static_file: StaticFile) -> Response:
+    """Returns a file, encoded if the client accepts it, or 304 when unchanged."""
+    encoding = _accepted_encoding(request, static_file)
+    etag = static_file.etag if encoding is None else f'{static_file.etag[:-1]}-{encoding}"'
+    headers = {"ETag": etag, "Cache-Control": static_file.cache_control}
+    if static_file.encodings:
+        headers["Vary"] = "Accept-Encoding"
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        if encoding in static_file.variant_paths:
+            return FileResponse(static_file.variant_paths[encoding], media_type=static_file.media_type, headers=headers)
+        return Response(static_file.variants[encoding], media_type=static_file.media_type, headers=headers)
+    if static_file.body is not None:
+        return Response(static_file.body, media_type=static_file.media_type, headers=headers)
+    return FileResponse(static_file.path, media_type=static_file.media_type, headers=headers)
+
+
+manifest = StaticManifest()
+
+
+def serve(request: Request, path: str) -> Response:
+    """
+    Serves a file of the build output, falling back to index.html for SPA
+    routes. Missing files under `assets/` are not masked by the fallback.
+    """
+    static_file = manifest.get(path)
+    if static_file is None and path.startswith("assets/"):
+        return JSONResponse(status_code=404, content={"message": "File not found."})
+    if static_file is None:
+        static_file = manifest.get(INDEX)
+    if static_file is None:
+        return JSONResponse(
+            status_code=404,
+            content={"message": "Frontend not found. Please build the frontend first."},
+        )
+    return file_response(request, static_file)
+
+
+def precompress(root: str):
+    """Writes `.gz` (and `.br` when brotli is installed) next to compressible files."""
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if name.endswith(tuple(ENCODING_SUFFIXES.values())):
+                continue
+            full_path = os.path.join(directory, name)
+            media_type = mimetypes.guess_type(name)[0] or ""
+            if not COMPRESSIBLE_TYPES.match(media_type) or os.path.getsize(full_path) < MIN_COMPRESS_BYTES:
+                continue
+            with open(full_path, "rb") as f:
+                data = f.read()
+            for encoding, compressed in _compress(data).items():
+                with open(full_path + ENCODING_SUFFIXES[encoding], "wb") as f:
+                    f.write(compressed)
+
+
+if __name__ == "__main__":
+    precompress(settings.frontend_dist_path)
@@ -1,19 +1,28 @@
+import asyncio
 import logging
 import os
+from contextlib import asynccontextmanager
 from api.routers import api_key, apps, avatar
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from api import frontend
 from api.routers import analyse
+from api.services import app_service
+from api.services.transcript_store import transcript_log
 from api.websocket import connection as websocket
+from api.websocket.pool import agent_pool
+from api.websocket.registry import runner_registry
+from api.websocket.resume import resume_registry
 from api.exceptions import (
     ApiKeyError,
     ImageGenerationError,
     AppNotFoundError,
     MalformedAppConfigError,
+    TranscriptNotFoundError,
 )
+from api.metrics import REGISTRY
 from api.settings import settings
 
 # Configure logging
@@ -22,7 +31,29 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the app catalog and the frontend manifest before serving. Runners
+    # for the bundled apps are built in the background so the process answers
+    # health checks without waiting for the agent SDK to load.
+    try:
+        app_service.catalog.refresh(force=True)
+    except AppNotFoundError as e:
+        # Serve the rest of the API; the catalog is read again on the next request.
+        logger.error(f"Starting with an empty app catalog: {e}")
+    # Compressing the build output can take a while; keep it off the event loop.
+    await asyncio.to_thread(frontend.manifest.build)
+    agent_pool.start_warming()
+    runner_registry.start_sweeper()
+    yield
+    await agent_pool.stop_warming()
+    await resume_registry.close()
+    await runner_registry.stop_sweeper()
+    runner_registry.close_session_store()
+    if transcript_log:
+        transcript_log.flush()
+
+app = FastAPI(lifespan=lifespan)
 
 # Exception handlers
 @app.exception_handler(ApiKeyError)
@@ -57,6 +88,14 @@ async def malformed_app_config_error_handler(request: Request, exc: MalformedApp
         content={"message": str(exc)},
     )
 
+@app.exception_handler(TranscriptNotFoundError)
+async def transcript_not_found_error_handler(request: Request, exc: TranscriptNotFoundError):
+    logger.error(f"TranscriptNotFoundError: {exc}")
+    return JSONResponse(
+        status_code=404,
+        content={"message": str(exc)},
+    )
+
 app.include_router(analyse.router)
 app.include_router(api_key.router)
 app.include_router(websocket.router)
@@ -70,35 +109,50 @@ async def health_check():
     """
     return {"status": "ok"}
 
-# Serve the frontend
-app.mount('/assets', StaticFiles(directory='frontend/dist/assets'), name='assets')
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Exposes latency, throughput and session metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
+# Serve the frontend
 @app.get("/{full_path:path}")
 async def catch_all(request: Request, full_path: str):
     """
-    Catch-all route to serve the index.html file for any non-API routes.
+    Serves files of the frontend build, and index.html for any other
+    non-API route so the SPA can handle it.
     """
-    # Check if the file exists in the static directory
-    static_file_path = os.path.join('frontend/dist', full_path)
-    if os.path.isfile(static_file_path):
-        return FileResponse(static_file_path)
-    
-    # If not a file, serve the index.html for SPA routing
-    index_path = os.path.join('frontend/dist', 'index.html')
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
-    
-    # This should ideally not be reached if index.html exists
-    return JSONResponse(
-        status_code=404,
-        content={"message": "Frontend not found. Please build the frontend first."},
+    return frontend.serve(request, full_path)
+
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the Vox API server.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("WEB_CONCURRENCY", 1)),
+        help=(
+            "Worker processes. Use session_store=sqlite or redis when running more than one. "
+            "Resume tokens and warm agents are per worker, so route each client to one worker."
+        ),
     )
+    return parser.parse_args(argv)
 
 
-def main():
+def main(argv=None):
     import uvicorn
-    port = int(os.environ.get("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    args = parse_args(argv)
+    if args.workers > 1 and settings.session_store == "memory":
+        logger.warning(
+            "Running %d workers with session_store=memory: sessions are not shared between workers.",
+            args.workers,
+        )
+    # Workers are separate processes, so uvicorn needs an import string.
+    uvicorn.run("api.main:app", host=args.host, port=args.port, workers=args.workers)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,228 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Metrics are plain module-level objects, so instrumented code only needs to
+import the one it updates. Values derived from other components (session
+counts, cache statistics) are registered as callbacks and read at scrape time.
+"""
+import abc
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(abc.ABC):
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+
+    @abc.abstractmethod
+    def samples(self) -> List[str]:
+        """Returns the exposition lines for this metric's values."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing value, optionally read from a callback."""
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, fn: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation)
+        self._value = 0.0
+        self._fn = fn
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._fn() if self._fn else self._value
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_format_value(self.value)}"]
+
+
+class Gauge(Counter):
+    """Value that can go up and down, optionally read from a callback."""
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+
+class Histogram(Metric):
+    """Cumulative histogram with fixed upper bounds."""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self):
+        """Observes the duration of the wrapped block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_format_value(total)}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, fn: Optional[Callable[[], float]] = None) -> Counter:
+        return self.register(Counter(name, documentation, fn))
+
+    def gauge(self, name: str, documentation: str, fn: Optional[Callable[[], float]] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, fn))
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, buckets))
+
+    def render(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Websocket pipeline
+WS_CONNECTIONS = REGISTRY.counter("vox_ws_connections_total", "Websocket connections accepted.")
+WS_ACTIVE_CONNECTIONS = REGISTRY.gauge("vox_ws_active_connections", "Websocket connections currently open.")
+WS_SESSION_READY = REGISTRY.histogram(
+    "vox_ws_session_ready_seconds", "Time from websocket accept until the agent session is ready."
+)
+WS_FIRST_AUDIO = REGISTRY.histogram(
+    "vox_ws_first_audio_seconds", "Time from websocket accept until the first agent audio is queued."
+)
+WS_TURN_LATENCY = REGISTRY.histogram(
+    "vox_ws_turn_latency_seconds", "Time from the end of user input until the first agent audio of the reply."
+)
+WS_OUTBOUND_DEPTH = REGISTRY.histogram(
+    "vox_ws_outbound_queue_depth", "Outbound queue depth observed when a message is queued.", SIZE_BUCKETS
+)
+WS_OUTBOUND_DROPPED = REGISTRY.counter(
+    "vox_ws_outbound_dropped_total", "Outbound messages dropped because a client fell behind."
+)
+WS_OUTBOUND_COALESCED = REGISTRY.counter(
+    "vox_ws_outbound_coalesced_total", "Partial transcriptions merged into a queued message."
+)
+WS_FRAMES_RECEIVED = REGISTRY.counter("vox_ws_frames_received_total", "Websocket frames received from clients.")
+WS_FRAMES_SENT = REGISTRY.counter("vox_ws_frames_sent_total", "Websocket frames sent to clients.")
+WS_BYTES_RECEIVED = REGISTRY.counter(
+    "vox_ws_bytes_received_total", "Websocket payload size received from clients (characters for text frames)."
+)
+WS_BYTES_SENT = REGISTRY.counter(
+    "vox_ws_bytes_sent_total", "Websocket payload size sent to clients (characters for text frames)."
+)
+VAD_FRAMES_DROPPED = REGISTRY.counter(
+    "vox_vad_frames_dropped_total", "Silent audio frames not forwarded to the live model."
+)
+
+# HTTP endpoints
+ANALYSE_LATENCY = REGISTRY.histogram("vox_analyse_request_seconds", "Latency of /api/analyse requests.")
+AVATAR_LATENCY = REGISTRY.histogram("vox_avatar_request_seconds", "Latency of /api/avatar/generate requests.")
+
+
+class ConnectionMetrics:
+    """Tracks the latency milestones of one websocket connection."""
+
+    def __init__(self):
+        self.connected_at = time.perf_counter()
+        self._first_audio_seen = False
+        self._agent_speaking = False
+        self._input_ended_at: Optional[float] = None
+        self._closed = False
+        WS_CONNECTIONS.inc()
+        WS_ACTIVE_CONNECTIONS.inc()
+
+    def session_ready(self):
+        WS_SESSION_READY.observe(time.perf_counter() - self.connected_at)
+
+    def frame_received(self, size: int):
+        WS_FRAMES_RECEIVED.inc()
+        WS_BYTES_RECEIVED.inc(size)
+
+    def user_input(self):
+        """Marks the latest user input (a transcription or a text message) before the agent replies."""
+        if not self._agent_speaking:
+            self._input_ended_at = time.perf_counter()
+
+    def agent_audio(self):
+        now = time.perf_counter()
+        self._agent_speaking = True
+        if not self._first_audio_seen:
+            self._first_audio_seen = True
+            WS_FIRST_AUDIO.observe(now - self.connected_at)
+        if self._input_ended_at is not None:
+            WS_TURN_LATENCY.observe(now - self._input_ended_at)
+            self._input_ended_at = None
+
+    def turn_complete(self):
+        """Marks the end (or interruption) of the agent's turn."""
+        self._agent_speaking = False
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            WS_ACTIVE_CONNECTIONS.dec()
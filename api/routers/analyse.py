@@ -1,19 +1,80 @@
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Optional
+
 from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import Optional
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, model_validator
 
+from api.exceptions import TranscriptNotFoundError
+from api.metrics import ANALYSE_LATENCY
 from api.settings import AppSettings
 from api.services import analysis_service
+from api.services.transcript_store import transcript_log
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class AnalyseRequest(BaseModel):
-    notes: str
-    settings: Optional[AppSettings] = None
+    """Notes to analyse, sent by the client or read from a session's server-side transcript."""
+    notes: Optional[str] = None
+    session_id: Optional[str] = None
+    settings: AppSettings
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if (self.notes is None) == (self.session_id is None):
+            raise ValueError("Provide exactly one of notes or session_id.")
+        return self
+
+
+async def resolve_notes(request: AnalyseRequest) -> str:
+    """Returns the request's notes, reading the session transcript off the event loop if needed."""
+    if request.notes is not None:
+        return request.notes
+    if transcript_log is None:
+        raise TranscriptNotFoundError("Server-side transcripts are disabled.")
+    return await asyncio.to_thread(transcript_log.notes, request.session_id)
+
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Formats a single server-sent event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def stream_events(request: AnalyseRequest, notes: str, incremental: bool = False) -> AsyncIterator[str]:
+    """Relays analysis chunks as SSE `data` events, ending with `done` or `error`."""
+    with ANALYSE_LATENCY.time():
+        try:
+            async for text in analysis_service.stream_analysis(
+                request.settings, notes, incremental=incremental
+            ):
+                yield sse_event({"text": text})
+        except Exception as e:
+            logger.error(f"Streaming analysis failed: {e}")
+            yield sse_event({"message": str(e)}, event="error")
+            return
+    yield sse_event({"message": "Analysis complete"}, event="done")
+
 
 @router.post("/api/analyse")
 async def post_analyse(
     request: AnalyseRequest,
+    stream: bool = False,
+    incremental: bool = False,
 ):
-    analysis_result = analysis_service.analyse_notes(request.settings, request.notes)
+    notes = await resolve_notes(request)
+    if stream:
+        return StreamingResponse(
+            stream_events(request, notes, incremental=incremental),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    with ANALYSE_LATENCY.time():
+        if incremental:
+            analysis_result = await analysis_service.analyse_notes_incremental(request.settings, notes)
+        else:
+            analysis_result = await analysis_service.analyse_notes_async(request.settings, notes)
     return {"message": "Analysis complete", "analysis": analysis_result}
@@ -1,9 +1,8 @@
-
-import os
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter
 from pydantic import BaseModel
-from google import genai
-from google.genai import types
+
+from api.exceptions import ApiKeyError
+from api.services import api_key_service
 
 # Only run this block for Gemini Developer API
 router = APIRouter()
@@ -11,31 +10,12 @@ router = APIRouter()
 class ApiKey(BaseModel):
     key: str
 
-def _verify_api_key(api_key: str):
-    """Verifies the provided Gemini API key."""
-    client = genai.Client(api_key=api_key)
-    try:
-        client.models.generate_content(
-            model='gemini-2.0-flash',
-            contents='Response with 1 word only.',
-            config=types.GenerateContentConfig(
-                system_instruction='I say high, you say low',
-                max_output_tokens=3,
-                temperature=0,
-            ),
-        )
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid API Key: {str(e)}")
-
 
 @router.post("/api/verify_api_key")
 async def verify_api_key(api_key: ApiKey):
     """Endpoint to verify the provided Gemini API key."""
     try:
-        _verify_api_key(api_key.key)
+        await api_key_service.verify_api_key(api_key.key)
         return {"status": "success", "message": "API Key verified and set."}
-    except HTTPException as e:
-        return {"status": "error", "message": str(e.detail)}
-
-
-
+    except ApiKeyError as e:
+        return {"status": "error", "message": str(e)}
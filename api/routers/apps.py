@@ -1,23 +1,72 @@
-from fastapi import APIRouter
+import hashlib
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from fastapi.responses import JSONResponse
-from typing import List, Dict, Any
+from typing import Any, Callable, Optional
 
-from api.services import app_service
+from api.services import app_search, app_service
+from api.settings import settings
 
 router = APIRouter()
 
+# Clients may reuse a cached copy but must revalidate it with the ETag.
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+def is_not_modified(request: Request, etag: Optional[str]) -> bool:
+    """Returns whether the request's If-None-Match matches the current ETag."""
+    if etag is None:
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
+
+def cached_json(
+    request: Request, build: Callable[[], Any], etag: Optional[str], headers: Optional[dict] = None
+) -> Response:
+    """Returns the result of `build` as JSON, or 304 when the client's copy is current."""
+    headers = {"Cache-Control": REVALIDATE_CACHE_CONTROL, **(headers or {})}
+    if etag is not None:
+        headers["ETag"] = etag
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=build(), headers=headers)
+
 @router.get("/api/apps/{app_id}/settings")
-async def get_app_settings(app_id: str) -> JSONResponse:
+async def get_app_settings(app_id: str, request: Request) -> Response:
     """
     Retrieves the settings for a specific app.
     """
-    settings = app_service.get_app_settings(app_id)
-    return JSONResponse(content=settings)
+    etag = app_service.get_app_settings_etag(app_id)
+    return cached_json(request, lambda: app_service.get_app_settings(app_id), etag)
 
 @router.get("/api/apps")
-async def get_apps() -> List[Dict[str, Any]]:
+async def get_apps(
+    request: Request,
+    q: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+) -> Response:
     """
-    Reads all app example JSON files, extracts key information,
-    and returns a list of app configurations.
+    Returns the id, name and summary of every app, served from the
+    in-memory app catalog.
+
+    With `q`, only apps whose name, descriptions or context keys match every
+    word are returned. `fields` selects the returned fields, and `limit` and
+    `cursor` page through the results; the cursor of the next page is
+    returned in the `X-Next-Cursor` header.
     """
-    return app_service.get_apps()
+    if q is None and fields is None and limit is None and cursor is None:
+        return cached_json(request, app_service.get_apps, app_service.get_apps_etag())
+
+    try:
+        selected = app_search.parse_fields(fields)
+        items, next_cursor = app_search.search_apps(
+            q or "", selected, min(limit or settings.apps_page_size_max, settings.apps_page_size_max), cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    etag = hashlib.sha256(f"{app_service.get_apps_etag()}?{request.url.query}".encode("utf-8")).hexdigest()[:32]
+    return cached_json(request, lambda: items, f'"{etag}"', headers)
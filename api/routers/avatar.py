@@ -1,28 +1,51 @@
 import base64
-from typing import Optional
-from google import genai
-from google.genai import types
-from google.api_core import exceptions as google_exceptions
-from fastapi import APIRouter
+import logging
+from typing import TYPE_CHECKING, Literal, Optional
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
-from ..settings import AppSettings
+from .. import sdk
+from ..metrics import AVATAR_LATENCY, REGISTRY
+from ..services import client_pool
+from ..services.avatar_cache import DIGEST_PATTERN, AvatarCache, prompt_digest
+from ..services.avatar_jobs import DONE, FAILED, AvatarJob, AvatarJobQueue
+from ..settings import AppSettings, settings
 from ..exceptions import ApiKeyError, ImageGenerationError
 
+if TYPE_CHECKING:
+    from google import genai
+    from google.genai import types
+
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+avatar_cache = AvatarCache(settings.avatar_cache_dir, settings.avatar_cache_max_bytes)
+AVATAR_CACHE_HITS = REGISTRY.counter("vox_avatar_cache_hits_total", "Avatars served from the avatar cache.")
+AVATAR_CACHE_MISSES = REGISTRY.counter("vox_avatar_cache_misses_total", "Avatars generated by the image model.")
+
+avatar_jobs = AvatarJobQueue()
+REGISTRY.counter("vox_avatar_jobs_submitted_total", "Avatar generation jobs started.", fn=lambda: avatar_jobs.submitted)
+REGISTRY.counter("vox_avatar_jobs_coalesced_total", "Avatar requests joined to a job already in flight.", fn=lambda: avatar_jobs.coalesced)
+
+# Longest a poll may block waiting for a job to finish.
+MAX_JOB_WAIT_SECONDS = 30.0
+
+# Avatars are addressed by the hash of their prompt, so a URL never changes meaning.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
 class AvatarRequest(BaseModel):
     settings: AppSettings
     api_key: Optional[str] = None
 
-def create_genai_client(api_key: Optional[str] = None) -> genai.Client:
-    """Creates and returns a genai.Client instance."""
+def create_genai_client(api_key: Optional[str] = None) -> "genai.Client":
+    """Returns a pooled genai.Client instance for the API key."""
     try:
-        return genai.Client(api_key=api_key)
+        return client_pool.get_client(api_key)
     except Exception as e:
         raise ApiKeyError(f"Failed to create Gemini client: {e}")
 
-def prepare_avatar_request_content(prompt: str) -> list[types.Content]:
+def prepare_avatar_request_content(prompt: str) -> list["types.Content"]:
     """Prepares the content for the image generation request."""
+    types = sdk.genai_types()
     return [
         types.Content(
             role="user",
@@ -32,7 +55,7 @@ def prepare_avatar_request_content(prompt: str) -> list[types.Content]:
 
 def process_image_response(response_iterator) -> bytes:
     """Processes the response iterator and returns the image data."""
-    image_data = b""
+    image_parts = []
     text_response = ""
     for chunk in response_iterator:
         if (
@@ -44,44 +67,150 @@ def process_image_response(response_iterator) -> bytes:
             continue
         for part in chunk.candidates[0].content.parts:
             if part.inline_data and part.inline_data.data:
-                image_data += part.inline_data.data
+                image_parts.append(part.inline_data.data)
         if chunk.text:
             text_response += chunk.text
+    image_data = b"".join(image_parts)
     if not image_data:
         if text_response:
             raise ImageGenerationError(f"Image generation failed: {text_response.strip()}")
         raise ImageGenerationError("Image generation failed, no image data received.")
     return image_data
 
-def generate_image(prompt: str, api_key: Optional[str] = None) -> dict:
-    """Generates an image using the Gemini AI model."""
+def generate_image_bytes(prompt: str, api_key: Optional[str] = None) -> bytes:
+    """Generates an image using the Gemini AI model and returns the PNG bytes."""
     try:
         client = create_genai_client(api_key)
-        model = "gemini-2.0-flash-preview-image-generation"
         contents = prepare_avatar_request_content(prompt)
-        config = types.GenerateContentConfig(response_modalities=["IMAGE", "TEXT"])
+        config = sdk.genai_types().GenerateContentConfig(response_modalities=["IMAGE", "TEXT"])
         
         response_iterator = client.models.generate_content_stream(
-            model=model,
+            model=settings.image_model_name,
             contents=contents,
             config=config,
         )
         
-        image_data = process_image_response(response_iterator)
-        encoded_image = base64.b64encode(image_data).decode("utf-8")
-        return {"image": encoded_image}
-    except google_exceptions.GoogleAPICallError as e:
+        return process_image_response(response_iterator)
+    except sdk.api_core_exceptions().GoogleAPICallError as e:
         if "api key" in str(e).lower():
             raise ApiKeyError(f"Invalid Gemini API key: {e}")
         raise ImageGenerationError(f"Google API call error: {e}")
     except Exception as e:
         raise ImageGenerationError(f"An unexpected error occurred during image generation: {e}")
 
+def generate_image(prompt: str, api_key: Optional[str] = None) -> dict:
+    """Generates an image using the Gemini AI model, base64-encoded in a dict."""
+    image_data = generate_image_bytes(prompt, api_key)
+    return {"image": base64.b64encode(image_data).decode("utf-8")}
+
+def avatar_prompt(app_settings: AppSettings) -> str:
+    """Builds the image prompt for an app's avatar."""
+    return f"Design a minimalist cartoon avatar based on the role description: {app_settings.agent_description}. Considering the context: {app_settings.context_dict}"
+
+def get_or_generate_avatar(prompt: str, api_key: Optional[str] = None) -> tuple[str, bytes]:
+    """Returns the digest and PNG bytes for a prompt, generating them on a cache miss."""
+    digest = prompt_digest(prompt, settings.image_model_name)
+    image_data = avatar_cache.get(digest)
+    if image_data is not None:
+        AVATAR_CACHE_HITS.inc()
+        return digest, image_data
+    AVATAR_CACHE_MISSES.inc()
+    logger.debug(f"Generating avatar with prompt: {prompt}")
+    image_data = generate_image_bytes(prompt, api_key)
+    avatar_cache.put(digest, image_data)
+    return digest, image_data
+
+def avatar_url(digest: str) -> str:
+    return f"/api/avatar/{digest}.png"
+
+def png_response(digest: str, image_data: bytes) -> Response:
+    return Response(
+        content=image_data,
+        media_type="image/png",
+        headers={
+            "ETag": f'"{digest}"',
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+            "Content-Location": avatar_url(digest),
+        },
+    )
+
+def submit_avatar_job(app_settings: AppSettings) -> AvatarJob:
+    """
+    Returns a finished job for a cached avatar, or queues its generation,
+    joining an identical one in flight with the same API key.
+    """
+    prompt = avatar_prompt(app_settings)
+    digest = prompt_digest(prompt, settings.image_model_name)
+    # Checked here, so a cache hit never waits behind generations for a worker.
+    image_data = avatar_cache.get(digest)
+    if image_data is not None:
+        AVATAR_CACHE_HITS.inc()
+        return avatar_jobs.completed(digest, image_data)
+    api_key = app_settings.gemini_api_key
+    return avatar_jobs.submit(
+        digest,
+        lambda: get_or_generate_avatar(prompt, api_key=api_key)[1],
+        owner=client_pool.key_digest(api_key) if api_key else "",
+    )
+
+def job_status(job: AvatarJob) -> dict:
+    """Describes a job for polling clients."""
+    status = {"job_id": job.id, "status": job.status}
+    if status["status"] == DONE:
+        status["url"] = avatar_url(job.digest)
+    elif status["status"] == FAILED:
+        error = job.error
+        status["message"] = (
+            "API key is invalid or missing." if isinstance(error, ApiKeyError)
+            else "Failed to generate image."
+        )
+    return status
+
 @router.post("/api/avatar/generate")
-async def generate_avatar(req: AvatarRequest):
-    prompt = f"Design a minimalist cartoon avatar based on the role description: {req.settings.agent_description}. Considering the context: {req.settings.context_dict}"
-    print(f"Generating avatar with prompt: {prompt}")
-    return generate_image(prompt, api_key=req.settings.gemini_api_key)
+async def generate_avatar(req: AvatarRequest, format: Literal["json", "png"] = "json"):
+    """
+    Generates the avatar for an app, or returns the cached one.
+
+    `format=png` returns the image itself; the default JSON body with the
+    base64 image is kept for existing clients and also carries its URL.
+    """
+    with AVATAR_LATENCY.time():
+        job = submit_avatar_job(req.settings)
+        await avatar_jobs.wait(job)
+        image_data = job.future.result()
+    if format == "png":
+        return png_response(job.digest, image_data)
+    return {"image": base64.b64encode(image_data).decode("utf-8"), "url": avatar_url(job.digest)}
+
+@router.post("/api/avatar/jobs", status_code=202)
+async def create_avatar_job(req: AvatarRequest):
+    """Starts generating an app's avatar and returns a job id to poll."""
+    return job_status(submit_avatar_job(req.settings))
+
+@router.get("/api/avatar/jobs/{job_id}")
+async def get_avatar_job(job_id: str, wait: float = 0):
+    """
+    Returns a job's status. With `wait`, blocks up to that many seconds
+    (at most 30) for the job to finish before answering.
+    """
+    job = avatar_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Avatar job not found.")
+    if wait > 0:
+        await avatar_jobs.wait(job, timeout=min(wait, MAX_JOB_WAIT_SECONDS))
+    return job_status(job)
+
+@router.get("/api/avatar/{digest}.png")
+async def get_avatar(digest: str, request: Request):
+    """Serves a previously generated avatar by its content address."""
+    if not DIGEST_PATTERN.match(digest):
+        raise HTTPException(status_code=404, detail="Avatar not found.")
+    if request.headers.get("if-none-match") == f'"{digest}"':
+        return Response(status_code=304, headers={"ETag": f'"{digest}"', "Cache-Control": IMMUTABLE_CACHE_CONTROL})
+    image_data = avatar_cache.get(digest)
+    if image_data is None:
+        raise HTTPException(status_code=404, detail="Avatar not found.")
+    return png_response(digest, image_data)
 
 
 if __name__ == "__main__":
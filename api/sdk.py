@@ -0,0 +1,66 @@
+"""
+Lazy accessors for the Google SDKs.
+
+google.genai and google.adk take seconds to import. Modules on the import path
+of `api.main` reach them through these functions at first use instead of
+importing them at module level, so importing the API for the OpenAPI export,
+the tests or a health check does not pay for them. Type annotations import
+the SDKs under `TYPE_CHECKING` only.
+"""
+import importlib
+from types import ModuleType
+
+
+def genai() -> ModuleType:
+    """Returns `google.genai`."""
+    return importlib.import_module("google.genai")
+
+
+def genai_types() -> ModuleType:
+    """Returns `google.genai.types`."""
+    return importlib.import_module("google.genai.types")
+
+
+def genai_errors() -> ModuleType:
+    """Returns `google.genai.errors`."""
+    return importlib.import_module("google.genai.errors")
+
+
+def api_core_exceptions() -> ModuleType:
+    """Returns `google.api_core.exceptions`."""
+    return importlib.import_module("google.api_core.exceptions")
+
+
+def adk_agents() -> ModuleType:
+    """Returns `google.adk.agents`."""
+    return importlib.import_module("google.adk.agents")
+
+
+def adk_run_config() -> ModuleType:
+    """Returns `google.adk.agents.run_config`."""
+    return importlib.import_module("google.adk.agents.run_config")
+
+
+def adk_runners() -> ModuleType:
+    """Returns `google.adk.runners`."""
+    return importlib.import_module("google.adk.runners")
+
+
+def adk_sessions() -> ModuleType:
+    """Returns `google.adk.sessions`."""
+    return importlib.import_module("google.adk.sessions")
+
+
+def adk_artifacts() -> ModuleType:
+    """Returns `google.adk.artifacts`."""
+    return importlib.import_module("google.adk.artifacts")
+
+
+def adk_memory() -> ModuleType:
+    """Returns `google.adk.memory`."""
+    return importlib.import_module("google.adk.memory")
+
+
+def adk_tools() -> ModuleType:
+    """Returns `google.adk.tools`."""
+    return importlib.import_module("google.adk.tools")
@@ -1,15 +1,19 @@
-from google.adk.agents import Agent
+from typing import TYPE_CHECKING
 
+from api import sdk
 from api.settings import settings
 
+if TYPE_CHECKING:
+    from google.adk.agents import Agent
+
 
 def create_gemini_live_agent(
     instruction: str,
     tools: list,
     name: str = "Vox",
     description: str = "Most brilliant AI",
-) -> Agent:
-    agent = Agent(
+) -> "Agent":
+    agent = sdk.adk_agents().Agent(
         name=name,
         model=settings.live_model_name,
         description=description,
@@ -0,0 +1,172 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from api.utils import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+def analysis_digest(**parts) -> str:
+    """Returns a stable hash of the inputs that determine an analysis."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SqliteStore:
+    """
+    Persistent key/value store for analysis results.
+
+    Every write also removes expired rows and, past `max_rows`, the oldest ones.
+
+    Args:
+        path (str): Database file, created when missing.
+        ttl (float, optional): Seconds after which an entry is ignored.
+        max_rows (int, optional): Most entries kept in the table.
+        table (str): Table of this store, so several caches can share a file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = None,
+        max_rows: Optional[int] = None,
+        table: str = "analysis_cache",
+    ):
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_created_at ON {table} (created_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        if self.ttl and created_at + self.ttl <= time.time():
+            self.delete(key)
+            return None
+        return value
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, now),
+            )
+            if self.ttl:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE created_at <= ?", (now - self.ttl,))
+            if self.max_rows:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_rows,),
+                )
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class AnalysisCache:
+    """
+    Two-level cache of analysis results: an in-memory LRU in front of an
+    optional SQLite store that survives restarts. Async callers use `aget` and
+    `aput`, which run the SQLite level in a worker thread.
+
+    Args:
+        maxsize (int): Entries kept in memory.
+        ttl (float, optional): Seconds after which an entry expires.
+        path (str, optional): SQLite file for the persistent level.
+        max_rows (int, optional): Entries kept on disk.
+        table (str): SQLite table of this cache.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        path: Optional[str] = None,
+        max_rows: Optional[int] = None,
+        table: str = "analysis_cache",
+    ):
+        self._memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._store = SqliteStore(path, ttl=ttl, max_rows=max_rows, table=table) if path else None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached analysis, promoting disk hits into memory."""
+        value = self._memory.get(key)
+        if value is None and self._store is not None:
+            try:
+                value = self._store.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"Analysis cache read failed: {e}")
+            if value is not None:
+                self._memory.put(key, value)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: str):
+        """Stores an analysis in memory and, when configured, on disk."""
+        self._memory.put(key, value)
+        if self._store is not None:
+            try:
+                self._store.put(key, value)
+            except sqlite3.Error as e:
+                logger.warning(f"Analysis cache write failed: {e}")
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Like `get`, without blocking the event loop on the disk level."""
+        if self._store is None or self._memory.get(key) is not None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, value: str):
+        """Like `put`, without blocking the event loop on the disk level."""
+        if self._store is None:
+            self.put(key, value)
+        else:
+            await asyncio.to_thread(self.put, key, value)
+
+    def clear(self):
+        """Removes every entry from both levels."""
+        self._memory.clear()
+        if self._store is not None:
+            self._store.clear()
+
+    def stats(self):
+        """Returns the hit and miss counters and the in-memory size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._memory)}
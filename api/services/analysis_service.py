@@ -1,20 +1,44 @@
-from google import genai
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List
+
+from api.metrics import REGISTRY
+from api.services import client_pool
+from api.services.analysis_cache import AnalysisCache, analysis_digest
 from api.settings import AppSettings, settings
 from api.utils import get_context
 
+# Blocking analysis calls run here instead of on the event loop, so a slow
+# model call cannot stall live websocket sessions. The bound keeps a burst
+# of analyses from starving the default executor.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.analyse_max_workers, thread_name_prefix="analyse"
+)
 
-def analyse_notes(app_settings: AppSettings, notes: str) -> str:
-    """
-    Analyzes the notes using the Gemini AI model.
+# Re-analysing unchanged notes with unchanged settings returns the stored
+# result instead of spending model quota again.
+analysis_cache = AnalysisCache(
+    maxsize=settings.analysis_cache_size,
+    ttl=settings.analysis_cache_ttl_seconds,
+    path=settings.analysis_cache_path,
+    max_rows=settings.analysis_cache_max_rows,
+)
+REGISTRY.counter("vox_analysis_cache_hits_total", "Analyses served from the analysis cache.", fn=lambda: analysis_cache.hits)
+REGISTRY.counter("vox_analysis_cache_misses_total", "Analyses sent to the model.", fn=lambda: analysis_cache.misses)
 
-    Args:
-        app_settings (AppSettings): The application settings.
-        notes (str): The notes to be analyzed.
+# Per-chunk summaries for incremental analysis, keyed by chunk content, so a
+# transcript that only gained a few turns re-summarises just its tail.
+chunk_cache = AnalysisCache(
+    maxsize=settings.analysis_chunk_cache_size,
+    ttl=settings.analysis_cache_ttl_seconds,
+    path=settings.analysis_cache_path,
+    max_rows=settings.analysis_cache_max_rows,
+    table="analysis_chunk_cache",
+)
+REGISTRY.counter("vox_analysis_chunk_cache_hits_total", "Transcript chunks served from the chunk cache.", fn=lambda: chunk_cache.hits)
+REGISTRY.counter("vox_analysis_chunk_cache_misses_total", "Transcript chunks summarised by the model.", fn=lambda: chunk_cache.misses)
 
-    Returns:
-        str: The analysis text.
-    """
-    instruction_template = """
+INSTRUCTION_TEMPLATE = """
     Task:
     {analyse_instruction}
     Context:
@@ -22,18 +46,236 @@ def analyse_notes(app_settings: AppSettings, notes: str) -> str:
     Transcription (message after "You" is what the user said):
     {notes}
     """
-    context = get_context(app_settings)
-    if app_settings.gemini_api_key:
-        client = genai.Client(api_key=app_settings.gemini_api_key)
-    else:
-        client = genai.Client()
-    final_instruction = instruction_template.format(
+
+CHUNK_TEMPLATE = """
+    Task:
+    Summarise this segment of a longer conversation so it can later be
+    analysed for the following task. Keep every detail relevant to the task,
+    including the user's own wording where it matters.
+    {analyse_instruction}
+    Context:
+    {context}
+    Segment (message after "You" is what the user said):
+    {chunk}
+    """
+
+REDUCE_TEMPLATE = """
+    Task:
+    {analyse_instruction}
+    Context:
+    {context}
+    The conversation was too long to analyse at once. These are summaries of
+    its consecutive segments, in order:
+    {summaries}
+    """
+
+
+def build_instruction(app_settings: AppSettings, notes: str) -> str:
+    """Formats the analysis prompt for the given app and transcript."""
+    return INSTRUCTION_TEMPLATE.format(
         analyse_instruction=app_settings.analyse_instruction,
-        context=context,
+        context=get_context(app_settings),
         notes=notes,
     )
+
+
+def cache_key(app_settings: AppSettings, notes: str, incremental: bool = False) -> str:
+    """Returns the analysis cache key for the given app and transcript."""
+    return analysis_digest(
+        analyse_instruction=app_settings.analyse_instruction,
+        context=get_context(app_settings),
+        notes=notes,
+        model=settings.analyse_model_name,
+        incremental=incremental,
+    )
+
+
+def chunk_notes(notes: str, max_chars: int = None) -> List[str]:
+    """
+    Splits notes into segments of whole turns of at most `max_chars`.
+
+    Segments are filled greedily from the start, so appending turns to the
+    notes only ever changes the last segment or adds new ones. A single turn
+    longer than `max_chars` becomes a segment of its own.
+
+    Args:
+        notes (str): The transcript, with turns separated by blank lines.
+        max_chars (int, optional): Segment size, `analysis_chunk_chars` by default.
+
+    Returns:
+        List[str]: The segments, which concatenate back to `notes`.
+    """
+    max_chars = max_chars or settings.analysis_chunk_chars
+    chunks = []
+    current = ""
+    for i, turn in enumerate(notes.split("\n\n")):
+        # The separator leads the next turn, so a closed segment never changes.
+        piece = "\n\n" + turn if i else turn
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current += piece
+    if current or not chunks:
+        chunks.append(current)
+    return chunks
+
+
+async def summarise_chunks(client, app_settings: AppSettings, chunks: List[str]) -> List[str]:
+    """
+    Summarises transcript segments concurrently, at most
+    `analysis_map_concurrency` model calls at a time.
+
+    Args:
+        client (genai.Client): The client used for the model calls.
+        app_settings (AppSettings): The application settings.
+        chunks (List[str]): The segments from `chunk_notes`.
+
+    Returns:
+        List[str]: One summary per segment, in order.
+    """
+    semaphore = asyncio.Semaphore(settings.analysis_map_concurrency)
+    context = get_context(app_settings)
+
+    async def summarise(chunk: str) -> str:
+        key = analysis_digest(
+            analyse_instruction=app_settings.analyse_instruction,
+            context=context,
+            chunk=chunk,
+            model=settings.analyse_model_name,
+        )
+        cached = await chunk_cache.aget(key)
+        if cached is not None:
+            return cached
+        async with semaphore:
+            response = await client.aio.models.generate_content(
+                model=settings.analyse_model_name,
+                contents=[CHUNK_TEMPLATE.format(
+                    analyse_instruction=app_settings.analyse_instruction,
+                    context=context,
+                    chunk=chunk,
+                )],
+            )
+        summary = response.text or ""
+        if summary:
+            await chunk_cache.aput(key, summary)
+        return summary
+
+    return await asyncio.gather(*(summarise(chunk) for chunk in chunks))
+
+
+def build_reduce_instruction(app_settings: AppSettings, summaries: List[str]) -> str:
+    """Formats the prompt that combines segment summaries into the analysis."""
+    return REDUCE_TEMPLATE.format(
+        analyse_instruction=app_settings.analyse_instruction,
+        context=get_context(app_settings),
+        summaries="\n".join(
+            f"Segment {i}:\n{summary}" for i, summary in enumerate(summaries, start=1)
+        ),
+    )
+
+
+def analyse_notes(app_settings: AppSettings, notes: str) -> str:
+    """
+    Analyzes the notes using the Gemini AI model.
+
+    Args:
+        app_settings (AppSettings): The application settings.
+        notes (str): The notes to be analyzed.
+
+    Returns:
+        str: The analysis text.
+    """
+    key = cache_key(app_settings, notes)
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        return cached
+    client = client_pool.get_client(app_settings.gemini_api_key)
     response = client.models.generate_content(
         model=settings.analyse_model_name,
-        contents=[final_instruction],
+        contents=[build_instruction(app_settings, notes)],
     )
+    if response.text:
+        analysis_cache.put(key, response.text)
     return response.text
+
+
+async def analyse_notes_async(app_settings: AppSettings, notes: str) -> str:
+    """Runs analyse_notes on the bounded analysis thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, analyse_notes, app_settings, notes)
+
+
+async def analyse_notes_incremental(app_settings: AppSettings, notes: str) -> str:
+    """
+    Analyzes long notes with a map-reduce over transcript segments.
+
+    Segments are summarised concurrently and cached by content, then the
+    summaries are combined into the final analysis. Notes that fit in one
+    segment are analysed directly.
+
+    Args:
+        app_settings (AppSettings): The application settings.
+        notes (str): The notes to be analyzed.
+
+    Returns:
+        str: The analysis text.
+    """
+    chunks = chunk_notes(notes)
+    if len(chunks) <= 1:
+        return await analyse_notes_async(app_settings, notes)
+    key = cache_key(app_settings, notes, incremental=True)
+    cached = await analysis_cache.aget(key)
+    if cached is not None:
+        return cached
+    client = client_pool.get_client(app_settings.gemini_api_key)
+    summaries = await summarise_chunks(client, app_settings, chunks)
+    response = await client.aio.models.generate_content(
+        model=settings.analyse_model_name,
+        contents=[build_reduce_instruction(app_settings, summaries)],
+    )
+    if response.text:
+        await analysis_cache.aput(key, response.text)
+    return response.text
+
+
+async def stream_analysis(
+    app_settings: AppSettings, notes: str, incremental: bool = False
+) -> AsyncIterator[str]:
+    """
+    Streams the analysis text as the model produces it.
+
+    Args:
+        app_settings (AppSettings): The application settings.
+        notes (str): The notes to be analyzed.
+        incremental (bool): Summarise long notes segment by segment first and
+            stream only the combining step.
+
+    Yields:
+        str: Successive non-empty chunks of the analysis text. A cached
+        analysis is yielded as a single chunk.
+    """
+    chunks = chunk_notes(notes) if incremental else None
+    incremental = bool(chunks) and len(chunks) > 1
+    key = cache_key(app_settings, notes, incremental=incremental)
+    cached = await analysis_cache.aget(key)
+    if cached is not None:
+        yield cached
+        return
+    client = client_pool.get_client(app_settings.gemini_api_key)
+    if incremental:
+        summaries = await summarise_chunks(client, app_settings, chunks)
+        instruction = build_reduce_instruction(app_settings, summaries)
+    else:
+        instruction = build_instruction(app_settings, notes)
+    stream = await client.aio.models.generate_content_stream(
+        model=settings.analyse_model_name,
+        contents=[instruction],
+    )
+    parts = []
+    async for chunk in stream:
+        if chunk.text:
+            parts.append(chunk.text)
+            yield chunk.text
+    if parts:
+        await analysis_cache.aput(key, "".join(parts))
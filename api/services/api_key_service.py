@@ -0,0 +1,91 @@
+import asyncio
+import hashlib
+import hmac
+import secrets
+from typing import Dict
+
+from api import sdk
+from api.exceptions import ApiKeyError
+from api.metrics import REGISTRY
+from api.services import client_pool
+from api.settings import settings
+from api.utils import LRUCache
+
+# Keys are remembered only as HMACs under a per-process salt, so the caches
+# never hold anything that could be replayed as a key.
+_salt = secrets.token_bytes(16)
+
+_verified = LRUCache(maxsize=settings.api_key_cache_size, ttl=settings.api_key_cache_ttl_seconds)
+_rejected = LRUCache(maxsize=settings.api_key_cache_size, ttl=settings.api_key_negative_ttl_seconds)
+_in_flight: Dict[str, asyncio.Future] = {}
+# Status codes with which the Gemini API rejects an invalid key.
+INVALID_KEY_STATUS_CODES = (400, 401, 403)
+
+REGISTRY.counter("vox_api_key_cache_hits_total", "API key checks answered from the verified-key cache.", fn=lambda: _verified.hits + _rejected.hits)
+UPSTREAM_CHECKS = REGISTRY.counter("vox_api_key_upstream_checks_total", "API key checks sent to the Gemini API.")
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Returns the salted hash under which a key's verification is cached."""
+    return hmac.new(_salt, api_key.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def check_api_key(api_key: str):
+    """
+    Verifies a key with a metadata lookup, which costs no generation quota.
+
+    Raises:
+        ApiKeyError: If the Gemini API rejects the key.
+    """
+    client = client_pool.get_client(api_key)
+    try:
+        client.models.get(model=settings.api_key_check_model)
+    except Exception as e:
+        client_pool.evict(api_key)
+        raise ApiKeyError(f"Invalid API Key: {str(e)}") from e
+
+
+async def _check(api_key: str, fingerprint: str):
+    UPSTREAM_CHECKS.inc()
+    try:
+        await asyncio.to_thread(check_api_key, api_key)
+    except ApiKeyError as e:
+        # Only a definite rejection of the key is remembered; rate limits,
+        # server errors and network failures are retried on the next request.
+        cause = e.__cause__
+        if isinstance(cause, sdk.genai_errors().ClientError) and cause.code in INVALID_KEY_STATUS_CODES:
+            _rejected.put(fingerprint, str(e))
+        raise
+    _verified.put(fingerprint, True)
+
+
+async def verify_api_key(api_key: str):
+    """
+    Verifies a Gemini API key, consulting the verified and rejected caches
+    first. Concurrent checks of the same key share one upstream request.
+
+    Args:
+        api_key (str): The key to verify.
+
+    Raises:
+        ApiKeyError: If the key is invalid.
+    """
+    fingerprint = key_fingerprint(api_key)
+    if _verified.get(fingerprint):
+        return
+    rejection = _rejected.get(fingerprint)
+    if rejection is not None:
+        raise ApiKeyError(rejection)
+    task = _in_flight.get(fingerprint)
+    if task is None:
+        task = asyncio.ensure_future(_check(api_key, fingerprint))
+        _in_flight[fingerprint] = task
+        task.add_done_callback(lambda _: _in_flight.pop(fingerprint, None))
+    # Shielded so one caller disconnecting does not cancel the others' check.
+    await asyncio.shield(task)
+
+
+def clear():
+    """Forgets every cached verification."""
+    _verified.clear()
+    _rejected.clear()
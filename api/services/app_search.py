@@ -0,0 +1,181 @@
+import base64
+import bisect
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from api.services import app_service
+from api.services.app_service import AppCatalog, AppEntry
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Fields a client may request with `fields=`, and how each is read from a config.
+FIELDS = {
+    "id": lambda app_id, data: app_id,
+    "name": lambda app_id, data: data.get("app_name", "Unnamed App"),
+    "summary": lambda app_id, data: data.get("agent_description", "No summary available."),
+    "goal": lambda app_id, data: data.get("goal_description", ""),
+    "language_code": lambda app_id, data: data.get("language_code"),
+    "context_keys": lambda app_id, data: sorted(data.get("context_dict") or {}),
+}
+DEFAULT_FIELDS = ("id", "name", "summary")
+
+
+def tokenize(text: str) -> Set[str]:
+    """Splits text into lowercase word tokens."""
+    return {token.lower() for token in TOKEN_PATTERN.findall(text or "")}
+
+
+def searchable_tokens(app_id: str, data: Dict[str, Any]) -> Set[str]:
+    """Returns the tokens an app is found by: its id, name, descriptions and context keys."""
+    context_keys = " ".join(str(key) for key in (data.get("context_dict") or {}))
+    text = " ".join([
+        app_id.replace("_", " "),
+        str(data.get("app_name") or ""),
+        str(data.get("agent_description") or ""),
+        str(data.get("goal_description") or ""),
+        context_keys.replace("_", " "),
+    ])
+    return tokenize(text)
+
+
+def encode_cursor(app_id: str) -> str:
+    return base64.urlsafe_b64encode(app_id.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> str:
+    """Returns the app id a cursor points past, raising ValueError if it is invalid."""
+    try:
+        return base64.b64decode(cursor.encode("ascii"), altchars=b"-_", validate=True).decode("utf-8")
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+class AppIndex:
+    """
+    Inverted index over an `AppCatalog`, updated from the catalog's change
+    notifications so only changed apps are re-indexed.
+
+    Query words match as prefixes and every word must match.
+
+    Args:
+        catalog (AppCatalog): The catalog to index.
+    """
+
+    def __init__(self, catalog: AppCatalog):
+        self.catalog = catalog
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Set[str]] = {}
+        self._tokens: Dict[str, Set[str]] = {}
+        self._vocabulary: Optional[List[str]] = None
+        catalog.listeners.append(self.update)
+        self.update(set(catalog.entries()))
+
+    def update(self, app_ids: Iterable[str]):
+        """Re-indexes the given apps, dropping those no longer in the catalog."""
+        with self._lock:
+            for app_id in app_ids:
+                for token in self._tokens.pop(app_id, ()):
+                    postings = self._postings.get(token)
+                    if postings is not None:
+                        postings.discard(app_id)
+                        if not postings:
+                            del self._postings[token]
+                entry: Optional[AppEntry] = self.catalog.cached(app_id)
+                if entry is None or entry.malformed:
+                    continue
+                tokens = searchable_tokens(app_id, entry.data)
+                self._tokens[app_id] = tokens
+                for token in tokens:
+                    self._postings.setdefault(token, set()).add(app_id)
+            self._vocabulary = None
+
+    def _prefix_matches(self, prefix: str) -> Set[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        matches: Set[str] = set()
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches |= self._postings[token]
+        return matches
+
+    def search(self, query: str) -> Set[str]:
+        """Returns the ids of the apps matching every word of the query."""
+        self.catalog.refresh()
+        words = tokenize(query)
+        with self._lock:
+            if not words:
+                return set(self._tokens)
+            result: Optional[Set[str]] = None
+            for word in sorted(words, key=len, reverse=True):
+                matches = self._prefix_matches(word)
+                result = matches if result is None else result & matches
+                if not result:
+                    break
+            return result or set()
+
+
+def select_fields(app_id: str, data: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Projects an app config onto the requested fields."""
+    return {field: FIELDS[field](app_id, data) for field in fields}
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Parses a comma-separated field list, raising ValueError for unknown fields."""
+    if not fields:
+        return DEFAULT_FIELDS
+    requested = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in requested if field not in FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+
+_index: Optional[AppIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> AppIndex:
+    """Returns the index over the app catalog, building it on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = AppIndex(app_service.catalog)
+        return _index
+
+
+def search_apps(
+    query: str = "",
+    fields: Iterable[str] = DEFAULT_FIELDS,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Searches the app catalog.
+
+    Args:
+        query (str): Words to match against name, descriptions and context keys.
+        fields (Iterable[str]): Fields to return for each app.
+        limit (int, optional): Page size; all matches when omitted.
+        cursor (str, optional): `next_cursor` of the previous page.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Optional[str]]: The page of apps ordered by
+        id, and the cursor for the next page or None on the last page.
+    """
+    app_ids = sorted(get_index().search(query))
+    if cursor:
+        after = decode_cursor(cursor)
+        app_ids = app_ids[bisect.bisect_right(app_ids, after):]
+    next_cursor = None
+    if limit is not None and len(app_ids) > limit:
+        app_ids = app_ids[:limit]
+        next_cursor = encode_cursor(app_ids[-1])
+    items = []
+    for app_id in app_ids:
+        entry = app_service.catalog.cached(app_id)
+        if entry is not None and not entry.malformed:
+            items.append(select_fields(app_id, entry.data, fields))
+    return items, next_cursor
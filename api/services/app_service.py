@@ -1,47 +1,178 @@
-import os
+import copy
+import hashlib
 import json
-from typing import List, Dict, Any
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set
 
 from api.settings import settings
 from ..exceptions import AppNotFoundError, MalformedAppConfigError
 
+
+@dataclass
+class AppEntry:
+    """A parsed app config together with the file state it was read from."""
+    mtime_ns: int
+    size: int
+    etag: str
+    data: Optional[Dict[str, Any]]
+
+    @property
+    def malformed(self) -> bool:
+        return self.data is None
+
+
+class AppCatalog:
+    """
+    In-memory catalog of the app configs in `app_settings_path`.
+
+    Files are re-read only when their mtime or size changes. The directory
+    is checked at most once per `check_interval` seconds, so requests in
+    between are served entirely from memory.
+
+    Args:
+        path (str, optional): Directory of app JSON files.
+        check_interval (float, optional): Seconds between change checks.
+    """
+
+    def __init__(self, path: Optional[str] = None, check_interval: Optional[float] = None):
+        self.path = path or settings.app_settings_path
+        self.check_interval = (
+            settings.app_catalog_check_interval_seconds if check_interval is None else check_interval
+        )
+        self._lock = threading.Lock()
+        self._entries: Dict[str, AppEntry] = {}
+        self._etag: Optional[str] = None
+        self._checked_at: Optional[float] = None
+        self.version = 0
+        self.listeners: List[Callable[[Set[str]], None]] = []
+
+    def refresh(self, force: bool = False) -> Set[str]:
+        """
+        Re-reads changed, added and removed app files.
+
+        Args:
+            force (bool): Check now even if `check_interval` has not passed.
+
+        Returns:
+            Set[str]: The ids of the apps that changed.
+        """
+        now = time.monotonic()
+        if not force and self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return set()
+        with self._lock:
+            try:
+                files = [
+                    entry for entry in os.scandir(self.path)
+                    if entry.name.endswith(".json") and entry.is_file()
+                ]
+            except FileNotFoundError:
+                raise AppNotFoundError("The apps directory was not found.")
+            changed = set()
+            seen = set()
+            for file in files:
+                app_id = file.name[: -len(".json")]
+                seen.add(app_id)
+                stat = file.stat()
+                current = self._entries.get(app_id)
+                if current and current.mtime_ns == stat.st_mtime_ns and current.size == stat.st_size:
+                    continue
+                self._entries[app_id] = self._load(file.path, stat)
+                changed.add(app_id)
+            for app_id in set(self._entries) - seen:
+                del self._entries[app_id]
+                changed.add(app_id)
+            if changed:
+                self.version += 1
+                self._etag = None
+            self._checked_at = now
+        if changed:
+            for listener in self.listeners:
+                listener(changed)
+        return changed
+
+    @staticmethod
+    def _load(path: str, stat: os.stat_result) -> AppEntry:
+        with open(path, "rb") as f:
+            raw = f.read()
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            data = None
+        return AppEntry(
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            etag=f'"{hashlib.sha256(raw).hexdigest()[:32]}"',
+            data=data,
+        )
+
+    def get(self, app_id: str) -> Optional[AppEntry]:
+        """Returns the entry for an app, or None when there is no such app."""
+        self.refresh()
+        return self._entries.get(app_id)
+
+    def cached(self, app_id: str) -> Optional[AppEntry]:
+        """Returns the entry as of the last refresh, without checking for changes."""
+        return self._entries.get(app_id)
+
+    def entries(self) -> Dict[str, AppEntry]:
+        """Returns a snapshot of every entry, keyed by app id."""
+        self.refresh()
+        return dict(self._entries)
+
+    @property
+    def etag(self) -> str:
+        """Returns a validator that changes whenever any app changes."""
+        self.refresh()
+        with self._lock:
+            if self._etag is None:
+                digest = hashlib.sha256()
+                for app_id in sorted(self._entries):
+                    digest.update(f"{app_id}:{self._entries[app_id].etag}\n".encode("utf-8"))
+                self._etag = f'"{digest.hexdigest()[:32]}"'
+            return self._etag
+
+
+catalog = AppCatalog()
+
+
 def get_app_settings(app_id: str) -> Dict[str, Any]:
     """
     Retrieves the settings for a specific app.
     """
-    filepath = os.path.join(settings.app_settings_path, f"{app_id}.json")
-    if not os.path.exists(filepath):
+    entry = catalog.get(app_id)
+    if entry is None:
         raise AppNotFoundError(f"App with id '{app_id}' not found.")
-
-    try:
-        with open(filepath, "r") as f:
-            app_settings = json.load(f)
-        return app_settings
-    except json.JSONDecodeError:
+    if entry.malformed:
         raise MalformedAppConfigError(f"The configuration file for app '{app_id}' is malformed.")
+    return copy.deepcopy(entry.data)
+
+def get_app_settings_etag(app_id: str) -> Optional[str]:
+    """
+    Returns the ETag of an app's settings, or None when there is no such app.
+    """
+    entry = catalog.get(app_id)
+    return entry.etag if entry is not None else None
 
 def get_apps() -> List[Dict[str, Any]]:
     """
-    Reads all app example JSON files, extracts key information,
-    and returns a list of app configurations.
+    Returns the id, name and summary of every app in the catalog.
     """
     apps = []
-    try:
-        app_files = [f for f in os.listdir(settings.app_settings_path) if f.endswith(".json")]
-
-        for filename in app_files:
-            filepath = os.path.join(settings.app_settings_path, filename)
-            try:
-                with open(filepath, "r") as f:
-                    data = json.load(f)
-                    apps.append({
-                        "id": filename.replace(".json", ""),
-                        "name": data.get("app_name", "Unnamed App"),
-                        "summary": data.get("agent_description", "No summary available.")
-                    })
-            except json.JSONDecodeError:
-                raise MalformedAppConfigError(f"The configuration file '{filename}' is malformed.")
-    except FileNotFoundError:
-        raise AppNotFoundError("The apps directory was not found.")
-
+    for app_id, entry in sorted(catalog.entries().items()):
+        if entry.malformed:
+            raise MalformedAppConfigError(f"The configuration file '{app_id}.json' is malformed.")
+        apps.append({
+            "id": app_id,
+            "name": entry.data.get("app_name", "Unnamed App"),
+            "summary": entry.data.get("agent_description", "No summary available.")
+        })
     return apps
+
+def get_apps_etag() -> str:
+    """
+    Returns the ETag of the app list.
+    """
+    return catalog.etag
@@ -0,0 +1,99 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def prompt_digest(prompt: str, model: str) -> str:
+    """Returns the content address of the avatar generated for a prompt."""
+    return hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+class AvatarCache:
+    """
+    Content-addressed on-disk store of generated avatars.
+
+    Each image is saved as `<digest>.png`. When the directory grows past
+    `max_bytes`, the least recently read images are removed first.
+
+    Args:
+        directory (str): Where the images are kept, created when missing.
+        max_bytes (int): Upper bound for the total size of the images.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path(self, digest: str) -> str:
+        """Returns the file path for a digest, rejecting anything else."""
+        if not DIGEST_PATTERN.match(digest):
+            raise ValueError(f"Invalid avatar digest: {digest!r}")
+        return os.path.join(self.directory, f"{digest}.png")
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """Returns the cached image, or None when it is not cached."""
+        path = self.path(digest)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            # Eviction orders by mtime, since many filesystems mount noatime.
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, digest: str, data: bytes):
+        """Stores an image atomically, then evicts down to `max_bytes`."""
+        path = self.path(digest)
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            try:
+                entries = [
+                    entry for entry in os.scandir(self.directory)
+                    if entry.is_file() and entry.name.endswith(".png")
+                ]
+            except FileNotFoundError:
+                return
+            stats = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries]
+            total = sum(size for _, size, _ in stats)
+            for _, size, path in sorted(stats):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
+                logger.info(f"Evicted cached avatar {os.path.basename(path)}")
+
+    def clear(self):
+        """Removes every cached image."""
+        with self._lock:
+            if not os.path.isdir(self.directory):
+                return
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".png"):
+                    os.unlink(entry.path)
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+from uuid import uuid4
+
+from api.settings import settings
+from api.utils import LRUCache
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class AvatarJob:
+    """An avatar generation, shared by every request for the same prompt and API key."""
+    id: str
+    digest: str
+    future: Future
+    # Identifies the API key the generation runs with.
+    owner: str = ""
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def status(self) -> str:
+        if not self.future.done():
+            return RUNNING if self.future.running() else PENDING
+        return FAILED if self.error is not None else DONE
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        """The exception the generation failed with, if it has finished."""
+        if self.future.cancelled():
+            return CancelledError()
+        return self.future.exception() if self.future.done() else None
+
+
+class AvatarJobQueue:
+    """
+    Runs avatar generations on a bounded worker pool, off the event loop.
+
+    Submitting a prompt whose generation is still in flight with the same
+    API key returns the existing job instead of starting another one. Finished jobs stay
+    queryable for `retention_seconds`.
+
+    Args:
+        max_workers (int, optional): Concurrent generations.
+        history (int, optional): Jobs kept for polling.
+        retention_seconds (float, optional): How long jobs stay queryable.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        history: Optional[int] = None,
+        retention_seconds: Optional[float] = None,
+    ):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.avatar_workers,
+            thread_name_prefix="avatar",
+        )
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple[str, str], AvatarJob] = {}
+        self._jobs = LRUCache(
+            maxsize=history or settings.avatar_job_history,
+            ttl=retention_seconds or settings.avatar_job_retention_seconds,
+        )
+        self.submitted = 0
+        self.coalesced = 0
+
+    def submit(self, digest: str, generate: Callable[[], bytes], owner: str = "") -> AvatarJob:
+        """
+        Starts a generation for `digest`, or joins the one in flight.
+
+        Args:
+            digest (str): Content address of the avatar being generated.
+            generate (Callable[[], bytes]): Produces the PNG bytes.
+            owner (str): Identifies the API key, so callers only join
+                generations that run with their own key.
+
+        Returns:
+            AvatarJob: The job producing the avatar.
+        """
+        with self._lock:
+            job = self._in_flight.get((digest, owner))
+            if job is not None:
+                self.coalesced += 1
+                return job
+            job = AvatarJob(id=uuid4().hex, digest=digest, future=self._executor.submit(generate), owner=owner)
+            self._in_flight[(digest, owner)] = job
+            self._jobs.put(job.id, job)
+            self.submitted += 1
+        job.future.add_done_callback(lambda _: self._finish(job))
+        return job
+
+    def completed(self, digest: str, image_data: bytes) -> AvatarJob:
+        """Returns a finished job for an avatar that is already available."""
+        future = Future()
+        future.set_result(image_data)
+        job = AvatarJob(id=uuid4().hex, digest=digest, future=future)
+        self._jobs.put(job.id, job)
+        return job
+
+    def _finish(self, job: AvatarJob):
+        with self._lock:
+            if self._in_flight.get((job.digest, job.owner)) is job:
+                del self._in_flight[(job.digest, job.owner)]
+
+    def get(self, job_id: str) -> Optional[AvatarJob]:
+        """Returns a job by id, or None once it is unknown or expired."""
+        return self._jobs.get(job_id)
+
+    async def wait(self, job: AvatarJob, timeout: Optional[float] = None) -> bool:
+        """Waits for a job to finish and returns whether it has."""
+        try:
+            # Shielded so a timed-out waiter does not cancel the generation.
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout)
+        except asyncio.TimeoutError:
+            return False
+        except Exception:
+            pass
+        return True
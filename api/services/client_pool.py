@@ -0,0 +1,77 @@
+import hashlib
+import os
+import ssl
+from typing import TYPE_CHECKING, Optional
+
+import certifi
+import httpx
+
+from api import sdk
+from api.metrics import REGISTRY
+from api.settings import settings
+from api.utils import LRUCache
+
+if TYPE_CHECKING:
+    from google import genai
+
+# One SSL context shared by every client, so a new API key skips loading the
+# CA bundle. Each client keeps its own transport: the SDK closes a client's
+# transport when the client is garbage-collected after eviction, which would
+# break every other client if the transport were shared.
+_ssl_context = ssl.create_default_context(
+    cafile=os.environ.get("SSL_CERT_FILE", certifi.where()),
+    capath=os.environ.get("SSL_CERT_DIR"),
+)
+
+# Keyed by a hash of the API key so raw keys are never held as cache keys.
+_clients = LRUCache(
+    maxsize=settings.genai_client_pool_size,
+    ttl=settings.genai_client_idle_seconds,
+    sliding=True,
+)
+REGISTRY.counter("vox_genai_client_pool_hits_total", "Gemini clients reused from the pool.", fn=lambda: _clients.hits)
+REGISTRY.counter("vox_genai_client_pool_misses_total", "Gemini clients created by the pool.", fn=lambda: _clients.misses)
+
+
+def _resolve_api_key(api_key: Optional[str]) -> Optional[str]:
+    return api_key or os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")
+
+
+def key_digest(api_key: str) -> str:
+    """Returns the hash used to identify an API key."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def get_client(api_key: Optional[str] = None) -> "genai.Client":
+    """
+    Returns a pooled `genai.Client` for the API key.
+
+    Without an explicit key the key from the environment is used, matching
+    `genai.Client()`. Clients idle for `genai_client_idle_seconds` are evicted,
+    as is the least recently used one when the pool is full.
+    """
+    resolved_key = _resolve_api_key(api_key)
+    if not resolved_key:
+        return sdk.genai().Client()
+    digest = key_digest(resolved_key)
+    client = _clients.get(digest)
+    if client is None:
+        client = sdk.genai().Client(
+            api_key=resolved_key,
+            http_options={
+                "client_args": {"transport": httpx.HTTPTransport(verify=_ssl_context)},
+                "async_client_args": {"verify": _ssl_context},
+            },
+        )
+        _clients.put(digest, client)
+    return client
+
+
+def evict(api_key: str):
+    """Removes the client of an API key from the pool."""
+    _clients.pop(key_digest(api_key))
+
+
+def clear():
+    """Removes every pooled client."""
+    _clients.clear()
@@ -0,0 +1,358 @@
+"""
+Server-side transcripts of live sessions.
+
+The messaging loop records every transcription fragment and turn event it
+sends to the client in a `TranscriptLog`. Appending only queues the record; a
+writer thread commits queued records in batches, so the websocket loop never
+waits on disk. Transcripts outlive their connection for
+`transcript_retention_seconds`, so `/api/analyse` can read them by session id.
+
+Backends:
+
+- `JsonlBackend`: one `<session_id>.jsonl` file per session.
+- `SqliteBackend`: one WAL-mode table shared by every session.
+"""
+import abc
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from api.exceptions import TranscriptNotFoundError
+from api.metrics import REGISTRY
+from api.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Record kinds
+INPUT = "input"
+OUTPUT = "output"
+TURN_COMPLETE = "turn_complete"
+INTERRUPTED = "interrupted"
+
+SPEAKERS = {INPUT: "You", OUTPUT: "Agent"}
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+PRUNE_INTERVAL_SECONDS = 600
+
+RECORDS_WRITTEN = REGISTRY.counter("vox_transcript_records_total", "Transcript records written.")
+BATCHES_WRITTEN = REGISTRY.counter("vox_transcript_batches_total", "Transcript batches committed.")
+
+Record = Dict[str, object]
+
+
+def is_valid_session_id(session_id: str) -> bool:
+    """Checks that a session id is safe to use as a file name."""
+    return bool(SESSION_ID_PATTERN.match(session_id or ""))
+
+
+def render_notes(records: List[Record]) -> str:
+    """
+    Renders transcript records as the notes the client builds from the same
+    messages: consecutive fragments of one speaker are joined into a
+    `**You:**` or `**Agent:**` paragraph.
+    """
+    notes = ""
+    speaker = None
+    for record in records:
+        name = SPEAKERS.get(record["kind"])
+        if name is None:
+            continue
+        if name != speaker:
+            notes += f"\n\n**{name}:** "
+            speaker = name
+        notes += record["text"]
+    return notes
+
+
+class TranscriptBackend(abc.ABC):
+    """Durable storage of transcript records."""
+
+    @abc.abstractmethod
+    def write(self, batch: Dict[str, List[Record]]):
+        """Appends records, grouped by session id, in one operation."""
+
+    @abc.abstractmethod
+    def read(self, session_id: str) -> List[Record]:
+        """Returns the records of a session in order, empty when there are none."""
+
+    @abc.abstractmethod
+    def prune(self, older_than: float) -> int:
+        """Deletes sessions without records since `older_than` and returns how many."""
+
+    def close(self):
+        """Releases the backend."""
+
+
+class JsonlBackend(TranscriptBackend):
+    """
+    Keeps each session in its own JSON Lines file.
+
+    Args:
+        directory (str): Folder of the files, created on the first write.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.jsonl")
+
+    def write(self, batch: Dict[str, List[Record]]):
+        os.makedirs(self.directory, exist_ok=True)
+        for session_id, records in batch.items():
+            lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+            with open(self.path(session_id), "a", encoding="utf-8") as f:
+                f.write(lines)
+
+    def read(self, session_id: str) -> List[Record]:
+        try:
+            with open(self.path(session_id), encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def prune(self, older_than: float) -> int:
+        if not os.path.isdir(self.directory):
+            return 0
+        pruned = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".jsonl") and entry.stat().st_mtime < older_than:
+                try:
+                    os.remove(entry.path)
+                    pruned += 1
+                except FileNotFoundError:
+                    pass
+        return pruned
+
+
+class SqliteBackend(TranscriptBackend):
+    """
+    Keeps every session in one SQLite table in WAL mode.
+
+    Args:
+        path (str): Database file, created when missing.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS transcript ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+            "ts REAL NOT NULL, kind TEXT NOT NULL, text TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS transcript_session ON transcript (session_id, id)")
+
+    def write(self, batch: Dict[str, List[Record]]):
+        rows = [
+            (session_id, record["ts"], record["kind"], record.get("text", ""))
+            for session_id, records in batch.items()
+            for record in records
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO transcript (session_id, ts, kind, text) VALUES (?, ?, ?, ?)", rows
+                )
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def read(self, session_id: str) -> List[Record]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ts, kind, text FROM transcript WHERE session_id = ? ORDER BY id", (session_id,)
+            ).fetchall()
+        return [{"ts": ts, "kind": kind, "text": text} for ts, kind, text in rows]
+
+    def prune(self, older_than: float) -> int:
+        with self._lock:
+            stale = self._conn.execute(
+                "SELECT session_id FROM transcript GROUP BY session_id HAVING MAX(ts) < ?", (older_than,)
+            ).fetchall()
+            self._conn.executemany("DELETE FROM transcript WHERE session_id = ?", stale)
+        return len(stale)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SessionTranscript:
+    """The transcript of one session, as recorded by the messaging loop."""
+
+    def __init__(self, log: "TranscriptLog", session_id: str):
+        self.log = log
+        self.session_id = session_id
+
+    def input(self, text: str):
+        self.log.append(self.session_id, INPUT, text)
+
+    def output(self, text: str):
+        self.log.append(self.session_id, OUTPUT, text)
+
+    def turn(self, turn_complete: bool, interrupted: bool):
+        if turn_complete:
+            self.log.append(self.session_id, TURN_COMPLETE)
+        if interrupted:
+            self.log.append(self.session_id, INTERRUPTED)
+
+
+class TranscriptLog:
+    """
+    Batches transcript records from the event loop into a backend.
+
+    `append` never blocks: records go to a queue drained by a writer thread,
+    which commits up to `batch_size` records at a time and at least every
+    `flush_interval_ms`. Records queued when the process dies are lost.
+
+    Args:
+        backend (TranscriptBackend): Where records are written.
+        batch_size (int, optional): Records committed in one write.
+        flush_interval_ms (int, optional): Longest time a record stays queued.
+        retention_seconds (int, optional): How long transcripts are kept after
+            their last record.
+    """
+
+    def __init__(
+        self,
+        backend: TranscriptBackend,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        retention_seconds: Optional[int] = None,
+    ):
+        self.backend = backend
+        self.batch_size = batch_size or settings.transcript_batch_size
+        self.flush_interval = (flush_interval_ms or settings.transcript_flush_interval_ms) / 1000
+        self.retention = settings.transcript_retention_seconds if retention_seconds is None else retention_seconds
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._last_prune = 0.0
+
+    def session(self, session_id: str) -> SessionTranscript:
+        """Returns a recorder bound to one session."""
+        return SessionTranscript(self, session_id)
+
+    def append(self, session_id: str, kind: str, text: str = ""):
+        """Queues a record for the session."""
+        self._start()
+        self._queue.put((session_id, {"ts": time.time(), "kind": kind, "text": text}))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Blocks until everything appended so far is written."""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def read(self, session_id: str) -> List[Record]:
+        """Flushes queued records and returns the session's transcript."""
+        if not is_valid_session_id(session_id):
+            raise TranscriptNotFoundError(f"Invalid session id: {session_id!r}")
+        self.flush()
+        records = self.backend.read(session_id)
+        if not records:
+            raise TranscriptNotFoundError(f"No transcript for session {session_id}.")
+        return records
+
+    def notes(self, session_id: str) -> str:
+        """Returns the session's transcript rendered as analysis notes."""
+        return render_notes(self.read(session_id))
+
+    def close(self):
+        """Writes queued records and stops the writer thread."""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+        self.backend.close()
+
+    def _start(self):
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="transcript-writer", daemon=True)
+                self._writer.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch: Dict[str, List[Record]] = defaultdict(list)
+            waiters: List[threading.Event] = []
+            count = 0
+            deadline = None
+            while count < self.batch_size:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                session_id, record = item
+                batch[session_id].append(record)
+                count += 1
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            if batch:
+                self._write(batch, count)
+            for waiter in waiters:
+                waiter.set()
+            self._prune()
+
+    def _write(self, batch: Dict[str, List[Record]], count: int):
+        try:
+            self.backend.write(batch)
+        except Exception as e:
+            logger.error(f"Failed to write {count} transcript records: {e}")
+            return
+        RECORDS_WRITTEN.inc(count)
+        BATCHES_WRITTEN.inc()
+
+    def _prune(self):
+        now = time.time()
+        if not self.retention or now - self._last_prune < PRUNE_INTERVAL_SECONDS:
+            return
+        self._last_prune = now
+        try:
+            pruned = self.backend.prune(now - self.retention)
+        except Exception as e:
+            logger.error(f"Failed to prune transcripts: {e}")
+            return
+        if pruned:
+            logger.info(f"Pruned {pruned} expired transcripts.")
+
+
+def create_transcript_log() -> Optional[TranscriptLog]:
+    """Returns a log for the configured `transcript_store`, or None when disabled."""
+    if settings.transcript_store == "none":
+        return None
+    if settings.transcript_store == "sqlite":
+        backend = SqliteBackend(os.path.join(settings.transcript_path, "transcripts.db"))
+    else:
+        backend = JsonlBackend(settings.transcript_path)
+    return TranscriptLog(backend)
+
+
+transcript_log = create_transcript_log()
@@ -1,5 +1,6 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
-from typing import Dict, Optional
+from typing import Dict, Literal, Optional
 
 class AppSettings(BaseSettings):
     app_name: str
@@ -11,6 +12,9 @@ class AppSettings(BaseSettings):
     language_code: str
     gemini_api_key: Optional[str] = None
     search_tool: Optional[bool] = False
+    vad_enabled: Optional[bool] = False
+    vad_mode: Optional[Literal["suppress", "thin"]] = "thin"
+    vad_energy_threshold_dbfs: Optional[float] = None
 
 class GlobalSettings(BaseSettings):
     default_app_id: str = "language_pal"
@@ -18,9 +22,66 @@ class GlobalSettings(BaseSettings):
     live_model_name: str = "gemini-2.5-flash-live-preview"
     image_model_name: str = "gemini-2.0-flash-preview-image-generation"
     analyse_model_name: str = "gemini-2.5-flash"
+    outbound_queue_size: int = 256
+    outbound_overflow_policy: Literal["drop_oldest", "disconnect"] = "drop_oldest"
+    context_debounce_ms: int = 150
+    resume_grace_seconds: int = 30
+    resume_replay_size: int = 256
+    context_snapshot_every: int = 20
+    context_snapshot_interval_seconds: int = 30
+    ingress_frame_ms: int = 40
+    ingress_max_latency_ms: int = 60
+    vad_energy_threshold_dbfs: float = -45.0
+    vad_hangover_ms: int = 600
+    vad_thin_keep_every: int = 5
+    session_idle_ttl_seconds: int = 120
+    session_sweep_interval_seconds: int = 30
+    # Only agent sessions are shared through the store. Resume tokens and the
+    # warm agent pool stay in each worker, so a reconnect must reach the same one.
+    session_store: Literal["memory", "sqlite", "redis"] = "memory"
+    session_store_path: str = ".cache/sessions.db"
+    # A redis:// URL, or "local" for an in-process stand-in (tests only).
+    session_store_url: Optional[str] = None
+    session_store_batch_size: int = 64
+    session_store_flush_interval_ms: int = 200
+    transcript_store: Literal["jsonl", "sqlite", "none"] = "jsonl"
+    transcript_path: str = ".cache/transcripts"
+    transcript_batch_size: int = 128
+    transcript_flush_interval_ms: int = 500
+    transcript_retention_seconds: int = 86400
+    genai_client_pool_size: int = 64
+    genai_client_idle_seconds: int = 600
+    agent_cache_size: int = 32
+    analyse_max_workers: int = 4
+    analysis_cache_size: int = 256
+    analysis_cache_ttl_seconds: int = 86400
+    analysis_cache_path: Optional[str] = None
+    analysis_cache_max_rows: int = 10000
+    analysis_chunk_chars: int = 6000
+    analysis_map_concurrency: int = 4
+    analysis_chunk_cache_size: int = 1024
+    api_key_check_model: str = "gemini-2.0-flash"
+    api_key_cache_size: int = 1024
+    api_key_cache_ttl_seconds: int = 3600
+    api_key_negative_ttl_seconds: int = 60
+    avatar_cache_dir: str = ".cache/avatars"
+    avatar_cache_max_bytes: int = 64 * 1024 * 1024
+    avatar_workers: int = 2
+    avatar_job_history: int = 64
+    avatar_job_retention_seconds: int = 600
+    app_catalog_check_interval_seconds: float = 1.0
+    apps_page_size_max: int = 100
+    frontend_dist_path: str = "frontend/dist"
+    static_memory_max_bytes: int = 512 * 1024
 
     class Config:
         env_file = ".env"
         extra = "ignore"
 
+    @model_validator(mode="after")
+    def check_session_store(self):
+        if self.session_store == "redis" and not self.session_store_url:
+            raise ValueError("session_store=redis requires session_store_url.")
+        return self
+
 settings = GlobalSettings()
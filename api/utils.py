@@ -1,3 +1,8 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
 from api.settings import AppSettings
 
 
@@ -16,3 +21,77 @@ def get_context(app_settings: AppSettings) -> dict:
         for k, v in app_settings.context_dict.items()
         if v.get("value")
     }
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with an optional time-to-live.
+
+    Args:
+        maxsize (int): Maximum number of entries kept.
+        ttl (float, optional): Seconds after which an entry expires.
+        sliding (bool): Restart the TTL on every hit, so only idle entries expire.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None, sliding: bool = False):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sliding = sliding
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the cached value, or `default` when missing or expired."""
+        with self._lock:
+            entry = self._data.get(key, self._MISSING)
+            if entry is not self._MISSING:
+                value, expires_at = entry
+                now = time.monotonic()
+                if expires_at is None or expires_at > now:
+                    if self.sliding and expires_at is not None:
+                        self._data[key] = (value, now + self.ttl)
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        """Stores a value, evicting the least recently used entry when full."""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Removes an entry and returns its value."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Returns whether a live entry exists, without counting a hit or a miss."""
+        with self._lock:
+            entry = self._data.get(key)
+        return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    def clear(self):
+        """Removes every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit and miss counters and the current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+from typing import Optional
+
+import numpy as np
+
+from api import sdk
+from api.metrics import VAD_FRAMES_DROPPED
+from api.settings import AppSettings, settings
+
+logger = logging.getLogger(__name__)
+
+# The browser recorder captures mono 16-bit PCM at 16 kHz.
+INPUT_SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+VAD_MODE_SUPPRESS = "suppress"
+VAD_MODE_THIN = "thin"
+# Analysis window of the detector, 10 ms at 16 kHz.
+VAD_WINDOW_SAMPLES = 160
+
+
+class VoiceActivityDetector:
+    """
+    Energy / zero-crossing voice activity detector with hangover.
+
+    Each frame is split into 10 ms windows that are scored in one vectorized
+    pass. A window counts as speech when it is louder than the energy
+    threshold, or slightly quieter but with the high zero-crossing rate of
+    unvoiced consonants. Frames within `hangover_ms` of the last speech are
+    always kept so the live model still hears the pause that ends a turn;
+    later silent frames are dropped ("suppress") or only one in
+    `thin_keep_every` is forwarded ("thin"). `speech_ended` is set by the
+    frame that uses up the hangover, the end of the utterance.
+    """
+
+    def __init__(
+        self,
+        mode: str = VAD_MODE_THIN,
+        energy_threshold_dbfs: Optional[float] = None,
+        hangover_ms: Optional[int] = None,
+        thin_keep_every: Optional[int] = None,
+    ):
+        if mode not in (VAD_MODE_SUPPRESS, VAD_MODE_THIN):
+            raise ValueError(f"Unknown VAD mode: {mode}")
+        self.mode = mode
+        self.energy_threshold_dbfs = (
+            settings.vad_energy_threshold_dbfs if energy_threshold_dbfs is None else energy_threshold_dbfs
+        )
+        hangover_ms = settings.vad_hangover_ms if hangover_ms is None else hangover_ms
+        self.hangover_samples = INPUT_SAMPLE_RATE * hangover_ms // 1000
+        self.thin_keep_every = thin_keep_every or settings.vad_thin_keep_every
+        self._samples_since_speech = self.hangover_samples
+        self._silent_frames = 0
+        self.speech_ended = False
+        self.frames_in = 0
+        self.frames_dropped = 0
+
+    @classmethod
+    def from_app_settings(cls, app_settings: AppSettings) -> Optional["VoiceActivityDetector"]:
+        """Creates the detector configured by an app, or None when the app does not enable it."""
+        if not app_settings.vad_enabled:
+            return None
+        return cls(
+            mode=app_settings.vad_mode or VAD_MODE_THIN,
+            energy_threshold_dbfs=app_settings.vad_energy_threshold_dbfs,
+        )
+
+    def is_speech(self, pcm: bytes) -> bool:
+        """Returns whether any 10 ms window of the int16 PCM frame contains speech."""
+        samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % SAMPLE_WIDTH], dtype="<i2")
+        usable = len(samples) - len(samples) % VAD_WINDOW_SAMPLES
+        if usable:
+            windows = samples[:usable].reshape(-1, VAD_WINDOW_SAMPLES)
+        else:
+            windows = samples.reshape(1, -1)
+        if windows.shape[1] < 2:
+            return False
+        values = windows.astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(values * values, axis=1))
+        energy_dbfs = 20.0 * np.log10(np.maximum(rms, 1e-9))
+        signs = np.signbit(windows)
+        zero_crossing_rate = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+        voiced = energy_dbfs > self.energy_threshold_dbfs
+        unvoiced = (energy_dbfs > self.energy_threshold_dbfs - 10.0) & (zero_crossing_rate > 0.3)
+        return bool(np.any(voiced | unvoiced))
+
+    def accept(self, pcm: bytes) -> bool:
+        """Returns whether the frame should be forwarded to the live model."""
+        self.frames_in += 1
+        if self.is_speech(pcm):
+            self._samples_since_speech = 0
+            self._silent_frames = 0
+            return True
+        in_hangover = self._samples_since_speech < self.hangover_samples
+        self._samples_since_speech += len(pcm) // SAMPLE_WIDTH
+        if in_hangover:
+            self.speech_ended = self._samples_since_speech >= self.hangover_samples
+            return True
+        self._silent_frames += 1
+        if self.mode == VAD_MODE_THIN and (self._silent_frames - 1) % self.thin_keep_every == 0:
+            return True
+        self.frames_dropped += 1
+        VAD_FRAMES_DROPPED.inc()
+        return False
+
+
+class AudioAggregator:
+    """
+    Aggregates incoming PCM chunks into frames of a target duration before
+    forwarding them to the `LiveRequestQueue`.
+
+    Complete frames are sent as soon as they are available (several at once
+    when a client sends a large chunk), the remainder is kept in a
+    preallocated buffer, and a timer flushes it once it has waited for
+    `max_latency_ms` so partial frames never sit in the buffer indefinitely.
+    Only whole 16-bit samples are sent; a trailing odd byte waits for the
+    next chunk. An optional `VoiceActivityDetector` gates every frame before
+    it is sent, and the remainder is flushed as soon as it reports the end of
+    speech, the real turn boundary.
+    """
+
+    def __init__(
+        self,
+        live_request_queue,
+        frame_ms: Optional[int] = None,
+        max_latency_ms: Optional[int] = None,
+        mime_type: str = "audio/pcm",
+        vad: Optional[VoiceActivityDetector] = None,
+    ):
+        self.live_request_queue = live_request_queue
+        self.vad = vad
+        frame_ms = settings.ingress_frame_ms if frame_ms is None else frame_ms
+        max_latency_ms = settings.ingress_max_latency_ms if max_latency_ms is None else max_latency_ms
+        self.frame_bytes = INPUT_SAMPLE_RATE * SAMPLE_WIDTH * frame_ms // 1000
+        self.frame_bytes -= self.frame_bytes % SAMPLE_WIDTH
+        self.max_latency = max_latency_ms / 1000
+        self.mime_type = mime_type
+        self._blob = sdk.genai_types().Blob
+        self._buffer = bytearray(max(self.frame_bytes, SAMPLE_WIDTH))
+        self._size = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.chunks_in = 0
+        self.blobs_out = 0
+
+    def push(self, data: bytes):
+        """Adds a PCM chunk, sending every complete frame that is now available."""
+        if not data:
+            return
+        self.chunks_in += 1
+        if self.frame_bytes <= 0:
+            self._buffer[self._size:self._size + len(data)] = data
+            self._size += len(data)
+            self.flush()
+            return
+
+        total = self._size + len(data)
+        if total < self.frame_bytes:
+            self._buffer[self._size:total] = data
+            self._size = total
+            self._start_timer()
+            return
+
+        ready = total - total % self.frame_bytes
+        consumed = ready - self._size
+        if self._size:
+            payload = bytes(self._buffer[:self._size]) + data[:consumed]
+        else:
+            payload = bytes(data[:consumed])
+        remainder = len(data) - consumed
+        self._buffer[:remainder] = data[consumed:]
+        self._size = remainder
+        self._cancel_timer()
+        self._send(payload)
+        if self._size:
+            self._start_timer()
+
+    def flush(self, gated: bool = True):
+        """
+        Sends the whole samples buffered, e.g. on a turn boundary or when the
+        latency budget expires. Ungated sends bypass the VAD.
+        """
+        self._cancel_timer()
+        whole = self._size - self._size % SAMPLE_WIDTH
+        if whole:
+            payload = bytes(self._buffer[:whole])
+            self._buffer[:self._size - whole] = self._buffer[whole:self._size]
+            self._size -= whole
+            self._send(payload, gated=gated)
+
+    def close(self):
+        """Stops the latency timer without sending the buffered remainder."""
+        self._cancel_timer()
+        self._size = 0
+        if self.vad:
+            logger.info(
+                "VAD dropped %d of %d audio frames", self.vad.frames_dropped, self.vad.frames_in
+            )
+
+    def _send(self, payload: bytes, gated: bool = True):
+        if gated and self.vad and not self.vad.accept(payload):
+            return
+        self.blobs_out += 1
+        self.live_request_queue.send_realtime(self._blob(data=payload, mime_type=self.mime_type))
+        if gated and self.vad and self.vad.speech_ended:
+            # The remainder is the tail of the pause; the model should not wait for it.
+            self.vad.speech_ended = False
+            self.flush(gated=False)
+
+    def _start_timer(self):
+        if self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.max_latency, self._on_timer)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_timer(self):
+        self._timer = None
+        self.flush()
@@ -0,0 +1,135 @@
+"""
+Fast encoders and decoders for the websocket hot path.
+
+The pydantic models in `api.websocket.messaging` remain the schema of every
+message; this module produces and accepts exactly the same JSON without
+constructing those models per frame. Turn completion messages are
+precomputed, agent audio is formatted directly into its JSON envelope, and
+`orjson` is used for parsing and serialisation when it is installed.
+"""
+import binascii
+import json
+import struct
+from typing import Any, Dict, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+
+# Binary frame layout: 1-byte protocol version, 1-byte frame kind, followed by
+# the raw little-endian int16 PCM payload (no base64, no JSON envelope).
+BINARY_FRAME_VERSION = 1
+BINARY_FRAME_AUDIO = 0x01
+BINARY_FRAME_HEADER = struct.Struct("!BB")
+
+
+class MessageDecodeError(ValueError):
+    """Raised when a client frame does not match the messaging schema."""
+    pass
+
+
+if orjson is not None:
+    def dumps(obj: Any) -> str:
+        """Serialises a message to compact JSON text."""
+        return orjson.dumps(obj).decode("utf-8")
+
+    def loads(text: Union[str, bytes]) -> Any:
+        """Parses JSON text."""
+        return orjson.loads(text)
+else:
+    _encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+    _decoder = json.JSONDecoder()
+
+    def dumps(obj: Any) -> str:
+        """Serialises a message to compact JSON text."""
+        return _encoder.encode(obj)
+
+    def loads(text: Union[str, bytes]) -> Any:
+        """Parses JSON text."""
+        if isinstance(text, bytes):
+            text = text.decode("utf-8")
+        return _decoder.decode(text)
+
+
+# Binary frame helpers
+def encode_audio_frame(data: bytes) -> bytes:
+    """Wraps raw PCM bytes in a binary audio frame."""
+    return BINARY_FRAME_HEADER.pack(BINARY_FRAME_VERSION, BINARY_FRAME_AUDIO) + data
+
+
+def decode_binary_frame(frame: bytes) -> Tuple[int, bytes]:
+    """
+    Splits a binary frame into its kind and payload.
+
+    Raises:
+        MessageDecodeError: If the frame is truncated or uses an unknown version.
+    """
+    if len(frame) < BINARY_FRAME_HEADER.size:
+        raise MessageDecodeError("Binary frame is shorter than its header.")
+    version, kind = BINARY_FRAME_HEADER.unpack_from(frame)
+    if version != BINARY_FRAME_VERSION:
+        raise MessageDecodeError(f"Unsupported binary frame version: {version}")
+    return kind, frame[BINARY_FRAME_HEADER.size:]
+
+
+# Agent to client encoders, mirroring the `Agent*Message` models.
+_TURN_COMPLETE_MESSAGES = {
+    (turn_complete, interrupted): dumps({"turn_complete": turn_complete, "interrupted": interrupted})
+    for turn_complete in (False, True)
+    for interrupted in (False, True)
+}
+_AGENT_AUDIO_PREFIX = '{"mime_type":"audio/pcm","data":"'
+_AGENT_AUDIO_SUFFIX = '"}'
+
+
+def encode_turn_complete(turn_complete: bool, interrupted: bool) -> str:
+    """Encodes an `AgentTurnCompleteMessage`."""
+    return _TURN_COMPLETE_MESSAGES[(turn_complete, interrupted)]
+
+
+def encode_agent_audio(data: bytes) -> str:
+    """Encodes an `AgentAudioMessage` carrying raw PCM bytes."""
+    return _AGENT_AUDIO_PREFIX + binascii.b2a_base64(data, newline=False).decode("ascii") + _AGENT_AUDIO_SUFFIX
+
+
+def input_transcription(text: str) -> Dict[str, Dict[str, str]]:
+    """Builds an `AgentInputTranscriptionMessage` payload."""
+    return {"input_transcription": {"text": text}}
+
+
+def output_transcription(text: str) -> Dict[str, Dict[str, str]]:
+    """Builds an `AgentTextMessage` payload."""
+    return {"output_transcription": {"text": text}}
+
+
+# Client to agent decoders, mirroring `TextMessage` and `AudioMessage`.
+def decode_client_message(text: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Parses a client text frame and checks the fields its `type` requires.
+
+    Raises:
+        MessageDecodeError: If the frame is not a JSON object or misses required fields.
+    """
+    try:
+        message = loads(text)
+    except ValueError as e:
+        raise MessageDecodeError(f"Invalid JSON: {e}")
+    if not isinstance(message, dict):
+        raise MessageDecodeError("Message must be a JSON object.")
+    message_type = message.get("type")
+    if message_type in ("text", "audio"):
+        if not isinstance(message.get("data"), str):
+            raise MessageDecodeError(f"'{message_type}' message requires a string 'data' field.")
+        if message_type == "audio" and not isinstance(message.get("mime_type", "audio/pcm"), str):
+            raise MessageDecodeError("'audio' message 'mime_type' must be a string.")
+    return message
+
+
+def decode_audio_data(message: Dict[str, Any]) -> bytes:
+    """Decodes the base64 PCM payload of an audio message."""
+    try:
+        return binascii.a2b_base64(message["data"])
+    except binascii.Error as e:
+        raise MessageDecodeError(f"Invalid base64 audio data: {e}")
@@ -1,78 +1,200 @@
 import asyncio
 import json
 import logging
+from typing import Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from api.websocket.session import start_agent_session
+from api.exceptions import OutboundQueueOverflowError
+from api.metrics import ConnectionMetrics
+from api.services.transcript_store import transcript_log
+from api.websocket import codec
+from api.websocket.session import LiveSession, start_agent_session
+from api.websocket.audio import AudioAggregator, VoiceActivityDetector
+from api.websocket.outbound import OutboundQueue
+from api.websocket.resume import ResumableSession, resume_registry
 from api.websocket.messaging import (
     agent_to_client_messaging,
     client_to_agent_messaging,
+    ClientBinding,
+    SessionResumedMessage,
+    SessionStartedMessage,
     SettingsMessage,
 )
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-async def _setup_agent_session(user_id: str, settings: dict, websocket: WebSocket, is_audio: bool):
+# Close code for a connection whose session was resumed by another connection.
+CLOSE_SESSION_TAKEN_OVER = 4001
+# Close codes of a client that meant to leave (normal, going away, no status);
+# its session ends at once instead of waiting to be resumed.
+CLEAN_CLOSE_CODES = (1000, 1001, 1005)
+
+async def _setup_agent_session(
+    user_id: str, settings: dict, outbound: OutboundQueue, is_audio: bool
+) -> LiveSession:
     """Sets up the agent session."""
     logger.info("Starting agent session for user %s", user_id)
     return await start_agent_session(
         user_id,
         settings=settings,
-        websocket=websocket,
+        outbound=outbound,
         is_audio=is_audio,
     )
 
-async def _handle_communication(websocket: WebSocket, live_events, live_request_queue):
-    """Handles the communication between the client and the agent."""
-    agent_to_client_task = asyncio.create_task(
-        agent_to_client_messaging(websocket, live_events)
+async def _start_resumable_session(
+    websocket: WebSocket,
+    user_id: str,
+    settings_message: SettingsMessage,
+    metrics: ConnectionMetrics,
+    is_audio: bool,
+    binary: bool,
+) -> ResumableSession:
+    """Starts a live session and the task relaying its events, which outlives this connection."""
+    outbound = OutboundQueue(websocket)
+    live_session = await _setup_agent_session(
+        user_id,
+        settings=settings_message.settings.model_dump(),
+        outbound=outbound,
+        is_audio=is_audio,
     )
-    client_to_agent_task = asyncio.create_task(
-        client_to_agent_messaging(websocket, live_request_queue)
+    transcript = transcript_log.session(live_session.session_id) if transcript_log else None
+    client = ClientBinding(metrics, binary)
+    agent_task = asyncio.create_task(
+        agent_to_client_messaging(outbound, live_session.live_events, client, transcript=transcript)
     )
+    return resume_registry.add(live_session, agent_task, client)
+
+def _reattach(
+    websocket: WebSocket, entry: ResumableSession, received: int, metrics: ConnectionMetrics, binary: bool
+):
+    """Points a resumed session at this connection and queues what the client missed again."""
+    live_session = entry.live_session
+    live_session.outbound.websocket = websocket
+    entry.client.metrics = metrics
+    entry.client.binary = binary
+    lost = live_session.outbound.rewind(received)
+    if lost and live_session.context:
+        # Context patches may be among the lost messages.
+        live_session.context.snapshot()
+    logger.info("Resumed session %s (%d messages lost)", live_session.session_id, lost)
+
+async def _handle_communication(
+    websocket: WebSocket,
+    entry: ResumableSession,
+    audio: AudioAggregator,
+    metrics: ConnectionMetrics,
+) -> bool:
+    """
+    Handles the communication between the client and the agent until the
+    agent stream ends, the client disconnects or another connection takes the
+    session over.
 
-    done, pending = await asyncio.wait(
-        [agent_to_client_task, client_to_agent_task],
+    Returns:
+        bool: Whether the session may be resumed by a later connection,
+        which is not the case after a clean close by the client.
+    """
+    live_session = entry.live_session
+    client_to_agent_task = asyncio.create_task(
+        client_to_agent_messaging(websocket, live_session.live_request_queue, audio, metrics)
+    )
+    outbound_task = asyncio.create_task(live_session.outbound.run())
+    takeover_task = asyncio.create_task(entry.takeover.wait())
+    # The agent task belongs to the session, so it is awaited but never cancelled here.
+    done, _ = await asyncio.wait(
+        [entry.agent_task, client_to_agent_task, outbound_task, takeover_task],
         return_when=asyncio.FIRST_COMPLETED,
     )
 
-    for task in pending:
+    connection_tasks = (client_to_agent_task, outbound_task, takeover_task)
+    for task in connection_tasks:
         task.cancel()
+    # Nothing may still send on this connection once another one takes over.
+    await asyncio.gather(*connection_tasks, return_exceptions=True)
+    if takeover_task in done:
+        logger.info("Session %s was resumed by another connection.", live_session.session_id)
+        try:
+            await websocket.close(code=CLOSE_SESSION_TAKEN_OVER)
+        except Exception:
+            pass
+        return True
+    resumable = entry.agent_task not in done
     for task in done:
         try:
             task.result()
-        except WebSocketDisconnect:
-            logger.info("Client disconnected.")
-            break
+        except WebSocketDisconnect as e:
+            logger.info("Client disconnected with code %s.", e.code)
+            return resumable and e.code not in CLEAN_CLOSE_CODES
+        except OutboundQueueOverflowError as e:
+            logger.warning(f"Disconnecting slow client: {e}")
+            await websocket.close(code=1013)
+            return False
         except Exception as e:
             logger.error(f"Task finished with unexpected exception: {e}", exc_info=True)
+    return resumable
 
 @router.websocket("/ws/{user_id}")
-async def websocket_endpoint(websocket: WebSocket, user_id: int, is_audio: str):
-    """Client websocket endpoint"""
+async def websocket_endpoint(
+    websocket: WebSocket,
+    user_id: int,
+    is_audio: str,
+    binary: str = "false",
+    resume: Optional[str] = None,
+    received: int = 0,
+):
+    """
+    Client websocket endpoint.
+
+    A client that reconnects passes the `resume_token` of its session as
+    `resume` and the number of messages it has received from the session
+    (excluding `session_started` and `session_resumed`) as `received`.
+    """
     await websocket.accept()
-    logger.info(f"Client #{user_id} connected, audio mode: {is_audio}")
+    metrics = ConnectionMetrics()
+    logger.info(f"Client #{user_id} connected, audio mode: {is_audio}, binary audio: {binary}")
+    entry = None
+    resumable = False
 
     try:
         settings_json = await websocket.receive_text()
         settings_message = SettingsMessage(**json.loads(settings_json))
         logger.info("Received settings from client")
 
-        live_events, live_request_queue = await _setup_agent_session(
-            str(user_id),
-            settings=settings_message.settings.model_dump(),
-            websocket=websocket,
-            is_audio=(is_audio == "true"),
-        )
+        if resume:
+            entry = await resume_registry.claim(resume)
+            if entry is None:
+                logger.info(f"Client #{user_id} could not resume its session, starting a new one")
+        if entry is not None:
+            _reattach(websocket, entry, received, metrics, binary=(binary == "true"))
+            message = SessionResumedMessage(session_id=entry.live_session.session_id, resume_token=entry.token)
+        else:
+            entry = await _start_resumable_session(
+                websocket,
+                str(user_id),
+                settings_message,
+                metrics,
+                is_audio=(is_audio == "true"),
+                binary=(binary == "true"),
+            )
+            message = SessionStartedMessage(session_id=entry.live_session.session_id, resume_token=entry.token)
+        # Sent ahead of the queue, so it is not counted among the replayable messages.
+        await websocket.send_text(codec.dumps(message.model_dump()))
+        metrics.session_ready()
 
-        await _handle_communication(websocket, live_events, live_request_queue)
+        audio = AudioAggregator(
+            entry.live_session.live_request_queue,
+            vad=VoiceActivityDetector.from_app_settings(settings_message.settings),
+        )
+        resumable = await _handle_communication(websocket, entry, audio, metrics)
 
-    except WebSocketDisconnect:
+    except WebSocketDisconnect as e:
         logger.info(f"Client #{user_id} disconnected")
+        resumable = e.code not in CLEAN_CLOSE_CODES
     except Exception as e:
         logger.error(f"An error occurred: {e}", exc_info=True)
     finally:
         logger.info(f"Closing connection for client #{user_id}")
-        if 'live_request_queue' in locals() and live_request_queue:
-            live_request_queue.close()
+        metrics.close()
+        if entry is not None:
+            # Shielded so a cancelled handler still parks or ends its session.
+            await asyncio.shield(resume_registry.detach(entry, resumable=resumable))
@@ -0,0 +1,169 @@
+"""
+Server-side copy of each session's context and delta updates to the client.
+
+The `edit_context_dict` tool hands every new context to the session's
+`ContextSync`, which keeps the authoritative copy and tells the client what
+changed as JSON Patch (RFC 6902) operations in a `ContextPatchMessage`.
+Edits arriving within `context_debounce_ms` are sent as one patch. Every
+message carries a version; the client applies a patch only on top of the
+version it names, and a full `UpdateContextMessage` snapshot is sent every
+`context_snapshot_every` messages, when a patch would be larger than the
+snapshot, and `context_snapshot_interval_seconds` after the last patch, so a
+client that missed a message (for example one dropped by the outbound queue)
+resynchronises.
+"""
+import asyncio
+import copy
+import logging
+from typing import Any, Dict, List, Optional
+
+from api.settings import settings
+from api.websocket import codec
+from api.websocket.messaging import ContextPatchMessage, UpdateContextMessage
+
+logger = logging.getLogger(__name__)
+
+Operation = Dict[str, Any]
+
+
+def _escape(key: str) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def diff(old: Any, new: Any, path: str = "") -> List[Operation]:
+    """
+    Returns the JSON Patch operations that turn `old` into `new`.
+
+    Dicts are compared key by key; any other changed value, including lists,
+    is replaced as a whole.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: List[Operation] = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(diff(old[key], value, child))
+        return ops
+    if old == new and type(old) is type(new):
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def apply_patch(document: Any, ops: List[Operation]) -> Any:
+    """Applies `diff` operations to a copy of `document` and returns it."""
+    document = copy.deepcopy(document)
+    for op in ops:
+        tokens = [_unescape(token) for token in op["path"].split("/")[1:]]
+        if not tokens:
+            document = copy.deepcopy(op["value"])
+            continue
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[token]
+        if op["op"] == "remove":
+            del parent[tokens[-1]]
+        else:
+            parent[tokens[-1]] = copy.deepcopy(op["value"])
+    return document
+
+
+class ContextSync:
+    """
+    The context of one session and what its client has been sent.
+
+    Args:
+        outbound (OutboundQueue): The client's queue.
+        context (dict): The context the client starts with.
+        debounce_ms (int, optional): How long edits are collected before sending.
+        snapshot_every (int, optional): Messages between full snapshots.
+        snapshot_interval (float, optional): Seconds after the last patch until
+            a snapshot is sent.
+    """
+
+    def __init__(
+        self,
+        outbound,
+        context: Dict[str, Any],
+        debounce_ms: Optional[int] = None,
+        snapshot_every: Optional[int] = None,
+        snapshot_interval: Optional[float] = None,
+    ):
+        self.outbound = outbound
+        self.context = copy.deepcopy(context)
+        self.debounce = (settings.context_debounce_ms if debounce_ms is None else debounce_ms) / 1000
+        self.snapshot_every = snapshot_every or settings.context_snapshot_every
+        self.snapshot_interval = (
+            settings.context_snapshot_interval_seconds if snapshot_interval is None else snapshot_interval
+        )
+        self.version = 0
+        self._sent = copy.deepcopy(context)
+        self._since_snapshot = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._snapshot_handle: Optional[asyncio.TimerHandle] = None
+        self.patches = 0
+        self.snapshots = 0
+
+    def update(self, context: Dict[str, Any]):
+        """Replaces the context and schedules sending the change."""
+        self.context = copy.deepcopy(context)
+        if self._flush_handle is not None:
+            return
+        if self.debounce <= 0:
+            self.flush()
+            return
+        self._flush_handle = asyncio.get_running_loop().call_later(self.debounce, self.flush)
+
+    def flush(self):
+        """Sends what changed since the last message, if anything."""
+        self._cancel_flush()
+        ops = diff(self._sent, self.context)
+        if not ops:
+            return
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every or len(codec.dumps(ops)) >= len(codec.dumps(self.context)):
+            self.snapshot()
+            return
+        self.version += 1
+        message = ContextPatchMessage(version=self.version, base_version=self.version - 1, ops=ops)
+        self.outbound.put(message.model_dump())
+        self._sent = copy.deepcopy(self.context)
+        self.patches += 1
+        if self.snapshot_interval > 0:
+            # Re-armed on every patch, so the snapshot follows the last patch of a burst.
+            if self._snapshot_handle is not None:
+                self._snapshot_handle.cancel()
+            self._snapshot_handle = asyncio.get_running_loop().call_later(self.snapshot_interval, self.snapshot)
+
+    def snapshot(self):
+        """Sends the full context."""
+        self._cancel_flush()
+        if self._snapshot_handle is not None:
+            self._snapshot_handle.cancel()
+            self._snapshot_handle = None
+        self.version += 1
+        message = UpdateContextMessage(context_dict=self.context, version=self.version)
+        self.outbound.put(message.model_dump())
+        self._sent = copy.deepcopy(self.context)
+        self._since_snapshot = 0
+        self.snapshots += 1
+
+    def close(self):
+        """Cancels pending sends."""
+        self._cancel_flush()
+        if self._snapshot_handle is not None:
+            self._snapshot_handle.cancel()
+            self._snapshot_handle = None
+
+    def _cancel_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
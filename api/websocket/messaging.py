@@ -1,10 +1,18 @@
-import base64
-import json
 import logging
-from typing import Any, Dict
-from google.genai.types import Part, Content, Blob
-from pydantic import BaseModel, Field, ValidationError
+from dataclasses import dataclass
+from typing import Any, Dict, List
+from fastapi import WebSocketDisconnect
+from pydantic import BaseModel, Field
+from api import sdk
+from api.metrics import ConnectionMetrics
 from api.settings import AppSettings
+from api.websocket import codec
+from api.websocket.audio import AudioAggregator
+from api.websocket.codec import (
+    BINARY_FRAME_AUDIO,
+    decode_binary_frame,
+    encode_audio_frame,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -40,74 +48,136 @@ class AgentInputTranscriptionMessage(BaseModel):
 class UpdateContextMessage(BaseModel):
     type: str = Field(default="context_updated", frozen=True)
     context_dict: Dict[str, Any]
+    version: int = 0
+
+class ContextPatchMessage(BaseModel):
+    type: str = Field(default="context_patch", frozen=True)
+    version: int
+    base_version: int
+    ops: List[Dict[str, Any]]
+
+class SessionStartedMessage(BaseModel):
+    type: str = Field(default="session_started", frozen=True)
+    session_id: str
+    resume_token: str
+
+class SessionResumedMessage(BaseModel):
+    type: str = Field(default="session_resumed", frozen=True)
+    session_id: str
+    resume_token: str
 
 # Agent to Client Messaging Helpers
-async def handle_turn_complete(websocket, event):
+def handle_turn_complete(outbound, event, transcript=None):
     if event.turn_complete or event.interrupted:
-        message = AgentTurnCompleteMessage(
-            turn_complete=event.turn_complete is True,
-            interrupted=event.interrupted is True,
-        )
-        await websocket.send_json(message.model_dump())
+        turn_complete = event.turn_complete is True
+        interrupted = event.interrupted is True
+        outbound.put(codec.encode_turn_complete(turn_complete, interrupted), priority=True, turn_boundary=True)
+        if transcript:
+            transcript.turn(turn_complete, interrupted)
         return True
     return False
 
-async def handle_audio_part(websocket, part):
+def handle_audio_part(outbound, part, binary=False):
     is_audio = part.inline_data and part.inline_data.mime_type.startswith("audio/pcm")
     if is_audio:
         audio_data = part.inline_data.data
         if audio_data:
-            message = AgentAudioMessage(data=base64.b64encode(audio_data).decode("ascii"))
-            await websocket.send_json(message.model_dump())
+            if binary:
+                outbound.put(encode_audio_frame(audio_data), priority=True)
+            else:
+                outbound.put(codec.encode_agent_audio(audio_data), priority=True)
         return True
     return False
 
-async def handle_transcription(websocket, event, part):
+def handle_transcription(outbound, event, part, transcript=None):
     if event.content.role == "user" and part.text:
-        message = AgentInputTranscriptionMessage(input_transcription={"text": part.text})
-        await websocket.send_json(message.model_dump())
+        message = codec.input_transcription(part.text)
+        outbound.put(message, coalesce_key="input_transcription")
+        if transcript:
+            transcript.input(part.text)
     elif event.content.role == "model" and part.text and event.partial:
-        message = AgentTextMessage(output_transcription={"text": part.text})
-        await websocket.send_json(message.model_dump())
-
-async def agent_to_client_messaging(websocket, live_events):
-    """Agent to client communication"""
+        message = codec.output_transcription(part.text)
+        outbound.put(message, coalesce_key="output_transcription")
+        if transcript:
+            transcript.output(part.text)
+
+@dataclass
+class ClientBinding:
+    """
+    The client connection a session's agent events are relayed to. A resumed
+    session rebinds it to the metrics and audio encoding of its new connection.
+    """
+    metrics: ConnectionMetrics
+    binary: bool = False
+
+async def agent_to_client_messaging(outbound, live_events, client: ClientBinding, transcript=None):
+    """
+    Agent to client communication, queued through the connection's `OutboundQueue`.
+    Transcriptions and turn events are also recorded in `transcript`, if given.
+    """
     async for event in live_events:
-        if await handle_turn_complete(websocket, event):
+        if handle_turn_complete(outbound, event, transcript):
+            client.metrics.turn_complete()
             continue
-        part: Part = event.content and event.content.parts and event.content.parts[0]
+        part = event.content and event.content.parts and event.content.parts[0]
         if not part:
             continue
-        if await handle_audio_part(websocket, part):
+        if handle_audio_part(outbound, part, binary=client.binary):
+            client.metrics.agent_audio()
             continue
-        await handle_transcription(websocket, event, part)
+        if event.content.role == "user" and part.text:
+            client.metrics.user_input()
+        handle_transcription(outbound, event, part, transcript)
 
 # Client to Agent Messaging Helpers
 def handle_text_message(message_data, live_request_queue):
-    message = TextMessage(**message_data)
-    content = Content(role="user", parts=[Part.from_text(text=message.data)])
+    types = sdk.genai_types()
+    content = types.Content(role="user", parts=[types.Part.from_text(text=message_data["data"])])
     live_request_queue.send_content(content=content)
 
-def handle_audio_message(message_data, live_request_queue):
-    message = AudioMessage(**message_data)
-    decoded_data = base64.b64decode(message.data)
-    live_request_queue.send_realtime(Blob(data=decoded_data, mime_type=message.mime_type))
+def handle_audio_message(message_data, audio):
+    audio.push(codec.decode_audio_data(message_data))
+
+def handle_binary_message(frame, audio):
+    kind, payload = decode_binary_frame(frame)
+    if kind != BINARY_FRAME_AUDIO:
+        raise ValueError(f"Unsupported binary frame kind: {kind}")
+    audio.push(payload)
 
-async def client_to_agent_messaging(websocket, live_request_queue):
+async def client_to_agent_messaging(
+    websocket, live_request_queue, audio: AudioAggregator, metrics: ConnectionMetrics
+):
     """Client to agent communication"""
-    while True:
-        message_json = await websocket.receive_text()
-        try:
-            message_data = json.loads(message_json)
-            message_type = message_data.get("type")
-
-            if message_type == "text":
-                handle_text_message(message_data, live_request_queue)
-            elif message_type == "audio":
-                handle_audio_message(message_data, live_request_queue)
-            elif message_type != "settings":
-                logger.warning(f"Unsupported message type: {message_type}")
-        except (ValidationError, json.JSONDecodeError) as e:
-            logger.error(f"Error processing message: {e}")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred: {e}", exc_info=True)
\ No newline at end of file
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+            if message.get("bytes") is not None:
+                metrics.frame_received(len(message["bytes"]))
+                try:
+                    handle_binary_message(message["bytes"], audio)
+                except ValueError as e:
+                    logger.error(f"Error processing binary frame: {e}")
+                continue
+
+            metrics.frame_received(len(message["text"]))
+            try:
+                message_data = codec.decode_client_message(message["text"])
+                message_type = message_data.get("type")
+
+                if message_type == "text":
+                    # A typed message ends the user's spoken turn.
+                    audio.flush()
+                    handle_text_message(message_data, live_request_queue)
+                    metrics.user_input()
+                elif message_type == "audio":
+                    handle_audio_message(message_data, audio)
+                elif message_type != "settings":
+                    logger.warning(f"Unsupported message type: {message_type}")
+            except ValueError as e:
+                logger.error(f"Error processing message: {e}")
+            except Exception as e:
+                logger.error(f"An unexpected error occurred: {e}", exc_info=True)
+    finally:
+        audio.close()
\ No newline at end of file
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Optional, Tuple, Union
+
+from api.exceptions import OutboundQueueOverflowError
+from api.metrics import (
+    WS_BYTES_SENT,
+    WS_FRAMES_SENT,
+    WS_OUTBOUND_COALESCED,
+    WS_OUTBOUND_DEPTH,
+    WS_OUTBOUND_DROPPED,
+)
+from api.settings import settings
+from api.websocket import codec
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DISCONNECT = "disconnect"
+
+# Dicts are serialised when sent so queued transcriptions can still be merged;
+# strings are pre-encoded JSON text and bytes are binary frames.
+Message = Union[dict, str, bytes]
+
+
+class OutboundQueue:
+    """
+    Bounded per-connection queue between the live agent events and the client socket.
+
+    Producers call `put` without awaiting, so a slow client never stalls the
+    consumption of `runner.run_live` events. A single sender task drains the
+    queue with `run`, sending high-priority messages (audio, turn completion)
+    before everything else and merging consecutive partial transcriptions
+    that are still waiting to be sent.
+
+    The last `replay_size` sent messages are kept so a resumed session can
+    send again what a dropped connection may not have delivered (see `rewind`).
+    """
+
+    def __init__(
+        self,
+        websocket,
+        maxsize: Optional[int] = None,
+        policy: Optional[str] = None,
+        replay_size: Optional[int] = None,
+    ):
+        self.websocket = websocket
+        self.maxsize = maxsize or settings.outbound_queue_size
+        self.policy = policy or settings.outbound_overflow_policy
+        if self.policy not in (OVERFLOW_DROP_OLDEST, OVERFLOW_DISCONNECT):
+            raise ValueError(f"Unknown outbound overflow policy: {self.policy}")
+        self._high: Deque[Tuple[Optional[str], Message]] = deque()
+        self._normal: Deque[Tuple[Optional[str], Message]] = deque()
+        self._ready = asyncio.Event()
+        self._overflowed = False
+        self._history: Deque[Message] = deque(
+            maxlen=settings.resume_replay_size if replay_size is None else replay_size
+        )
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._high) + len(self._normal)
+
+    def put(
+        self,
+        message: Message,
+        priority: bool = False,
+        coalesce_key: Optional[str] = None,
+        turn_boundary: bool = False,
+    ):
+        """
+        Queues a message for the client.
+
+        Args:
+            message (dict | str | bytes): A JSON-serialisable dict, encoded JSON text or a binary frame.
+            priority (bool): Send ahead of normal messages (audio, turn completion).
+            coalesce_key (str): Key of a `{"text": ...}` payload that may be merged
+                into the previous queued message with the same key.
+            turn_boundary (bool): The message ends a turn. Normal messages still
+                queued are sent before it and are no longer merged with later ones.
+        """
+        if self._overflowed:
+            return
+        if turn_boundary:
+            # The turn's transcriptions go out ahead of its end, and the next
+            # turn's text cannot be merged into them.
+            self._high.extend(self._normal)
+            self._normal.clear()
+        if coalesce_key and self._coalesce(message, coalesce_key):
+            return
+        WS_OUTBOUND_DEPTH.observe(len(self))
+        if len(self) >= self.maxsize:
+            if self.policy == OVERFLOW_DISCONNECT:
+                self._overflowed = True
+                self._ready.set()
+                return
+            self._drop_oldest()
+        (self._high if priority else self._normal).append((coalesce_key, message))
+        self._ready.set()
+
+    def _coalesce(self, message: dict, coalesce_key: str) -> bool:
+        if not self._normal:
+            return False
+        tail_key, tail = self._normal[-1]
+        if tail_key != coalesce_key:
+            return False
+        tail[coalesce_key]["text"] += message[coalesce_key]["text"]
+        self.coalesced += 1
+        WS_OUTBOUND_COALESCED.inc()
+        return True
+
+    def _drop_oldest(self):
+        queue = self._normal or self._high
+        queue.popleft()
+        self.dropped += 1
+        WS_OUTBOUND_DROPPED.inc()
+        if self.dropped == 1:
+            logger.warning("Client is falling behind, dropping oldest outbound messages.")
+
+    def _pop(self) -> Optional[Message]:
+        if self._high:
+            return self._high.popleft()[1]
+        if self._normal:
+            return self._normal.popleft()[1]
+        return None
+
+    async def _send(self, message: Message):
+        if isinstance(message, bytes):
+            await self.websocket.send_bytes(message)
+        else:
+            if not isinstance(message, str):
+                message = codec.dumps(message)
+            await self.websocket.send_text(message)
+        WS_FRAMES_SENT.inc()
+        WS_BYTES_SENT.inc(len(message))
+
+    async def run(self):
+        """Sends queued messages until the connection fails or the client falls behind."""
+        while True:
+            await self._ready.wait()
+            if self._overflowed:
+                raise OutboundQueueOverflowError(
+                    f"Client fell more than {self.maxsize} messages behind."
+                )
+            message = self._pop()
+            if message is None:
+                self._ready.clear()
+                continue
+            # Recorded before sending, so a message lost in flight is replayed on resume.
+            self.sent += 1
+            self._history.append(message)
+            await self._send(message)
+
+    def rewind(self, received: int) -> int:
+        """
+        Queues again, ahead of everything else, the messages sent after the
+        first `received` ones, for a client that reconnects having received
+        only those. `sent` restarts from `received`, so it keeps counting the
+        messages the client has seen.
+
+        Returns:
+            int: Missed messages that were no longer in the replay buffer.
+        """
+        received = max(0, min(received, self.sent))
+        missed = self.sent - received
+        replayed = min(missed, len(self._history))
+        for _ in range(replayed):
+            self._high.appendleft((None, self._history.pop()))
+        self.sent = received
+        if replayed:
+            self._ready.set()
+        return missed - replayed
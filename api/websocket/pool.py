@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set
+
+from api.create_agent import create_agent
+from api.metrics import REGISTRY
+from api.services import app_service
+from api.settings import AppSettings
+from api.websocket.registry import runner_registry
+from api.websocket.tools import get_tools
+
+if TYPE_CHECKING:
+    from google.adk.runners import Runner
+
+logger = logging.getLogger(__name__)
+
+# Settings fields that change the agent or the live session configuration.
+POOL_KEY_FIELDS = (
+    "app_name",
+    "agent_description",
+    "goal_description",
+    "context_dict",
+    "voice_name",
+    "language_code",
+    "search_tool",
+)
+
+
+def settings_key(settings: dict) -> str:
+    """Returns a canonical hash of the settings fields that affect the runner."""
+    canonical = json.dumps(
+        {field: settings.get(field) for field in POOL_KEY_FIELDS},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def build_runner(settings: dict, pinned: bool = False) -> "Runner":
+    """Builds a runner for the settings on top of the app's shared services."""
+    return runner_registry.create_runner(
+        settings["app_name"],
+        create_agent(settings, tools=get_tools(settings)),
+        pinned=pinned,
+    )
+
+
+class AgentPool:
+    """
+    Keeps ready-to-use runners for known settings, such as the bundled apps.
+
+    Runners share their app's services through the runner registry, so a
+    single warm runner per settings serves every connection. Settings that
+    were never warmed (custom apps, edited contexts) fall back to building a
+    runner on demand. Runners are always built off the event loop; a session
+    whose runner is still being warmed waits for it, any other builds cold.
+    Once warming has started, apps whose config files change are warmed
+    again and their old runners dropped.
+    """
+
+    def __init__(self):
+        self._ready: Dict[str, "Runner"] = {}
+        # Keys being warmed, resolved once their runner is ready (or failed).
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Settings key of each warmed catalog app.
+        self._app_keys: Dict[str, str] = {}
+        self._warming: Optional[asyncio.Task] = None
+        self._refills: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.hits = 0
+        self.misses = 0
+
+    async def warm(self, settings_list: Iterable[dict]):
+        """Builds runners for the settings off the event loop."""
+        loop = asyncio.get_running_loop()
+        keyed = [(settings_key(settings), settings) for settings in settings_list]
+        for key, _ in keyed:
+            self._pending.setdefault(key, loop.create_future())
+        try:
+            for key, settings in keyed:
+                try:
+                    self._ready[key] = await asyncio.to_thread(build_runner, settings, pinned=True)
+                except Exception as e:
+                    logger.error(f"Could not warm a runner for app '{settings.get('app_name')}': {e}")
+                self._resolve(key)
+        finally:
+            for key, _ in keyed:
+                self._resolve(key)
+
+    def _resolve(self, key: str):
+        pending = self._pending.pop(key, None)
+        if pending is not None and not pending.done():
+            pending.set_result(None)
+
+    def _load_app_settings(self, app_ids: Iterable[str]) -> List[dict]:
+        settings_list = []
+        for app_id in app_ids:
+            try:
+                app_settings = AppSettings(**app_service.get_app_settings(app_id)).model_dump()
+            except Exception as e:
+                logger.info(f"Not warming app '{app_id}': {e}")
+                continue
+            self._app_keys[app_id] = settings_key(app_settings)
+            settings_list.append(app_settings)
+        return settings_list
+
+    async def warm_bundled_apps(self):
+        """Warms the pool with every app found in `app_settings_path`."""
+        try:
+            app_ids = list(app_service.catalog.entries())
+        except Exception as e:
+            logger.error(f"Could not load bundled apps for the agent pool: {e}")
+            app_ids = []
+        settings_list = self._load_app_settings(app_ids)
+        await self.warm(settings_list)
+        logger.info("Agent pool warmed for %d apps", len(settings_list))
+
+    async def refill(self, app_ids: Iterable[str]):
+        """Drops the runners of changed apps and warms the current settings of those that remain."""
+        app_ids = set(app_ids)
+        for app_id in app_ids:
+            old_key = self._app_keys.pop(app_id, None)
+            if old_key is not None:
+                self._ready.pop(old_key, None)
+        settings_list = self._load_app_settings(app_ids)
+        await self.warm(settings_list)
+        logger.info("Agent pool re-warmed %d changed apps", len(settings_list))
+
+    def _on_catalog_change(self, app_ids: Set[str]):
+        # Called by whichever thread refreshed the catalog.
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._start_refill, set(app_ids))
+
+    def _start_refill(self, app_ids: Set[str]):
+        task = asyncio.create_task(self.refill(app_ids))
+        self._refills.add(task)
+        task.add_done_callback(self._refills.discard)
+
+    def start_warming(self):
+        """Warms the pool with the bundled apps in the background and follows catalog changes."""
+        if self._warming is None:
+            self._loop = asyncio.get_running_loop()
+            app_service.catalog.listeners.append(self._on_catalog_change)
+            self._warming = asyncio.create_task(self.warm_bundled_apps())
+
+    async def stop_warming(self):
+        """Cancels warming still in progress and stops following catalog changes."""
+        if self._warming is None:
+            return
+        app_service.catalog.listeners.remove(self._on_catalog_change)
+        self._loop = None
+        tasks = [self._warming, *self._refills]
+        for task in tasks:
+            task.cancel()
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.error(f"Agent pool warm-up failed: {result}")
+        self._warming = None
+
+    async def acquire(self, settings: dict) -> "Runner":
+        """Returns the ready runner for the settings, building one if none is pooled."""
+        key = settings_key(settings)
+        pending = self._pending.get(key)
+        if pending is not None:
+            # Shielded so a cancelled session does not fail the warm-up's waiters.
+            await asyncio.shield(pending)
+        runner = self._ready.get(key)
+        if runner is not None:
+            self.hits += 1
+            return runner
+        self.misses += 1
+        return await asyncio.to_thread(build_runner, settings)
+
+
+agent_pool = AgentPool()
+REGISTRY.counter("vox_agent_pool_hits_total", "Sessions started on a pre-warmed runner.", fn=lambda: agent_pool.hits)
+REGISTRY.counter("vox_agent_pool_misses_total", "Sessions that had to build a runner.", fn=lambda: agent_pool.misses)
@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Optional, Set
+
+from api import sdk
+from api.metrics import REGISTRY
+from api.settings import settings
+
+if TYPE_CHECKING:
+    from google.adk.agents import BaseAgent
+    from google.adk.artifacts import InMemoryArtifactService
+    from google.adk.memory import InMemoryMemoryService
+    from google.adk.runners import Runner
+    from google.adk.sessions import BaseSessionService, Session
+
+logger = logging.getLogger(__name__)
+
+
+def _create_session_service() -> "BaseSessionService":
+    # Deferred because the session store subclasses the ADK session service.
+    from api.websocket.session_store import create_session_service
+    return create_session_service()
+
+
+@dataclass
+class AppServices:
+    """Session, artifact and memory services shared by every session of an app."""
+    session_service: "BaseSessionService" = field(default_factory=_create_session_service)
+    artifact_service: "InMemoryArtifactService" = field(
+        default_factory=lambda: sdk.adk_artifacts().InMemoryArtifactService()
+    )
+    memory_service: "InMemoryMemoryService" = field(
+        default_factory=lambda: sdk.adk_memory().InMemoryMemoryService()
+    )
+
+
+@dataclass
+class SessionRecord:
+    app_name: str
+    user_id: str
+    session_service: Optional["BaseSessionService"] = None
+    attached: bool = True
+    last_active: float = field(default_factory=time.monotonic)
+
+
+class RunnerRegistry:
+    """
+    Process-wide registry of the services behind every runner.
+
+    All runners of an app share one set of services, so a runner is a cheap
+    wrapper around an agent and sessions from every connection live in one
+    place. Sessions are released when their connection closes and deleted
+    once they have been detached for `session_idle_ttl_seconds`, either right
+    away (a TTL of 0) or by the background sweeper. The services of an app
+    are dropped with its last session, unless a pooled runner pins them.
+    """
+
+    def __init__(self, idle_ttl: Optional[float] = None, sweep_interval: Optional[float] = None):
+        self.idle_ttl = settings.session_idle_ttl_seconds if idle_ttl is None else idle_ttl
+        self.sweep_interval = settings.session_sweep_interval_seconds if sweep_interval is None else sweep_interval
+        self._apps: Dict[str, AppServices] = {}
+        self._sessions: Dict[str, SessionRecord] = {}
+        self._app_sessions: Counter = Counter()
+        self._pinned: Set[str] = set()
+        # Runners are built in worker threads, so the app maps are shared with them.
+        self._lock = threading.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def services(self, app_name: str) -> AppServices:
+        """Returns the shared services of an app, creating them on first use."""
+        with self._lock:
+            services = self._apps.get(app_name)
+            if services is None:
+                services = self._apps[app_name] = AppServices()
+            return services
+
+    def reserve(self, app_name: str):
+        """
+        Keeps the services of an app until a matching `unreserve`, so a runner
+        built for a session that is not created yet keeps the services it binds.
+        """
+        with self._lock:
+            self._app_sessions[app_name] += 1
+
+    def unreserve(self, app_name: str):
+        """Releases a reservation, dropping the app's services with the last one."""
+        with self._lock:
+            self._app_sessions[app_name] -= 1
+            if self._app_sessions[app_name] <= 0:
+                del self._app_sessions[app_name]
+                # Client-sent app names would otherwise accumulate services forever.
+                if app_name not in self._pinned:
+                    self._apps.pop(app_name, None)
+
+    def create_runner(self, app_name: str, agent: "BaseAgent", pinned: bool = False) -> "Runner":
+        """
+        Builds a runner for the agent on top of the app's shared services.
+        A `pinned` runner outlives its sessions, so the app's services are kept.
+        """
+        if pinned:
+            with self._lock:
+                self._pinned.add(app_name)
+        services = self.services(app_name)
+        return sdk.adk_runners().Runner(
+            app_name=app_name,
+            agent=agent,
+            session_service=services.session_service,
+            artifact_service=services.artifact_service,
+            memory_service=services.memory_service,
+        )
+
+    async def create_session(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        state: Optional[dict] = None,
+        runner: Optional["Runner"] = None,
+        reserved: bool = False,
+    ) -> "Session":
+        """
+        Creates a session and tracks it, in the session service of `runner`
+        when given, else in the app's shared one.
+
+        Args:
+            reserved (bool): The caller already reserved the app for this
+                session (see `reserve`); the reservation becomes the session's.
+        """
+        # Reserved before the await, so the services are not dropped meanwhile.
+        if not reserved:
+            self.reserve(app_name)
+        session_service = runner.session_service if runner is not None else self.services(app_name).session_service
+        try:
+            session = await session_service.create_session(
+                app_name=app_name,
+                user_id=user_id,
+                state=state,
+                session_id=session_id,
+            )
+        except BaseException:
+            if not reserved:
+                self.unreserve(app_name)
+            raise
+        self._sessions[session.id] = SessionRecord(
+            app_name=app_name, user_id=user_id, session_service=session_service
+        )
+        return session
+
+    async def release(self, session_id: str):
+        """Detaches a session from its connection, deleting it now if no idle TTL is configured."""
+        record = self._sessions.get(session_id)
+        if record is None:
+            return
+        record.attached = False
+        record.last_active = time.monotonic()
+        if self.idle_ttl <= 0:
+            await self._delete(session_id, record)
+
+    async def _delete(self, session_id: str, record: SessionRecord):
+        if self._sessions.pop(session_id, None) is None:
+            return
+        app_name = record.app_name
+        session_service = record.session_service or self.services(app_name).session_service
+        try:
+            await session_service.delete_session(
+                app_name=app_name, user_id=record.user_id, session_id=session_id
+            )
+        except Exception as e:
+            logger.error(f"Failed to delete session {session_id}: {e}")
+        self.unreserve(app_name)
+
+    async def sweep(self) -> int:
+        """Deletes detached sessions that have been idle longer than the TTL."""
+        cutoff = time.monotonic() - self.idle_ttl
+        expired = [
+            (session_id, record)
+            for session_id, record in self._sessions.items()
+            if not record.attached and record.last_active <= cutoff
+        ]
+        for session_id, record in expired:
+            await self._delete(session_id, record)
+        if expired:
+            logger.info("Swept %d idle sessions", len(expired))
+        return len(expired)
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await self.sweep()
+
+    def start_sweeper(self):
+        """Starts the background idle-session sweeper."""
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_forever())
+
+    async def stop_sweeper(self):
+        """Stops the background idle-session sweeper."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    def close_session_store(self):
+        """Flushes and closes the shared session store, if one was opened."""
+        session_store = sys.modules.get("api.websocket.session_store")
+        if session_store is not None:
+            session_store.close_store()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of apps and of attached and detached sessions."""
+        attached = sum(1 for record in self._sessions.values() if record.attached)
+        return {
+            "apps": len(self._apps),
+            "sessions": len(self._sessions),
+            "attached_sessions": attached,
+            "detached_sessions": len(self._sessions) - attached,
+        }
+
+
+runner_registry = RunnerRegistry()
+REGISTRY.gauge(
+    "vox_sessions", "Agent sessions held by the shared session services.",
+    fn=lambda: runner_registry.stats()["sessions"],
+)
+REGISTRY.gauge(
+    "vox_attached_sessions", "Agent sessions attached to an open websocket.",
+    fn=lambda: runner_registry.stats()["attached_sessions"],
+)
@@ -0,0 +1,137 @@
+"""
+Live sessions that outlive their websocket connection.
+
+Every live session gets a resume token, sent to the client in the
+`SessionStartedMessage`. When the connection drops, the session is parked
+instead of ended: the live agent stream keeps running into the session's
+`OutboundQueue`, which buffers what the client misses. A client reconnecting
+with the token within `resume_grace_seconds` takes the session over without
+rebuilding its runner, and the queue sends again whatever the client did not
+receive. A connection that presents the token of a session still attached to
+another connection (one the server has not yet seen drop) takes it over.
+"""
+import asyncio
+import logging
+import secrets
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from api.settings import settings
+from api.websocket.messaging import ClientBinding
+from api.websocket.session import LiveSession, end_agent_session
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ResumableSession:
+    """A live session, the task relaying its events and its current connection."""
+    token: str
+    live_session: LiveSession
+    agent_task: asyncio.Task
+    # Metrics and audio encoding of the attached connection, read by the agent task.
+    client: Optional[ClientBinding] = None
+    attached: bool = True
+    # Set to ask the attached connection to hand the session over.
+    takeover: asyncio.Event = field(default_factory=asyncio.Event)
+    # Set once no connection uses the session any more.
+    released: asyncio.Event = field(default_factory=asyncio.Event)
+    expiry: Optional[asyncio.TimerHandle] = None
+
+
+class ResumeRegistry:
+    """
+    Resumable sessions by token.
+
+    Args:
+        grace (float, optional): Seconds a detached session waits for its
+            client. 0 ends sessions as soon as their connection drops.
+    """
+
+    def __init__(self, grace: Optional[float] = None):
+        self.grace = settings.resume_grace_seconds if grace is None else grace
+        self._sessions: Dict[str, ResumableSession] = {}
+        self.resumed = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def add(
+        self, live_session: LiveSession, agent_task: asyncio.Task, client: Optional[ClientBinding] = None
+    ) -> ResumableSession:
+        """Registers a new live session attached to the calling connection."""
+        entry = ResumableSession(secrets.token_urlsafe(24), live_session, agent_task, client)
+        self._sessions[entry.token] = entry
+        return entry
+
+    async def claim(self, token: str) -> Optional[ResumableSession]:
+        """
+        Attaches the session of a token to the calling connection, taking it
+        over from the connection it is still attached to, if any.
+
+        Returns:
+            ResumableSession | None: The session, or None if the token is
+            unknown, expired or its session has ended.
+        """
+        entry = self._sessions.get(token)
+        if entry is None or entry.agent_task.done():
+            return None
+        if entry.expiry is not None:
+            entry.expiry.cancel()
+            entry.expiry = None
+        while entry.attached:
+            entry.takeover.set()
+            await entry.released.wait()
+            if self._sessions.get(token) is not entry:
+                return None
+        entry.attached = True
+        entry.takeover = asyncio.Event()
+        entry.released = asyncio.Event()
+        self.resumed += 1
+        return entry
+
+    async def detach(self, entry: ResumableSession, resumable: bool = True):
+        """
+        Releases the session from its connection. It is parked for the grace
+        period when `resumable`, and ended otherwise.
+        """
+        entry.attached = False
+        taken_over = entry.takeover.is_set()
+        try:
+            if entry.agent_task.done() or not (taken_over or (resumable and self.grace > 0)):
+                await self.end(entry)
+            elif not taken_over:
+                entry.expiry = asyncio.get_running_loop().call_later(
+                    self.grace, lambda: asyncio.ensure_future(self._expire(entry))
+                )
+        finally:
+            entry.released.set()
+
+    async def _expire(self, entry: ResumableSession):
+        if entry.attached or self._sessions.get(entry.token) is not entry:
+            return
+        self.expired += 1
+        logger.info("Resumable session %s expired", entry.live_session.session_id)
+        await self.end(entry)
+
+    async def end(self, entry: ResumableSession):
+        """Stops the session's agent stream and ends the live session."""
+        if self._sessions.pop(entry.token, None) is None:
+            return
+        if entry.expiry is not None:
+            entry.expiry.cancel()
+        entry.agent_task.cancel()
+        # gather, unlike awaiting the task, does not swallow a cancellation of the caller.
+        (result,) = await asyncio.gather(entry.agent_task, return_exceptions=True)
+        if isinstance(result, Exception):
+            logger.error(f"Agent stream ended with an error: {result}")
+        await end_agent_session(entry.live_session)
+
+    async def close(self):
+        """Ends every session."""
+        for entry in list(self._sessions.values()):
+            await self.end(entry)
+
+
+resume_registry = ResumeRegistry()
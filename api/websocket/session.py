@@ -1,59 +1,77 @@
-import json
-from google.genai.types import (
-    SpeechConfig,
-    VoiceConfig,
-    PrebuiltVoiceConfig,
+import os
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Optional
+
+from api import sdk
+from api.websocket.context import ContextSync
+from api.websocket.outbound import OutboundQueue
+from api.websocket.pool import agent_pool
+from api.websocket.registry import runner_registry
+from api.websocket.tools import (
+    SESSION_ID_STATE_KEY,
+    register_session,
+    unregister_session,
 )
-from google.adk.runners import InMemoryRunner
-from google.adk.agents import LiveRequestQueue
-from google.adk.agents.run_config import RunConfig
-from google.adk.tools import google_search
 
-from api.create_agent import create_agent
-from api.websocket.messaging import UpdateContextMessage
+if TYPE_CHECKING:
+    from google.adk.agents import LiveRequestQueue
+    from google.adk.runners import Runner
 
 
-async def start_agent_session(user_id, settings, websocket, is_audio=False):
-    async def edit_context_dict(context_dict: dict) -> dict:
-        """Updates the context dictionary, it is allowed to add new items or remove existing ones.
+@dataclass
+class LiveSession:
+    """A running live agent session and the queues attached to it."""
+    session_id: str
+    runner: "Runner"
+    live_events: AsyncGenerator[Any, None]
+    live_request_queue: "LiveRequestQueue"
+    outbound: OutboundQueue
+    context: Optional[ContextSync] = None
 
-        Args:
-            context_dict (dict): The new context dictionary.
-        """
-        update_context_message = UpdateContextMessage(context_dict=context_dict)
-        await websocket.send_json(update_context_message.model_dump())
-        return {}
 
-    tools = [edit_context_dict]
-    if settings.get("search_tool"):
-        tools.append(google_search)
+async def start_agent_session(user_id, settings, outbound, is_audio=False) -> LiveSession:
+    if settings.get("gemini_api_key"):
+        os.environ["GOOGLE_API_KEY"] = settings["gemini_api_key"]
 
-    # Create a Runner
-    runner = InMemoryRunner(
-        app_name=settings["app_name"],
-        agent=create_agent(
-            settings,
-            tools=tools
-        ),
-    )
+    # Reserve the app so its services outlive the runner build, then take a
+    # ready Runner from the pool, or build one for custom settings
+    app_name = settings["app_name"]
+    runner_registry.reserve(app_name)
+    try:
+        runner = await agent_pool.acquire(settings)
 
-    # Create a Session
-    session = await runner.session_service.create_session(
-        app_name=settings["app_name"],
-        user_id=user_id,  # Replace with actual user ID
+        # Create a Session in the session service the runner was built on
+        session_id = uuid.uuid4().hex
+        session = await runner_registry.create_session(
+            app_name=app_name,
+            user_id=user_id,  # Replace with actual user ID
+            session_id=session_id,
+            state={SESSION_ID_STATE_KEY: session_id},
+            runner=runner,
+            reserved=True,
+        )
+    except BaseException:
+        runner_registry.unreserve(app_name)
+        raise
+    context = register_session(
+        session.id,
+        outbound,
+        {key: item.get("value") for key, item in settings["context_dict"].items()},
     )
 
     # Set response modality
     modality = "AUDIO" if is_audio else "TEXT"
-    speech_config = SpeechConfig(
+    types = sdk.genai_types()
+    speech_config = types.SpeechConfig(
         language_code=settings["language_code"],
-        voice_config=VoiceConfig(
-            prebuilt_voice_config=PrebuiltVoiceConfig(
+        voice_config=types.VoiceConfig(
+            prebuilt_voice_config=types.PrebuiltVoiceConfig(
                 voice_name=settings["voice_name"]
             )
         ),
     )
-    run_config = RunConfig(
+    run_config = sdk.adk_run_config().RunConfig(
         response_modalities=[modality],
         speech_config=speech_config,
         input_audio_transcription={},
@@ -61,7 +79,7 @@ async def start_agent_session(user_id, settings, websocket, is_audio=False):
     )
 
     # Create a LiveRequestQueue for this session
-    live_request_queue = LiveRequestQueue()
+    live_request_queue = sdk.adk_agents().LiveRequestQueue()
 
     # Start agent session
     live_events = runner.run_live(
@@ -70,4 +88,18 @@ async def start_agent_session(user_id, settings, websocket, is_audio=False):
         live_request_queue=live_request_queue,
         run_config=run_config,
     )
-    return live_events, live_request_queue
+    return LiveSession(
+        session_id=session.id,
+        runner=runner,
+        live_events=live_events,
+        live_request_queue=live_request_queue,
+        outbound=outbound,
+        context=context,
+    )
+
+
+async def end_agent_session(live_session: LiveSession):
+    """Closes the live request queue and releases the session from its connection."""
+    live_session.live_request_queue.close()
+    unregister_session(live_session.session_id)
+    await runner_registry.release(live_session.session_id)
@@ -0,0 +1,474 @@
+"""
+Persistent session services for running several workers or nodes.
+
+`StoreSessionService` implements the ADK session service on top of a small
+key/value interface, so agent sessions can live outside the process that
+created them. Backends:
+
+- `MemoryStore`: a dict, for tests and single-process use.
+- `SqliteStore`: a WAL-mode SQLite file shared by the workers of one host.
+  Writes are buffered and committed in batches.
+- `RedisStore`: any client with the redis-py `get`/`set`/`delete`/`scan_iter`
+  methods, for several nodes. `LocalRedis` is an in-process stand-in,
+  selected with `session_store_url=local`.
+
+Only agent sessions are shared. Resume tokens (`api.websocket.resume`) and
+warm runners (`api.websocket.pool`) are per worker, so resuming a dropped
+connection needs a load balancer that routes a client back to its worker.
+
+This module imports google.adk, so it is only imported when a session service
+is created (see `api.websocket.registry`).
+"""
+import abc
+import asyncio
+import fnmatch
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+from api.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class KeyValueStore(abc.ABC):
+    """The storage operations a session service needs."""
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Returns the value of a key, or None when it is not set."""
+
+    @abc.abstractmethod
+    def set(self, key: str, value: str):
+        """Sets the value of a key."""
+
+    @abc.abstractmethod
+    def delete(self, key: str):
+        """Removes a key."""
+
+    @abc.abstractmethod
+    def keys(self, prefix: str) -> List[str]:
+        """Returns every key starting with `prefix`."""
+
+    def flush(self):
+        """Persists buffered writes."""
+
+    def close(self):
+        """Flushes and releases the store."""
+        self.flush()
+
+
+class MemoryStore(KeyValueStore):
+    """Process-local store backed by a dict."""
+
+    def __init__(self):
+        self._data: Dict[str, str] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        return self._data.get(key)
+
+    def set(self, key: str, value: str):
+        self._data[key] = value
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def keys(self, prefix: str) -> List[str]:
+        return [key for key in self._data if key.startswith(prefix)]
+
+
+class SqliteStore(KeyValueStore):
+    """
+    SQLite store in WAL mode, so readers in other workers never block writers.
+
+    Writes are buffered, with the last write to a key winning, and committed
+    in one transaction once `batch_size` keys are pending or every
+    `flush_interval_ms`. Reads see buffered writes, including those being
+    committed, and use their own connection, so they never wait for a commit.
+    Writes buffered when the process dies are lost.
+
+    Args:
+        path (str): Database file, created when missing.
+        batch_size (int, optional): Pending keys that trigger a commit.
+        flush_interval_ms (int, optional): Longest time a write stays buffered.
+    """
+
+    _DELETED = object()
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+    ):
+        self.batch_size = batch_size or settings.session_store_batch_size
+        self.flush_interval = (flush_interval_ms or settings.session_store_flush_interval_ms) / 1000
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = self._connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._reader = self._connect(path)
+        # Guards the buffers; held only briefly, never during database access.
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._pending: Dict[str, Any] = {}
+        self._committing: Dict[str, Any] = {}
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="session-store", daemon=True)
+        self._flusher.start()
+        self.commits = 0
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _buffered(self, key: str) -> Any:
+        value = self._pending.get(key)
+        return self._committing.get(key) if value is None else value
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._buffered(key)
+        if value is self._DELETED:
+            return None
+        if value is not None:
+            return value
+        with self._read_lock:
+            row = self._reader.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str):
+        self._buffer(key, value)
+
+    def delete(self, key: str):
+        self._buffer(key, self._DELETED)
+
+    def _buffer(self, key: str, value: Any):
+        with self._lock:
+            self._pending[key] = value
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def keys(self, prefix: str) -> List[str]:
+        # Buffers first: a write committed while the table is read is still in the copy.
+        with self._lock:
+            buffered = {**self._committing, **self._pending}
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT key FROM kv WHERE key >= ? AND key < ?", (prefix, prefix + "\U0010ffff")
+            ).fetchall()
+        keys = {row[0] for row in rows}
+        for key, value in buffered.items():
+            if key.startswith(prefix):
+                if value is self._DELETED:
+                    keys.discard(key)
+                else:
+                    keys.add(key)
+        return sorted(keys)
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                pending = self._committing = self._pending
+                self._pending = {}
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "DELETE FROM kv WHERE key = ?",
+                    [(key,) for key, value in pending.items() if value is self._DELETED],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)",
+                    [(key, value) for key, value in pending.items() if value is not self._DELETED],
+                )
+                self._conn.execute("COMMIT")
+                self.commits += 1
+                failed = None
+            except sqlite3.Error as e:
+                self._conn.execute("ROLLBACK")
+                failed = e
+            with self._lock:
+                self._committing = {}
+                if failed is not None:
+                    # Keep the writes for the next attempt unless newer ones replaced them.
+                    self._pending = {**pending, **self._pending}
+            if failed is not None:
+                logger.error(f"Session store commit failed: {failed}")
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self._closed.set()
+        self._flusher.join()
+        self.flush()
+        with self._write_lock, self._read_lock:
+            self._conn.close()
+            self._reader.close()
+
+
+class RedisStore(KeyValueStore):
+    """
+    Store on a redis-py compatible client.
+
+    Args:
+        client: An object with `get`, `set`, `delete` and `scan_iter(match=...)`.
+        namespace (str): Prefix for every key written by this store.
+    """
+
+    def __init__(self, client, namespace: str = "vox:"):
+        self.client = client
+        self.namespace = namespace
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.namespace + key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str):
+        self.client.set(self.namespace + key, value)
+
+    def delete(self, key: str):
+        self.client.delete(self.namespace + key)
+
+    def keys(self, prefix: str) -> List[str]:
+        pattern = _glob_escape(self.namespace + prefix) + "*"
+        keys = []
+        for key in self.client.scan_iter(match=pattern):
+            key = key.decode("utf-8") if isinstance(key, bytes) else key
+            keys.append(key[len(self.namespace):])
+        return sorted(keys)
+
+
+def _glob_escape(text: str) -> str:
+    return "".join(f"\\{char}" if char in "*?[]\\" else char for char in text)
+
+
+class LocalRedis:
+    """In-process stand-in for the subset of the redis-py client `RedisStore` uses."""
+
+    def __init__(self):
+        self._data: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._data[key] = value.encode("utf-8") if isinstance(value, str) else value
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match: str = "*") -> Iterator[bytes]:
+        # Redis globs treat backslash as an escape, as fnmatch treats [x].
+        pattern = "".join(
+            f"[{char}]" if escaped else char
+            for escaped, char in _unescape(match)
+        )
+        with self._lock:
+            keys = list(self._data)
+        for key in keys:
+            if fnmatch.fnmatchcase(key, pattern):
+                yield key.encode("utf-8")
+
+
+def _unescape(pattern: str) -> Iterator[tuple]:
+    chars = iter(pattern)
+    for char in chars:
+        if char == "\\":
+            yield True, next(chars, "\\")
+        else:
+            yield False, char
+
+
+class StoreSessionService(BaseSessionService):
+    """
+    ADK session service on a `KeyValueStore`.
+
+    A session is kept as a record of its fields without events, plus one key
+    per event, so appending an event writes the event and the (small) record
+    instead of the whole history. Store calls run in a worker thread, so a
+    slow store never blocks the event loop.
+
+    Args:
+        store (KeyValueStore): Where sessions are kept.
+    """
+
+    def __init__(self, store: KeyValueStore):
+        self.store = store
+
+    @staticmethod
+    def _key(app_name: str, user_id: str, session_id: str = "") -> str:
+        return f"session:{app_name}:{user_id}:{session_id}"
+
+    @staticmethod
+    def _event_prefix(app_name: str, user_id: str, session_id: str) -> str:
+        return f"event:{app_name}:{user_id}:{session_id}:"
+
+    def _save(self, session: Session, event_count: int):
+        record = {"events": event_count, "session": session.model_dump(mode="json", exclude={"events"})}
+        self.store.set(self._key(session.app_name, session.user_id, session.id), json.dumps(record))
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self.store.get(key)
+        return None if raw is None else json.loads(raw)
+
+    def _event_keys(self, app_name: str, user_id: str, session_id: str) -> List[str]:
+        prefix = self._event_prefix(app_name, user_id, session_id)
+        # Skips the events of sessions whose id extends this one, e.g. "s1:x".
+        return [key for key in self.store.keys(prefix) if key[len(prefix):].isdigit()]
+
+    def _create(self, session: Session):
+        self._save(session, 0)
+
+    def _get(
+        self, app_name: str, user_id: str, session_id: str, config: Optional[GetSessionConfig]
+    ) -> Optional[Session]:
+        record = self._load(self._key(app_name, user_id, session_id))
+        if record is None:
+            return None
+        event_keys = self._event_keys(app_name, user_id, session_id)
+        if config and config.num_recent_events:
+            event_keys = event_keys[-config.num_recent_events:]
+        events = []
+        for key in event_keys:
+            raw = self.store.get(key)
+            if raw is not None:
+                events.append(Event.model_validate_json(raw))
+        if config and config.after_timestamp:
+            events = [event for event in events if event.timestamp >= config.after_timestamp]
+        return Session.model_validate({**record["session"], "events": events})
+
+    def _list(self, app_name: str, user_id: str) -> List[Session]:
+        sessions = []
+        for key in self.store.keys(self._key(app_name, user_id)):
+            record = self._load(key)
+            if record is None:
+                continue
+            session = Session.model_validate(record["session"])
+            session.state = {}
+            sessions.append(session)
+        return sessions
+
+    def _delete(self, app_name: str, user_id: str, session_id: str):
+        for key in self._event_keys(app_name, user_id, session_id):
+            self.store.delete(key)
+        self.store.delete(self._key(app_name, user_id, session_id))
+
+    def _append(self, session: Session, event: Event):
+        key = self._key(session.app_name, session.user_id, session.id)
+        record = self._load(key)
+        event_count = record["events"] if record else 0
+        prefix = self._event_prefix(session.app_name, session.user_id, session.id)
+        self.store.set(f"{prefix}{event_count:010d}", event.model_dump_json())
+        self._save(session, event_count + 1)
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session = Session(
+            id=session_id.strip() if session_id and session_id.strip() else uuid.uuid4().hex,
+            app_name=app_name,
+            user_id=user_id,
+            state=dict(state or {}),
+            last_update_time=time.time(),
+        )
+        await asyncio.to_thread(self._create, session)
+        return session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        return await asyncio.to_thread(self._get, app_name, user_id, session_id, config)
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        return ListSessionsResponse(sessions=await asyncio.to_thread(self._list, app_name, user_id))
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await asyncio.to_thread(self._delete, app_name, user_id, session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session=session, event=event)
+        if event.partial:
+            return event
+        session.last_update_time = event.timestamp
+        await asyncio.to_thread(self._append, session, event)
+        return event
+
+
+_shared_store: Optional[KeyValueStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def get_store() -> KeyValueStore:
+    """Returns the process-wide store selected by `session_store`."""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            if settings.session_store == "sqlite":
+                _shared_store = SqliteStore(settings.session_store_path)
+            elif settings.session_store == "redis":
+                _shared_store = RedisStore(_redis_client())
+            else:
+                _shared_store = MemoryStore()
+        return _shared_store
+
+
+def _redis_client():
+    if settings.session_store_url == "local":
+        logger.warning("session_store_url=local: sessions are not shared between processes.")
+        return LocalRedis()
+    try:
+        import redis
+    except ImportError as e:
+        raise RuntimeError("session_store=redis requires the redis package.") from e
+    return redis.Redis.from_url(settings.session_store_url)
+
+
+def close_store():
+    """Flushes and closes the process-wide store, if one was opened."""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is not None:
+            _shared_store.close()
+            _shared_store = None
+
+
+def create_session_service() -> BaseSessionService:
+    """Returns a session service for the configured `session_store`."""
+    if settings.session_store == "memory":
+        return InMemorySessionService()
+    return StoreSessionService(get_store())
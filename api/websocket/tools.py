@@ -0,0 +1,59 @@
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from api import sdk
+from api.websocket.context import ContextSync
+from api.websocket.outbound import OutboundQueue
+
+if TYPE_CHECKING:
+    from google.adk.tools import ToolContext
+
+logger = logging.getLogger(__name__)
+
+# Session state key holding the id used to find the session's connection.
+SESSION_ID_STATE_KEY = "session_id"
+
+# Tools are shared by every session built from the same settings, so they
+# reach the context and client of the calling session through this registry.
+_contexts: Dict[str, ContextSync] = {}
+
+
+def register_session(session_id: str, outbound: OutboundQueue, context: Dict[str, Any]) -> ContextSync:
+    """Keeps the session's context and routes its updates to the given outbound queue."""
+    sync = ContextSync(outbound, context)
+    _contexts[session_id] = sync
+    return sync
+
+
+def unregister_session(session_id: str):
+    """Drops the session's context and stops routing its updates."""
+    sync = _contexts.pop(session_id, None)
+    if sync is not None:
+        sync.close()
+
+
+def get_context_sync(session_id: str) -> Optional[ContextSync]:
+    """Returns the context of a connected session."""
+    return _contexts.get(session_id)
+
+
+async def edit_context_dict(context_dict: dict, tool_context: "ToolContext") -> dict:
+    """Updates the context dictionary, it is allowed to add new items or remove existing ones.
+
+    Args:
+        context_dict (dict): The new context dictionary.
+    """
+    sync = _contexts.get(tool_context.state.get(SESSION_ID_STATE_KEY))
+    if sync is None:
+        logger.warning("Context update for a session without a connection was dropped.")
+        return {}
+    sync.update(context_dict)
+    return {}
+
+
+def get_tools(settings: dict) -> list:
+    """Returns the tools enabled by the app settings."""
+    tools = [edit_context_dict]
+    if settings.get("search_tool"):
+        tools.append(sdk.adk_tools().google_search)
+    return tools
@@ -1,8 +1,8 @@
 import { ref, onUnmounted } from 'vue';
 import {
   base64ToArray,
-  arrayBufferToBase64,
   convertFloat32ToPCM,
+  encodeAudioFrame,
 } from './utils.js';
 
 /**
@@ -73,8 +73,8 @@ export function useAudio(websocket, onAudioData) {
   /**
    * Sends the buffered audio data over the WebSocket connection.
    * This function is called periodically by a timer. It combines the
-   * buffered audio chunks into a single ArrayBuffer, converts it to
-   * Base64, and sends it as a JSON message.
+   * buffered audio chunks into a single binary audio frame and sends it
+   * without any Base64 or JSON wrapping.
    */
   const sendBufferedAudio = () => {
     if (audioBuffer.value.length === 0 || !websocket.value || websocket.value.readyState !== WebSocket.OPEN) {
@@ -93,9 +93,7 @@ export function useAudio(websocket, onAudioData) {
       offset += chunk.length;
     }
     
-    const base64data = arrayBufferToBase64(combinedBuffer.buffer);
-    const message = { type: "audio", mime_type: "audio/pcm", data: base64data };
-    websocket.value.send(JSON.stringify(message));
+    websocket.value.send(encodeAudioFrame(combinedBuffer));
     
     audioBuffer.value = [];
   };
@@ -139,11 +137,11 @@ export function useAudio(websocket, onAudioData) {
 
   /**
    * Plays a chunk of audio data received from the server.
-   * @param {string} data - The Base64 encoded audio data to play.
+   * @param {string|ArrayBuffer} data - The raw PCM buffer or Base64 encoded audio data to play.
    */
   const playAudio = (data) => {
     if (audioPlayerNode.value) {
-      const audioData = base64ToArray(data);
+      const audioData = data instanceof ArrayBuffer ? data : base64ToArray(data);
       audioPlayerNode.value.port.postMessage(audioData);
     }
   };
@@ -40,3 +40,34 @@ export function convertFloat32ToPCM(inputData) {
   }
   return pcm16.buffer;
 }
+
+// Binary frame layout shared with the API: 1-byte version, 1-byte kind, raw int16 PCM.
+export const BINARY_FRAME_VERSION = 1;
+export const BINARY_FRAME_AUDIO = 0x01;
+export const BINARY_FRAME_HEADER_SIZE = 2;
+
+/**
+ * Wraps raw PCM bytes in a binary audio frame.
+ * @param {Uint8Array} pcmBytes The raw 16-bit PCM bytes.
+ * @returns {ArrayBuffer} The framed audio, ready to send over the WebSocket.
+ */
+export function encodeAudioFrame(pcmBytes) {
+  const frame = new Uint8Array(BINARY_FRAME_HEADER_SIZE + pcmBytes.length);
+  frame[0] = BINARY_FRAME_VERSION;
+  frame[1] = BINARY_FRAME_AUDIO;
+  frame.set(pcmBytes, BINARY_FRAME_HEADER_SIZE);
+  return frame.buffer;
+}
+
+/**
+ * Extracts the PCM payload from a binary audio frame.
+ * @param {ArrayBuffer} buffer The received binary frame.
+ * @returns {ArrayBuffer|null} The PCM payload, or null if the frame is not an audio frame.
+ */
+export function decodeAudioFrame(buffer) {
+  const header = new Uint8Array(buffer, 0, Math.min(buffer.byteLength, BINARY_FRAME_HEADER_SIZE));
+  if (header.length < BINARY_FRAME_HEADER_SIZE || header[0] !== BINARY_FRAME_VERSION || header[1] !== BINARY_FRAME_AUDIO) {
+    return null;
+  }
+  return buffer.slice(BINARY_FRAME_HEADER_SIZE);
+}
@@ -0,0 +1,28 @@
+/**
+ * Applies JSON Patch operations (add, remove, replace) to a copy of a document.
+ * Mirrors `apply_patch` in api/websocket/context.py.
+ * @param {object} document The document to patch.
+ * @param {Array<{op: string, path: string, value?: any}>} ops The operations to apply.
+ * @returns {object} The patched copy.
+ */
+export function applyPatch(document, ops) {
+  let result = structuredClone(document);
+  for (const op of ops) {
+    const tokens = op.path.split('/').slice(1).map((token) => token.replace(/~1/g, '/').replace(/~0/g, '~'));
+    if (tokens.length === 0) {
+      result = structuredClone(op.value);
+      continue;
+    }
+    let parent = result;
+    for (const token of tokens.slice(0, -1)) {
+      parent = parent[token];
+    }
+    const key = tokens[tokens.length - 1];
+    if (op.op === 'remove') {
+      delete parent[key];
+    } else {
+      parent[key] = structuredClone(op.value);
+    }
+  }
+  return result;
+}
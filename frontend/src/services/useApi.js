@@ -12,6 +12,7 @@ export function useApi() {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
       conversationStore.notes = '';
+      conversationStore.sessionId = null;
       conversationStore.analysis = null;
       return await response.json();
     } catch (error) {
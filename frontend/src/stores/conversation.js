@@ -2,12 +2,15 @@ import { defineStore } from 'pinia';
 import { ref } from 'vue';
 import { useSettingsStore } from './settings';
 import { useUserStore } from './user';
+import { decodeAudioFrame } from '../composables/audio/utils.js';
+import { applyPatch } from '../composables/jsonPatch.js';
 
 export const useConversationStore = defineStore('conversation', () => {
   const settingsStore = useSettingsStore();
   const websocket = ref(null);
   const messages = ref([]);
   const notes = ref('');
+  const sessionId = ref(null);
   const currentAvatar = ref('/assets/avatar_language_pal.png');
   const analysis = ref(null);
   const isAnalysing = ref(false);
@@ -19,10 +22,20 @@ export const useConversationStore = defineStore('conversation', () => {
 
   let playAudioCallback = null;
   let stopPlaybackCallback = null;
+  // The server sends context changes as patches against a numbered version.
+  let contextValues = {};
+  let contextVersion = 0;
+  // A dropped connection is resumed with the session's token, telling the
+  // server how many messages were received so it can send the rest again.
+  const MAX_RECONNECT_ATTEMPTS = 5;
+  let userId = null;
+  let resumeToken = null;
+  let receivedCount = 0;
+  let reconnectAttempts = 0;
+  let closedByUser = false;
 
   const connect = (playAudio, stopPlayback) => {
     const settingsStore = useSettingsStore();
-    const userStore = useUserStore();
 
     playAudioCallback = playAudio;
     stopPlaybackCallback = stopPlayback;
@@ -31,40 +44,100 @@ export const useConversationStore = defineStore('conversation', () => {
     conversationFinished.value = false;
     currentMessageId.value = null;
     notes.value = '';
+    sessionId.value = null;
     analysis.value = null;
     isAnalysing.value = false;
     activeTab.value = 'transcription';
+    contextValues = Object.fromEntries(
+      Object.entries(settingsStore.settings?.context_dict || {}).map(([key, item]) => [key, item.value]),
+    );
+    contextVersion = 0;
+
+    userId = Math.floor(Math.random() * 1000);
+    resumeToken = null;
+    receivedCount = 0;
+    reconnectAttempts = 0;
+    closedByUser = false;
+    openSocket();
+  };
+
+  const openSocket = () => {
+    const settingsStore = useSettingsStore();
+    const userStore = useUserStore();
 
-    const userId = Math.floor(Math.random() * 1000);
+    const resuming = resumeToken !== null;
     const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    const wsUrl = `${wsProtocol}//${window.location.host}/ws/${userId}?is_audio=true`;
-    
-    websocket.value = new WebSocket(wsUrl);
+    let wsUrl = `${wsProtocol}//${window.location.host}/ws/${userId}?is_audio=true&binary=true`;
+    if (resuming) {
+      wsUrl += `&resume=${encodeURIComponent(resumeToken)}&received=${receivedCount}`;
+    }
 
-    websocket.value.onopen = () => {
+    const socket = new WebSocket(wsUrl);
+    socket.binaryType = 'arraybuffer';
+    websocket.value = socket;
+
+    socket.onopen = () => {
       console.log('WebSocket connection established');
       if (settingsStore.settings) {
         const settingsMessage = {
           type: 'settings',
           settings: settingsStore.settings,
         };
-        websocket.value.send(JSON.stringify(settingsMessage));
+        socket.send(JSON.stringify(settingsMessage));
         console.log('Settings sent to server');
       }
-      messages.value.push({ id: Date.now(), sender: 'system', text: 'Connection established. You can start speaking.' });
+      const text = resuming ? 'Connection restored.' : 'Connection established. You can start speaking.';
+      messages.value.push({ id: Date.now(), sender: 'system', text });
       conversationStarted.value = true;
       isConnecting.value = false;
     };
 
-    websocket.value.onmessage = (event) => {
+    socket.onmessage = (event) => {
+      if (event.data instanceof ArrayBuffer) {
+        receivedCount += 1;
+        const audioData = decodeAudioFrame(event.data);
+        if (audioData && playAudioCallback) playAudioCallback(audioData);
+        return;
+      }
+
       const message = JSON.parse(event.data);
       console.log("[AGENT TO CLIENT] ", message);
 
+      if (message.type === 'session_started') {
+        if (resuming) {
+          messages.value.push({ id: Date.now(), sender: 'system', text: 'The previous session had expired, a new one was started.' });
+        }
+        sessionId.value = message.session_id;
+        resumeToken = message.resume_token;
+        receivedCount = 0;
+        reconnectAttempts = 0;
+        return;
+      }
+
+      if (message.type === 'session_resumed') {
+        resumeToken = message.resume_token;
+        reconnectAttempts = 0;
+        return;
+      }
+
+      receivedCount += 1;
+
       if (message.type === 'context_updated') {
+        contextValues = message.context_dict;
+        contextVersion = message.version ?? 0;
         settingsStore.updateContext(message.context_dict);
         return;
       }
 
+      if (message.type === 'context_patch') {
+        // A patch for another version is skipped; the next snapshot resyncs.
+        if (message.base_version !== contextVersion) return;
+        contextValues = applyPatch(contextValues, message.ops);
+        contextVersion = message.version;
+        settingsStore.updateContext(contextValues);
+        return;
+      }
+
       if (message.turn_complete) {
         currentMessageId.value = null;
         if (stopPlaybackCallback) stopPlaybackCallback();
@@ -97,8 +170,19 @@ export const useConversationStore = defineStore('conversation', () => {
       }
     };
 
-    websocket.value.onclose = (event) => {
+    socket.onclose = (event) => {
       console.log('WebSocket connection closed:', event);
+      if (websocket.value !== socket) return; // Replaced by a newer connection.
+      if (!closedByUser && resumeToken && reconnectAttempts < MAX_RECONNECT_ATTEMPTS) {
+        const delay = 500 * 2 ** reconnectAttempts;
+        reconnectAttempts += 1;
+        messages.value.push({ id: Date.now(), sender: 'system', text: 'Connection lost. Reconnecting...' });
+        isConnecting.value = true;
+        setTimeout(() => {
+          if (!closedByUser) openSocket();
+        }, delay);
+        return;
+      }
       // A close event with code 1006 means the connection was terminated abnormally.
       // If the API key isn't set, it's the likely cause.
       if (event.code === 1006 && !userStore.isApiKeySet) {
@@ -114,8 +198,9 @@ export const useConversationStore = defineStore('conversation', () => {
       isConnecting.value = false;
     };
 
-    websocket.value.onerror = (error) => {
+    socket.onerror = (error) => {
       console.error('WebSocket error:', error);
+      if (websocket.value !== socket || resumeToken) return; // onclose follows and reconnects.
       messages.value.push({ id: Date.now(), sender: 'system', text: 'An error occurred with the connection.' });
       conversationStarted.value = false;
       isConnecting.value = false;
@@ -124,6 +209,7 @@ export const useConversationStore = defineStore('conversation', () => {
 
 
   const disconnect = () => {
+    closedByUser = true;
     if (websocket.value && websocket.value.readyState < 2) { // OPEN or CONNECTING
       websocket.value.close();
     }
@@ -140,6 +226,7 @@ export const useConversationStore = defineStore('conversation', () => {
     websocket,
     messages,
     notes,
+    sessionId,
     analysis,
     isAnalysing,
     activeTab,
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+from api.benchmarks import load
+
+@pytest.mark.asyncio
+async def test_load_generator_runs_offline():
+    # Arrange
+    args = load.parse_args([
+        "--sessions", "3",
+        "--turns", "2",
+        "--text-every", "2",
+        "--speech-ms", "200",
+        "--reply-ms", "120",
+        "--response-delay-ms", "20",
+        "--timeout", "10",
+    ])
+    api_key = os.environ.get("GOOGLE_API_KEY")
+
+    # Act
+    report = await load.run(args)
+
+    # Assert
+    assert report["errors"] == 0
+    assert report["turns_completed"] == 6
+    assert report["turn_latency_p50_ms"] > 0
+    assert report["frames_received_per_second"] > 0
+    assert os.environ.get("GOOGLE_API_KEY") == api_key
+
+def test_percentile():
+    assert load.percentile([3, 1, 2, 4], 50) == 2
+    assert load.percentile([3, 1, 2, 4], 99) == 4
@@ -0,0 +1,9 @@
+from api.benchmarks import startup
+
+def test_startup_benchmark_reaches_health():
+    # Act
+    report = startup.run(startup.parse_args(["--runs", "1", "--timeout", "30"]))
+
+    # Assert
+    assert report["time_to_health_s_min"] > 0
+    assert report["sdk_modules_imported"] == 0
@@ -5,6 +5,17 @@ from api.main import app
 
 client = TestClient(app)
 
+SETTINGS = {
+    "app_name": "test_app",
+    "agent_description": "A test agent",
+    "context_dict": {"context": {"role": "user"}},
+    "goal_description": "Test goal",
+    "analyse_instruction": "Test instruction",
+    "voice_name": "Test voice",
+    "language_code": "en-US",
+    "gemini_api_key": "test_key"
+}
+
 @pytest.fixture
 def mock_analysis_service():
     with patch("api.services.analysis_service.analyse_notes") as mock:
@@ -13,19 +24,7 @@ def mock_analysis_service():
 def test_post_analyse(mock_analysis_service):
     # Arrange
     mock_analysis_service.return_value = {"summary": "Test summary"}
-    request_body = {
-        "notes": "These are test notes.",
-        "settings": {
-            "app_name": "test_app",
-            "agent_description": "A test agent",
-            "context_dict": {"context": {"role": "user"}},
-            "goal_description": "Test goal",
-            "analyse_instruction": "Test instruction",
-            "voice_name": "Test voice",
-            "language_code": "en-US",
-            "gemini_api_key": "test_key"
-        }
-    }
+    request_body = {"notes": "These are test notes.", "settings": SETTINGS}
 
     # Act
     response = client.post("/api/analyse", json=request_body)
@@ -34,3 +33,80 @@ def test_post_analyse(mock_analysis_service):
     assert response.status_code == 200
     assert response.json() == {"message": "Analysis complete", "analysis": {"summary": "Test summary"}}
     mock_analysis_service.assert_called_once()
+
+def test_post_analyse_runs_off_event_loop(mock_analysis_service):
+    # Arrange
+    import threading
+    main_thread = threading.get_ident()
+    calls = []
+    mock_analysis_service.side_effect = lambda *args: calls.append(threading.get_ident()) or "ok"
+
+    # Act
+    response = client.post("/api/analyse", json={"notes": "n", "settings": SETTINGS})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["analysis"] == "ok"
+    assert calls and calls[0] != main_thread
+
+def test_post_analyse_stream():
+    # Arrange
+    async def fake_stream(app_settings, notes, incremental=False):
+        for text in ["Hello", " world"]:
+            yield text
+
+    # Act
+    with patch("api.services.analysis_service.stream_analysis", fake_stream):
+        response = client.post("/api/analyse?stream=true", json={"notes": "n", "settings": SETTINGS})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == (
+        'data: {"text": "Hello"}\n\n'
+        'data: {"text": " world"}\n\n'
+        'event: done\ndata: {"message": "Analysis complete"}\n\n'
+    )
+
+def test_post_analyse_stream_error():
+    # Arrange
+    async def failing_stream(app_settings, notes, incremental=False):
+        yield "partial"
+        raise RuntimeError("quota exceeded")
+
+    # Act
+    with patch("api.services.analysis_service.stream_analysis", failing_stream):
+        response = client.post("/api/analyse?stream=true", json={"notes": "n", "settings": SETTINGS})
+
+    # Assert
+    assert response.text.endswith('event: error\ndata: {"message": "quota exceeded"}\n\n')
+
+def test_post_analyse_reads_session_transcript(mock_analysis_service, tmp_path):
+    # Arrange
+    from api.services.transcript_store import JsonlBackend, TranscriptLog
+    log = TranscriptLog(JsonlBackend(str(tmp_path)))
+    log.session("abc123").input("Bonjour")
+    mock_analysis_service.return_value = {"summary": "ok"}
+
+    # Act
+    with patch("api.routers.analyse.transcript_log", log):
+        response = client.post("/api/analyse", json={"session_id": "abc123", "settings": SETTINGS})
+        missing = client.post("/api/analyse", json={"session_id": "unknown", "settings": SETTINGS})
+    log.close()
+
+    # Assert
+    assert response.status_code == 200
+    assert mock_analysis_service.call_args.args[1] == "\n\n**You:** Bonjour"
+    assert missing.status_code == 404
+
+def test_post_analyse_requires_one_source():
+    assert client.post("/api/analyse", json={}).status_code == 422
+    assert client.post("/api/analyse", json={"notes": "a", "session_id": "b"}).status_code == 422
+
+def test_post_analyse_requires_settings(mock_analysis_service):
+    # Act
+    response = client.post("/api/analyse", json={"session_id": "abc123"})
+
+    # Assert
+    assert response.status_code == 422
+    mock_analysis_service.assert_not_called()
@@ -1,8 +1,14 @@
+import asyncio
+import hashlib
+import threading
+
 import pytest
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 from google.api_core import exceptions as google_exceptions
+from google.genai import errors as genai_errors
 from api.main import app
+from api.services import api_key_service
 
 client = TestClient(app)
 
@@ -13,7 +19,7 @@ def mock_genai_client():
 
 def test_verify_api_key_success(mock_genai_client):
     # Arrange
-    mock_genai_client.return_value.models.generate_content.return_value = None
+    mock_genai_client.return_value.models.get.return_value = None
     request_body = {"key": "valid_key"}
 
     # Act
@@ -25,7 +31,7 @@ def test_verify_api_key_success(mock_genai_client):
 
 def test_verify_api_key_failure(mock_genai_client):
     # Arrange
-    mock_genai_client.return_value.models.generate_content.side_effect = google_exceptions.GoogleAPICallError("Invalid API Key")
+    mock_genai_client.return_value.models.get.side_effect = google_exceptions.GoogleAPICallError("Invalid API Key")
     request_body = {"key": "invalid_key"}
 
     # Act
@@ -36,4 +42,71 @@ def test_verify_api_key_failure(mock_genai_client):
     assert response.json()["status"] == "error"
     assert "Invalid API Key" in response.json()["message"]
 
+def test_verify_api_key_is_cached(mock_genai_client):
+    # Act
+    first = client.post("/api/verify_api_key", json={"key": "cached_key"})
+    second = client.post("/api/verify_api_key", json={"key": "cached_key"})
+
+    # Assert
+    assert first.json()["status"] == second.json()["status"] == "success"
+    mock_genai_client.return_value.models.get.assert_called_once()
+
+def test_verify_api_key_caches_rejections(mock_genai_client):
+    # Arrange
+    mock_genai_client.return_value.models.get.side_effect = genai_errors.ClientError(
+        400, {"error": {"message": "API key not valid", "status": "INVALID_ARGUMENT"}}
+    )
+
+    # Act
+    first = client.post("/api/verify_api_key", json={"key": "bad_key"})
+    second = client.post("/api/verify_api_key", json={"key": "bad_key"})
+
+    # Assert
+    assert first.json() == second.json()
+    assert first.json()["status"] == "error"
+    mock_genai_client.return_value.models.get.assert_called_once()
+
+def test_verify_api_key_does_not_cache_rate_limits(mock_genai_client):
+    # Arrange
+    mock_genai_client.return_value.models.get.side_effect = [
+        genai_errors.ClientError(429, {"error": {"message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}}),
+        None,
+    ]
+
+    # Act
+    first = client.post("/api/verify_api_key", json={"key": "busy_key"})
+    second = client.post("/api/verify_api_key", json={"key": "busy_key"})
+
+    # Assert
+    assert first.json()["status"] == "error"
+    assert second.json()["status"] == "success"
+
+def test_verify_api_key_does_not_cache_transient_failures(mock_genai_client):
+    # Arrange
+    mock_genai_client.return_value.models.get.side_effect = [RuntimeError("timeout"), None]
+
+    # Act
+    first = client.post("/api/verify_api_key", json={"key": "flaky_key"})
+    second = client.post("/api/verify_api_key", json={"key": "flaky_key"})
+
+    # Assert
+    assert first.json()["status"] == "error"
+    assert second.json()["status"] == "success"
+
+@pytest.mark.asyncio
+async def test_concurrent_verifications_share_one_request(mock_genai_client):
+    # Arrange
+    release = threading.Event()
+    mock_genai_client.return_value.models.get.side_effect = lambda **kwargs: release.wait(5)
+
+    # Act
+    checks = [asyncio.create_task(api_key_service.verify_api_key("shared_key")) for _ in range(5)]
+    await asyncio.sleep(0.05)
+    release.set()
+    await asyncio.gather(*checks)
+
+    # Assert
+    mock_genai_client.return_value.models.get.assert_called_once()
 
+def test_key_fingerprint_is_salted():
+    assert api_key_service.key_fingerprint("some_key") != hashlib.sha256(b"some_key").hexdigest()
@@ -2,6 +2,8 @@ import pytest
 from unittest.mock import patch
 from fastapi.testclient import TestClient
 from api.main import app
+from api.services import app_service
+from api.services.app_service import AppCatalog
 
 client = TestClient(app)
 
@@ -37,3 +39,65 @@ def test_get_apps(mock_app_service):
     assert response.status_code == 200
     assert response.json() == [{"id": "app1"}, {"id": "app2"}]
     mock_get_apps.assert_called_once()
+
+def test_get_apps_etag_and_not_modified():
+    # Act
+    first = client.get("/api/apps")
+    revalidated = client.get("/api/apps", headers={"If-None-Match": first.headers["etag"]})
+
+    # Assert
+    assert first.status_code == 200
+    assert {app["id"] for app in first.json()} >= {"language_pal", "casual_chat"}
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == first.headers["etag"]
+
+def test_get_app_settings_not_modified():
+    # Act
+    first = client.get("/api/apps/language_pal/settings")
+    revalidated = client.get("/api/apps/language_pal/settings", headers={"If-None-Match": first.headers["etag"]})
+    missing = client.get("/api/apps/..%2Fpyproject/settings")
+
+    # Assert
+    assert first.json()["app_name"]
+    assert revalidated.status_code == 304
+    assert missing.status_code == 404
+
+def test_search_apps():
+    # Act
+    response = client.get("/api/apps?q=story&fields=id,goal")
+
+    # Assert
+    assert response.status_code == 200
+    assert [app["id"] for app in response.json()] == ["story_architect"]
+    assert set(response.json()[0]) == {"id", "goal"}
+
+def test_search_apps_cursor_pagination():
+    # Act
+    seen = []
+    response = client.get("/api/apps?limit=1")
+    while True:
+        seen.extend(app["id"] for app in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        response = client.get(f"/api/apps?limit=1&cursor={cursor}")
+
+    # Assert
+    assert seen == sorted(app["id"] for app in client.get("/api/apps").json())
+
+def test_search_apps_rejects_unknown_fields():
+    assert client.get("/api/apps?fields=secret").status_code == 400
+    assert client.get("/api/apps?cursor=%%%").status_code == 400
+
+def test_server_starts_without_apps_directory(tmp_path):
+    # Arrange
+    catalog = AppCatalog(str(tmp_path / "missing"))
+
+    # Act
+    with patch.object(app_service, "catalog", catalog), \
+            patch("api.main.agent_pool.warm_bundled_apps"), \
+            TestClient(app) as started:
+        response = started.get("/api/health")
+
+    # Assert
+    assert response.status_code == 200
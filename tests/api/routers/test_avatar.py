@@ -1,15 +1,36 @@
+import os
+
 import pytest
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 from google.api_core import exceptions as google_exceptions
 from api.main import app
 from api.exceptions import ApiKeyError, ImageGenerationError
+from api.routers import avatar
 
 client = TestClient(app)
 
+REQUEST_BODY = {
+    "settings": {
+        "app_name": "test_app",
+        "agent_description": "A test agent",
+        "context_dict": {"context": {"role": "user"}},
+        "goal_description": "Test goal",
+        "analyse_instruction": "Test instruction",
+        "voice_name": "Test voice",
+        "language_code": "en-US",
+        "gemini_api_key": "fake_key"
+    }
+}
+
+@pytest.fixture(autouse=True)
+def avatar_cache_dir(tmp_path):
+    with patch.object(avatar.avatar_cache, "directory", str(tmp_path)):
+        yield tmp_path
+
 @pytest.fixture
 def mock_genai_client():
-    with patch("api.routers.avatar.genai.Client") as mock:
+    with patch("google.genai.Client") as mock:
         yield mock
 
 def test_generate_avatar_success(mock_genai_client):
@@ -62,3 +83,82 @@ def test_generate_avatar_image_generation_error(mock_genai_client):
     # Assert
     assert response.status_code == 500
     assert response.json() == {"message": "Failed to generate image."}
+
+def _image_stream(data=b"fakedata"):
+    return iter([
+        MagicMock(candidates=[MagicMock(content=MagicMock(parts=[MagicMock(inline_data=MagicMock(data=data))]))]),
+    ])
+
+def test_generate_avatar_is_cached(mock_genai_client):
+    # Arrange
+    mock_genai_client.return_value.models.generate_content_stream.side_effect = lambda **kwargs: _image_stream()
+
+    # Act
+    first = client.post("/api/avatar/generate", json=REQUEST_BODY)
+    second = client.post("/api/avatar/generate", json=REQUEST_BODY)
+
+    # Assert
+    assert first.json() == second.json()
+    assert first.json()["url"].endswith(".png")
+    mock_genai_client.return_value.models.generate_content_stream.assert_called_once()
+
+def test_generate_avatar_png_and_conditional_get(mock_genai_client):
+    # Arrange
+    mock_genai_client.return_value.models.generate_content_stream.return_value = _image_stream(b"\x89PNG")
+
+    # Act
+    generated = client.post("/api/avatar/generate?format=png", json=REQUEST_BODY)
+    url = generated.headers["content-location"]
+    fetched = client.get(url)
+    revalidated = client.get(url, headers={"If-None-Match": fetched.headers["etag"]})
+
+    # Assert
+    assert generated.headers["content-type"] == "image/png"
+    assert generated.content == fetched.content == b"\x89PNG"
+    assert "immutable" in fetched.headers["cache-control"]
+    assert revalidated.status_code == 304
+
+def test_get_avatar_unknown_or_malformed_digest():
+    assert client.get(f"/api/avatar/{'0' * 64}.png").status_code == 404
+    assert client.get("/api/avatar/..%2Fsecret.png").status_code == 404
+
+def test_avatar_cache_evicts_least_recently_used(tmp_path):
+    # Arrange
+    cache = avatar.AvatarCache(str(tmp_path), max_bytes=10)
+    old, new = "a" * 64, "b" * 64
+    cache.put(old, b"123456")
+    os.utime(cache.path(old), (1, 1))
+
+    # Act
+    cache.put(new, b"123456")
+
+    # Assert
+    assert cache.get(old) is None
+    assert cache.get(new) == b"123456"
+
+def test_cached_avatar_does_not_wait_for_a_worker(mock_genai_client):
+    # Arrange
+    mock_genai_client.return_value.models.generate_content_stream.return_value = _image_stream()
+    client.post("/api/avatar/generate", json=REQUEST_BODY)
+
+    # Act
+    with patch.object(avatar.avatar_jobs, "submit") as submit:
+        response = client.post("/api/avatar/jobs", json=REQUEST_BODY)
+
+    # Assert
+    submit.assert_not_called()
+    assert response.json()["status"] == "done"
+
+def test_avatar_job_polling(mock_genai_client):
+    # Arrange
+    mock_genai_client.return_value.models.generate_content_stream.return_value = _image_stream()
+
+    # Act
+    created = client.post("/api/avatar/jobs", json=REQUEST_BODY)
+    polled = client.get(f"/api/avatar/jobs/{created.json()['job_id']}?wait=5")
+
+    # Assert
+    assert created.status_code == 202
+    assert polled.json()["status"] == "done"
+    assert client.get(polled.json()["url"]).content == b"fakedata"
+    assert client.get("/api/avatar/jobs/unknown").status_code == 404
@@ -0,0 +1,169 @@
+import asyncio
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from api.services import analysis_service
+from api.services.analysis_cache import AnalysisCache, SqliteStore
+from api.settings import AppSettings
+
+APP_SETTINGS = AppSettings(
+    app_name="test_app",
+    agent_description="A test agent",
+    context_dict={"topic": {"value": "travel"}},
+    goal_description="Test goal",
+    analyse_instruction="Summarise",
+    voice_name="Test voice",
+    language_code="en-US",
+    gemini_api_key="test_key",
+)
+
+@pytest.fixture(autouse=True)
+def clear_analysis_cache():
+    analysis_service.analysis_cache.clear()
+    analysis_service.chunk_cache.clear()
+    yield
+    analysis_service.analysis_cache.clear()
+    analysis_service.chunk_cache.clear()
+
+@pytest.fixture
+def mock_client():
+    client = MagicMock()
+    client.models.generate_content.return_value = MagicMock(text="An analysis")
+    with patch("api.services.client_pool.get_client", return_value=client):
+        yield client
+
+def test_analyse_notes_cache_hit(mock_client):
+    # Act
+    first = analysis_service.analyse_notes(APP_SETTINGS, "You: hello")
+    second = analysis_service.analyse_notes(APP_SETTINGS, "You: hello")
+
+    # Assert
+    assert first == second == "An analysis"
+    mock_client.models.generate_content.assert_called_once()
+
+def test_analyse_notes_cache_key_covers_inputs(mock_client):
+    # Act
+    analysis_service.analyse_notes(APP_SETTINGS, "You: hello")
+    analysis_service.analyse_notes(APP_SETTINGS, "You: hello again")
+    changed = APP_SETTINGS.model_copy(update={"analyse_instruction": "Grade"})
+    analysis_service.analyse_notes(changed, "You: hello")
+
+    # Assert
+    assert mock_client.models.generate_content.call_count == 3
+
+@pytest.mark.asyncio
+async def test_stream_analysis_caches_joined_text():
+    # Arrange
+    async def chunks():
+        for text in ["An ", "analysis"]:
+            yield MagicMock(text=text)
+
+    client = MagicMock()
+    client.aio.models.generate_content_stream = MagicMock(side_effect=lambda **kwargs: _awaitable(chunks()))
+
+    # Act
+    with patch("api.services.client_pool.get_client", return_value=client):
+        streamed = [t async for t in analysis_service.stream_analysis(APP_SETTINGS, "You: hi")]
+        cached = [t async for t in analysis_service.stream_analysis(APP_SETTINGS, "You: hi")]
+
+    # Assert
+    assert streamed == ["An ", "analysis"]
+    assert cached == ["An analysis"]
+    client.aio.models.generate_content_stream.assert_called_once()
+
+async def _awaitable(value):
+    return value
+
+def test_sqlite_backend_survives_restart(tmp_path):
+    # Arrange
+    path = str(tmp_path / "analysis.db")
+    AnalysisCache(maxsize=8, path=path).put("key", "stored")
+
+    # Act
+    restarted = AnalysisCache(maxsize=8, path=path)
+
+    # Assert
+    assert restarted.get("key") == "stored"
+    assert restarted.get("other") is None
+    assert restarted.stats()["hits"] == 1
+    assert restarted.stats()["misses"] == 1
+
+def test_sqlite_backend_purges_expired_and_oldest_rows(tmp_path):
+    # Arrange
+    path = str(tmp_path / "analysis.db")
+    store = SqliteStore(path, ttl=60, max_rows=3)
+    chunks = SqliteStore(path, max_rows=3, table="analysis_chunk_cache")
+    chunks.put("chunk", "summary")
+    now = time.time()
+
+    # Act
+    with patch("api.services.analysis_cache.time.time", return_value=now - 120):
+        store.put("expired", "old")
+    sizes = []
+    for i in range(4):
+        with patch("api.services.analysis_cache.time.time", return_value=now + i):
+            store.put(f"key{i}", str(i))
+        sizes.append(len(store))
+
+    # Assert
+    assert sizes == [1, 2, 3, 3]
+    assert store.get("key0") is None
+    assert store.get("key3") == "3"
+    assert chunks.get("chunk") == "summary"
+
+def _turns(count, start=0):
+    return "\n\n".join(f"**You:** turn {i} " + "x" * 40 for i in range(start, start + count))
+
+def test_chunk_notes_is_stable_under_appends():
+    # Arrange
+    notes = _turns(10)
+    longer = notes + "\n\n" + _turns(3, start=10)
+
+    # Act
+    chunks = analysis_service.chunk_notes(notes, max_chars=150)
+    longer_chunks = analysis_service.chunk_notes(longer, max_chars=150)
+
+    # Assert
+    assert "".join(chunks) == notes
+    assert "".join(longer_chunks) == longer
+    assert all(len(chunk) <= 150 for chunk in chunks)
+    assert longer_chunks[:len(chunks) - 1] == chunks[:-1]
+
+@pytest.mark.asyncio
+async def test_incremental_analysis_only_summarises_new_chunks():
+    # Arrange
+    in_flight = 0
+    peak = 0
+    prompts = []
+
+    async def generate_content(model, contents):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        prompts.append(contents[0])
+        return MagicMock(text=f"summary {len(prompts)}")
+
+    client = MagicMock()
+    client.aio.models.generate_content = generate_content
+    notes = _turns(20)
+
+    # Act
+    with patch("api.services.client_pool.get_client", return_value=client), \
+         patch.object(analysis_service.settings, "analysis_chunk_chars", 150), \
+         patch.object(analysis_service.settings, "analysis_map_concurrency", 2):
+        chunk_count = len(analysis_service.chunk_notes(notes))
+        await analysis_service.analyse_notes_incremental(APP_SETTINGS, notes)
+        first_calls = len(prompts)
+        await analysis_service.analyse_notes_incremental(APP_SETTINGS, notes + "\n\n" + _turns(1, start=20))
+
+    # Assert
+    assert chunk_count > 2
+    assert first_calls == chunk_count + 1
+    assert peak <= 2
+    # Only the changed tail chunk is summarised again, plus the reduce step.
+    assert len(prompts) - first_calls == 2
+    assert "Segment 1:" in prompts[-1]
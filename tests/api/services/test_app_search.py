@@ -0,0 +1,57 @@
+import json
+import os
+
+import pytest
+
+from api.services.app_search import AppIndex, parse_fields, select_fields
+from api.services.app_service import AppCatalog
+
+def write_app(path, app_id, **data):
+    file = path / f"{app_id}.json"
+    file.write_text(json.dumps(data))
+    return file
+
+@pytest.fixture
+def catalog(tmp_path):
+    write_app(tmp_path, "interview", app_name="Interview Coach",
+              agent_description="A hiring manager", context_dict={"job_title": {"value": ""}})
+    write_app(tmp_path, "spanish", app_name="Spanish Tutor",
+              agent_description="A patient language teacher", goal_description="Practise ordering food")
+    return AppCatalog(str(tmp_path), check_interval=0)
+
+def test_search_matches_prefixes_of_every_word(catalog):
+    index = AppIndex(catalog)
+
+    assert index.search("lang") == {"spanish"}
+    assert index.search("Spanish food") == {"spanish"}
+    assert index.search("job") == {"interview"}
+    assert index.search("spanish hiring") == set()
+    assert index.search("") == {"interview", "spanish"}
+
+def test_index_follows_catalog_changes(catalog, tmp_path):
+    # Arrange
+    index = AppIndex(catalog)
+    spanish = write_app(tmp_path, "spanish", app_name="French Tutor")
+    os.utime(spanish, ns=(1, 1))
+    write_app(tmp_path, "story", app_name="Story Architect")
+
+    # Act
+    french = index.search("french")
+    spanish_results = index.search("spanish")
+    story = index.search("story")
+
+    # Assert
+    assert french == {"spanish"}
+    assert spanish_results == {"spanish"}  # still found by its id
+    assert story == {"story"}
+    assert index.search("patient") == set()
+
+def test_parse_fields():
+    assert parse_fields(None) == ("id", "name", "summary")
+    assert parse_fields("id, goal,id") == ("id", "goal")
+    with pytest.raises(ValueError):
+        parse_fields("id,secret")
+
+def test_select_fields():
+    data = {"app_name": "Coach", "context_dict": {"b": {}, "a": {}}}
+    assert select_fields("coach", data, ("name", "context_keys")) == {"name": "Coach", "context_keys": ["a", "b"]}
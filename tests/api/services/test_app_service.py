@@ -0,0 +1,58 @@
+import json
+import os
+
+import pytest
+
+from api.exceptions import AppNotFoundError
+from api.services.app_service import AppCatalog
+
+def write_app(path, app_id, **data):
+    file = path / f"{app_id}.json"
+    file.write_text(json.dumps({"app_name": app_id, **data}))
+    return file
+
+def test_catalog_reloads_only_changed_files(tmp_path):
+    # Arrange
+    write_app(tmp_path, "one")
+    two = write_app(tmp_path, "two")
+    catalog = AppCatalog(str(tmp_path), check_interval=0)
+    catalog.refresh()
+    etag = catalog.etag
+
+    # Act
+    unchanged = catalog.refresh()
+    two.write_text(json.dumps({"app_name": "two", "agent_description": "changed"}))
+    os.utime(two, ns=(1, 1))
+    (tmp_path / "one.json").unlink()
+    changed = catalog.refresh()
+
+    # Assert
+    assert unchanged == set()
+    assert changed == {"one", "two"}
+    assert catalog.get("one") is None
+    assert catalog.get("two").data["agent_description"] == "changed"
+    assert catalog.etag != etag
+
+def test_catalog_check_interval_throttles_scans(tmp_path):
+    # Arrange
+    catalog = AppCatalog(str(tmp_path), check_interval=60)
+    catalog.refresh()
+
+    # Act
+    write_app(tmp_path, "late")
+
+    # Assert
+    assert catalog.get("late") is None
+    assert catalog.refresh(force=True) == {"late"}
+
+def test_catalog_marks_malformed_files(tmp_path):
+    # Arrange
+    (tmp_path / "broken.json").write_text("{")
+    catalog = AppCatalog(str(tmp_path), check_interval=0)
+
+    # Act / Assert
+    assert catalog.get("broken").malformed
+
+def test_catalog_missing_directory(tmp_path):
+    with pytest.raises(AppNotFoundError):
+        AppCatalog(str(tmp_path / "missing")).refresh()
@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+from api.services.avatar_jobs import DONE, FAILED, AvatarJobQueue
+
+@pytest.mark.asyncio
+async def test_identical_prompts_are_coalesced():
+    # Arrange
+    queue = AvatarJobQueue(max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def generate():
+        calls.append(1)
+        release.wait(5)
+        return b"png"
+
+    # Act
+    first = queue.submit("a" * 64, generate)
+    second = queue.submit("a" * 64, generate)
+    release.set()
+    finished = await queue.wait(first, timeout=5)
+
+    # Assert
+    assert finished
+    assert first is second
+    assert first.status == DONE
+    assert first.future.result() == b"png"
+    assert len(calls) == 1
+    assert queue.coalesced == 1
+    assert queue.get(first.id) is first
+
+@pytest.mark.asyncio
+async def test_worker_pool_is_bounded():
+    # Arrange
+    queue = AvatarJobQueue(max_workers=1)
+    release = threading.Event()
+
+    # Act
+    running = queue.submit("a" * 64, lambda: release.wait(5) and b"a")
+    waiting = queue.submit("b" * 64, lambda: b"b")
+    timed_out = not await queue.wait(waiting, timeout=0.05)
+    release.set()
+    await queue.wait(waiting, timeout=5)
+
+    # Assert
+    assert timed_out
+    assert running.status == waiting.status == DONE
+
+@pytest.mark.asyncio
+async def test_failed_job_is_not_reused():
+    # Arrange
+    queue = AvatarJobQueue(max_workers=1)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    # Act
+    failed = queue.submit("a" * 64, fail)
+    await queue.wait(failed, timeout=5)
+    retried = queue.submit("a" * 64, lambda: b"png")
+    await queue.wait(retried, timeout=5)
+
+    # Assert
+    assert failed.status == FAILED
+    assert retried is not failed
+    assert retried.status == DONE
+
+@pytest.mark.asyncio
+async def test_jobs_are_coalesced_per_api_key():
+    # Arrange
+    queue = AvatarJobQueue(max_workers=1)
+    release = threading.Event()
+
+    # Act
+    blocker = queue.submit("a" * 64, lambda: release.wait(5) and b"a", owner="key-a")
+    same_key = queue.submit("a" * 64, lambda: b"a", owner="key-a")
+    other_key = queue.submit("a" * 64, lambda: b"b", owner="key-b")
+    other_key.future.cancel()
+    release.set()
+    await queue.wait(blocker, timeout=5)
+
+    # Assert
+    assert same_key is blocker
+    assert other_key is not blocker
+    assert other_key.status == FAILED
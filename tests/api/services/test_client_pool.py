@@ -0,0 +1,40 @@
+import gc
+import httpx
+from unittest.mock import patch
+from api.services import client_pool
+
+def test_clients_are_reused_per_api_key():
+    # Act
+    first = client_pool.get_client("key-1")
+    again = client_pool.get_client("key-1")
+    other = client_pool.get_client("key-2")
+
+    # Assert
+    assert first is again
+    assert other is not first
+    assert first._api_client._httpx_client._transport._pool._ssl_context is client_pool._ssl_context
+    assert first._api_client._httpx_client._transport is not other._api_client._httpx_client._transport
+
+def test_evict_drops_the_client():
+    # Arrange
+    first = client_pool.get_client("key-1")
+
+    # Act
+    client_pool.evict("key-1")
+
+    # Assert
+    assert client_pool.get_client("key-1") is not first
+
+def test_evicting_a_client_keeps_other_clients_usable():
+    # Arrange
+    client_pool.get_client("key-a")
+    transport = client_pool.get_client("key-b")._api_client._httpx_client._transport
+
+    # Act
+    with patch.object(httpx.HTTPTransport, "close", autospec=True) as close:
+        client_pool.evict("key-a")
+        gc.collect()
+
+    # Assert
+    assert all(call.args[0] is not transport for call in close.call_args_list)
+    assert client_pool.get_client("key-b")._api_client._httpx_client._transport is transport
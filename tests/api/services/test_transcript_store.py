@@ -0,0 +1,77 @@
+import os
+import time
+import pytest
+
+from api.exceptions import TranscriptNotFoundError
+from api.services.transcript_store import (
+    INPUT,
+    OUTPUT,
+    JsonlBackend,
+    SqliteBackend,
+    TranscriptLog,
+    render_notes,
+)
+
+@pytest.fixture(params=["jsonl", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "jsonl":
+        backend = JsonlBackend(str(tmp_path / "transcripts"))
+    else:
+        backend = SqliteBackend(str(tmp_path / "transcripts.db"))
+    yield backend
+    backend.close()
+
+def test_log_batches_records_per_session(backend):
+    # Arrange
+    log = TranscriptLog(backend, batch_size=100, flush_interval_ms=60_000)
+    writes = []
+    write = backend.write
+    backend.write = lambda batch: writes.append(sum(map(len, batch.values()))) or write(batch)
+
+    # Act
+    transcript = log.session("s1")
+    transcript.input("Hel")
+    transcript.input("lo")
+    transcript.turn(turn_complete=True, interrupted=False)
+    transcript.output("Hi there")
+    log.append("s2", INPUT, "Other")
+    notes = log.notes("s1")
+    log.close()
+
+    # Assert
+    assert writes == [5]
+    assert notes == "\n\n**You:** Hello\n\n**Agent:** Hi there"
+
+def test_read_rejects_unknown_and_unsafe_session_ids(backend):
+    # Arrange
+    log = TranscriptLog(backend)
+
+    # Act / Assert
+    with pytest.raises(TranscriptNotFoundError):
+        log.read("missing")
+    with pytest.raises(TranscriptNotFoundError):
+        log.read("../secrets")
+
+def test_prune_removes_expired_sessions(backend):
+    # Arrange
+    backend.write({"old": [{"ts": time.time() - 100, "kind": OUTPUT, "text": "a"}]})
+    backend.write({"new": [{"ts": time.time(), "kind": OUTPUT, "text": "b"}]})
+    if isinstance(backend, JsonlBackend):
+        past = time.time() - 100
+        os.utime(backend.path("old"), (past, past))
+
+    # Act
+    pruned = backend.prune(time.time() - 50)
+
+    # Assert
+    assert pruned == 1
+    assert backend.read("old") == []
+    assert [r["text"] for r in backend.read("new")] == ["b"]
+
+def test_render_notes_skips_turn_events():
+    records = [
+        {"kind": "input", "text": "Hi"},
+        {"kind": "turn_complete", "text": ""},
+        {"kind": "input", "text": " again"},
+    ]
+    assert render_notes(records) == "\n\n**You:** Hi again"
@@ -0,0 +1,65 @@
+import json
+
+from api import create_agent as create_agent_module
+from api.create_agent import clear_agent_cache, create_agent
+from api.services import app_service
+from api.services.app_service import AppCatalog
+
+SETTINGS = {
+    "app_name": "test_app",
+    "agent_description": "A test agent",
+    "context_dict": {"context": {"value": "user"}},
+    "goal_description": "Test goal",
+    "analyse_instruction": "Test instruction",
+    "voice_name": "Test voice",
+    "language_code": "en-US",
+}
+
+def edit_context_dict(context_dict: dict) -> dict:
+    return {}
+
+def test_create_agent_is_memoized():
+    # Arrange
+    clear_agent_cache()
+    cache = create_agent_module.agent_cache
+    hits, misses = cache.hits, cache.misses
+
+    # Act
+    first = create_agent(SETTINGS, tools=[edit_context_dict])
+    second = create_agent(dict(SETTINGS, gemini_api_key="key"), tools=[edit_context_dict])
+    other = create_agent(dict(SETTINGS, goal_description="Other goal"), tools=[edit_context_dict])
+
+    # Assert
+    assert first is second
+    assert other is not first
+    assert (cache.hits - hits, cache.misses - misses, len(cache)) == (1, 2, 2)
+
+def test_template_change_invalidates_cache(monkeypatch):
+    # Arrange
+    clear_agent_cache()
+    first = create_agent(SETTINGS, tools=[edit_context_dict])
+
+    # Act
+    monkeypatch.setattr(create_agent_module, "instruction_template", "New {agent_description}{goal_description}{context}")
+    second = create_agent(SETTINGS, tools=[edit_context_dict])
+
+    # Assert
+    assert second is not first
+    assert second.instruction.startswith("New A test agent")
+
+def test_app_config_change_drops_only_that_apps_agents(tmp_path, monkeypatch):
+    # Arrange
+    clear_agent_cache()
+    catalog = AppCatalog(str(tmp_path))
+    monkeypatch.setattr(app_service, "catalog", catalog)
+    catalog.listeners.append(create_agent_module._on_apps_changed)
+    changed = create_agent(SETTINGS, tools=[edit_context_dict])
+    unchanged = create_agent(dict(SETTINGS, app_name="other_app", goal_description="Other goal"), tools=[edit_context_dict])
+    (tmp_path / "test_app.json").write_text(json.dumps(SETTINGS))
+
+    # Act
+    catalog.refresh(force=True)
+
+    # Assert
+    assert create_agent(SETTINGS, tools=[edit_context_dict]) is not changed
+    assert create_agent(dict(SETTINGS, app_name="other_app", goal_description="Other goal"), tools=[edit_context_dict]) is unchanged
@@ -0,0 +1,124 @@
+import gzip
+import os
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from api import frontend
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<html>" + "x" * 2000 + "</html>")
+    (tmp_path / "assets" / "index-AbCd1234.js").write_text("console.log(1);" * 200)
+    (tmp_path / "assets" / "avatar_language_pal.png").write_bytes(b"\x89PNG")
+    manifest = frontend.StaticManifest(str(tmp_path))
+
+    app = FastAPI()
+
+    @app.get("/{full_path:path}")
+    async def catch_all(request: Request, full_path: str):
+        return frontend.serve(request, full_path)
+
+    original = frontend.manifest
+    frontend.manifest = manifest
+    yield TestClient(app)
+    frontend.manifest = original
+
+def test_hashed_assets_are_immutable_and_compressed(client):
+    # Act
+    response = client.get("/assets/index-AbCd1234.js", headers={"Accept-Encoding": "gzip"})
+
+    # Assert
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == frontend.IMMUTABLE_CACHE_CONTROL
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == "console.log(1);" * 200
+
+def test_identity_when_compression_not_accepted(client):
+    response = client.get("/assets/index-AbCd1234.js", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "console.log(1);" * 200
+
+def test_index_is_revalidated_with_etag(client):
+    # Act
+    first = client.get("/")
+    revalidated = client.get("/some/spa/route", headers={"If-None-Match": first.headers["etag"]})
+
+    # Assert
+    assert first.text.startswith("<html>")
+    assert first.headers["cache-control"] == "no-cache"
+    assert revalidated.status_code == 304
+
+def test_unhashed_assets_are_revalidated(client):
+    response = client.get("/assets/avatar_language_pal.png")
+
+    assert response.content == b"\x89PNG"
+    assert response.headers["cache-control"] == "no-cache"
+
+def test_missing_asset_is_not_masked_by_index(client):
+    assert client.get("/assets/missing.js").status_code == 404
+
+def test_path_traversal_is_rejected():
+    manifest = frontend.StaticManifest("/nonexistent")
+    manifest.files = {"index.html": object()}
+    manifest._built = True
+
+    assert manifest.get("../secret.txt") is None
+    assert manifest.get("assets/../../secret.txt") is None
+    assert manifest.get("/etc/passwd") is None
+    assert manifest.get("index.html") is not None
+
+def test_precompress_writes_gzip_variants(tmp_path):
+    # Arrange
+    (tmp_path / "app.js").write_text("let a = 1;" * 500)
+    (tmp_path / "tiny.js").write_text("1")
+
+    # Act
+    frontend.precompress(str(tmp_path))
+    manifest = frontend.StaticManifest(str(tmp_path))
+    manifest.build()
+
+    # Assert
+    assert gzip.decompress((tmp_path / "app.js.gz").read_bytes()) == b"let a = 1;" * 500
+    assert not (tmp_path / "tiny.js.gz").exists()
+    assert set(manifest.files) == {"app.js", "tiny.js"}
+
+def test_files_larger_than_memory_limit_are_compressed(tmp_path):
+    # Arrange
+    body = os.urandom(20000).hex()
+    (tmp_path / "vendor.js").write_text(body)
+    manifest = frontend.StaticManifest(str(tmp_path), memory_max_bytes=1024)
+    app = FastAPI()
+
+    @app.get("/{full_path:path}")
+    async def catch_all(request: Request, full_path: str):
+        return frontend.serve(request, full_path)
+
+    # Act
+    with patch.object(frontend, "manifest", manifest):
+        response = TestClient(app).get("/vendor.js", headers={"Accept-Encoding": "gzip"})
+
+    # Assert
+    assert manifest.files["vendor.js"].body is None
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress((tmp_path / "vendor.js.gz").read_bytes()).decode() == body
+    assert response.text == body
+
+def test_stale_precompressed_variants_are_recompressed(tmp_path):
+    # Arrange
+    (tmp_path / "app.js").write_text("let a = 1;" * 500)
+    frontend.precompress(str(tmp_path))
+    (tmp_path / "app.js").write_text("let b = 2;" * 500)
+    os.utime(tmp_path / "app.js.gz", (0, 0))
+    manifest = frontend.StaticManifest(str(tmp_path))
+
+    # Act
+    manifest.build()
+
+    # Assert
+    assert gzip.decompress(manifest.files["app.js"].variants["gzip"]) == b"let b = 2;" * 500
+    assert gzip.decompress((tmp_path / "app.js.gz").read_bytes()) == b"let b = 2;" * 500
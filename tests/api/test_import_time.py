@@ -0,0 +1,19 @@
+from api.benchmarks.startup import HEAVY_MODULES, import_profile
+
+# Importing the app took ~5.8s when it loaded the SDKs eagerly and ~0.6s
+# without them; the budget leaves room for slow CI machines.
+IMPORT_BUDGET_SECONDS = 2.5
+
+def test_importing_the_app_does_not_load_the_sdks():
+    # Act
+    profile = import_profile("api.main")
+
+    # Assert
+    assert [name for name in profile if name.startswith(HEAVY_MODULES)] == []
+    assert profile["api.main"] / 1e6 < IMPORT_BUDGET_SECONDS
+
+def test_importing_settings_does_not_load_the_app():
+    profile = import_profile("api.settings")
+
+    assert "api.main" not in profile
+    assert "fastapi" not in profile
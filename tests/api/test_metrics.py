@@ -0,0 +1,56 @@
+import threading
+
+from fastapi.testclient import TestClient
+from api.main import app
+from api.metrics import Histogram, MetricsRegistry
+
+client = TestClient(app)
+
+def test_histogram_renders_cumulative_buckets():
+    # Arrange
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "Test latency.", buckets=(0.1, 1.0))
+
+    # Act
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+
+    # Assert
+    assert registry.render().splitlines() == [
+        "# HELP test_seconds Test latency.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{le="0.1"} 1',
+        'test_seconds_bucket{le="1"} 2',
+        'test_seconds_bucket{le="+Inf"} 3',
+        "test_seconds_sum 5.55",
+        "test_seconds_count 3",
+    ]
+
+def test_counter_inc_is_thread_safe():
+    # Arrange
+    counter = MetricsRegistry().counter("test_total", "Test counter.")
+
+    def work():
+        for _ in range(10000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    assert counter.value == 80000
+
+def test_metrics_endpoint():
+    # Act
+    response = client.get("/api/metrics")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE vox_ws_turn_latency_seconds histogram" in response.text
+    assert "vox_sessions " in response.text
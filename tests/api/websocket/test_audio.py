@@ -0,0 +1,122 @@
+import asyncio
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from api.websocket.audio import AudioAggregator, VoiceActivityDetector
+
+def _aggregator(**kwargs):
+    live_request_queue = MagicMock()
+    sent = []
+    live_request_queue.send_realtime.side_effect = lambda blob: sent.append(blob.data)
+    return AudioAggregator(live_request_queue, **kwargs), sent
+
+@pytest.mark.asyncio
+async def test_small_chunks_are_aggregated_into_frames():
+    # Arrange
+    aggregator, sent = _aggregator(frame_ms=40, max_latency_ms=1000)
+    chunk = b"\x01\x00" * 128  # one 8 ms render quantum
+
+    # Act
+    for _ in range(5):
+        aggregator.push(chunk)
+
+    # Assert
+    assert sent == [chunk * 5]
+    assert aggregator.chunks_in == 5 and aggregator.blobs_out == 1
+
+@pytest.mark.asyncio
+async def test_large_chunk_is_sent_as_whole_frames():
+    # Arrange
+    aggregator, sent = _aggregator(frame_ms=20, max_latency_ms=1000)
+
+    # Act
+    aggregator.push(b"\x00" * 1300)
+
+    # Assert
+    assert [len(data) for data in sent] == [1280]
+
+@pytest.mark.asyncio
+async def test_remainder_is_flushed_after_max_latency():
+    # Arrange
+    aggregator, sent = _aggregator(frame_ms=20, max_latency_ms=10)
+
+    # Act
+    aggregator.push(b"\x02\x00" * 10)
+    await asyncio.sleep(0.05)
+
+    # Assert
+    assert sent == [b"\x02\x00" * 10]
+
+def _tone(samples: int, amplitude: int) -> bytes:
+    t = np.arange(samples)
+    return (amplitude * np.sin(2 * np.pi * 440 * t / 16000)).astype("<i2").tobytes()
+
+def test_vad_drops_silence_after_hangover():
+    # Arrange
+    vad = VoiceActivityDetector(mode="suppress", energy_threshold_dbfs=-45, hangover_ms=80)
+    speech = _tone(640, 8000)
+    silence = bytes(1280)
+
+    # Act
+    accepted = [vad.accept(frame) for frame in [speech, silence, silence, silence]]
+
+    # Assert
+    assert accepted == [True, True, True, False]
+    assert vad.frames_dropped == 1
+
+@pytest.mark.parametrize("keep_every, expected", [
+    (1, [True, True, True, True, True, True]),
+    (2, [True, False, True, False, True, False]),
+    (3, [True, False, False, True, False, False]),
+])
+def test_vad_thins_silence(keep_every, expected):
+    # Arrange
+    vad = VoiceActivityDetector(mode="thin", hangover_ms=0, thin_keep_every=keep_every)
+
+    # Act
+    accepted = [vad.accept(bytes(640)) for _ in range(6)]
+
+    # Assert
+    assert accepted == expected
+
+@pytest.mark.asyncio
+async def test_aggregator_applies_vad():
+    # Arrange
+    vad = VoiceActivityDetector(mode="suppress", hangover_ms=0)
+    aggregator, sent = _aggregator(frame_ms=20, max_latency_ms=1000, vad=vad)
+
+    # Act
+    aggregator.push(bytes(640))
+    aggregator.push(_tone(320, 8000))
+
+    # Assert
+    assert len(sent) == 1
+    assert vad.frames_in == 2 and vad.frames_dropped == 1
+
+@pytest.mark.asyncio
+async def test_odd_length_chunks_are_sent_as_whole_samples():
+    # Arrange
+    aggregator, sent = _aggregator(frame_ms=20, max_latency_ms=10)
+
+    # Act
+    aggregator.push(b"\x01\x00\x02")
+    await asyncio.sleep(0.05)
+    aggregator.push(b"\x00\x03\x00")
+    aggregator.flush()
+
+    # Assert
+    assert sent == [b"\x01\x00", b"\x02\x00\x03\x00"]
+    assert VoiceActivityDetector().is_speech(b"\x01\x00\x02") is False
+
+@pytest.mark.asyncio
+async def test_remainder_is_flushed_when_speech_ends():
+    # Arrange
+    vad = VoiceActivityDetector(mode="suppress", energy_threshold_dbfs=-45, hangover_ms=20)
+    aggregator, sent = _aggregator(frame_ms=20, max_latency_ms=1000, vad=vad)
+
+    # Act
+    aggregator.push(_tone(320, 8000))
+    aggregator.push(bytes(640 + 100))
+
+    # Assert
+    assert [len(data) for data in sent] == [640, 640, 100]
@@ -0,0 +1,41 @@
+import base64
+import json
+import pytest
+from api.websocket import codec
+from api.websocket.messaging import (
+    AgentAudioMessage,
+    AgentInputTranscriptionMessage,
+    AgentTextMessage,
+    AgentTurnCompleteMessage,
+    AudioMessage,
+)
+
+@pytest.mark.parametrize("turn_complete,interrupted", [(True, False), (False, True), (True, True)])
+def test_turn_complete_matches_schema(turn_complete, interrupted):
+    expected = AgentTurnCompleteMessage(turn_complete=turn_complete, interrupted=interrupted)
+    assert json.loads(codec.encode_turn_complete(turn_complete, interrupted)) == expected.model_dump()
+
+def test_agent_audio_matches_schema():
+    data = bytes(range(256))
+    expected = AgentAudioMessage(data=base64.b64encode(data).decode("ascii"))
+    assert json.loads(codec.encode_agent_audio(data)) == expected.model_dump()
+
+def test_transcriptions_match_schema():
+    assert codec.input_transcription("hi") == AgentInputTranscriptionMessage(input_transcription={"text": "hi"}).model_dump()
+    assert codec.output_transcription("hi") == AgentTextMessage(output_transcription={"text": "hi"}).model_dump()
+
+def test_decode_audio_message():
+    # Arrange
+    frame = AudioMessage(data=base64.b64encode(b"\x01\x02").decode("ascii")).model_dump_json()
+
+    # Act
+    message = codec.decode_client_message(frame)
+
+    # Assert
+    assert message["type"] == "audio"
+    assert codec.decode_audio_data(message) == b"\x01\x02"
+
+@pytest.mark.parametrize("frame", ["not json", "[]", '{"type": "text"}', '{"type": "audio", "data": 1}'])
+def test_decode_rejects_invalid_frames(frame):
+    with pytest.raises(codec.MessageDecodeError):
+        codec.decode_client_message(frame)
@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+
+from api.websocket.context import ContextSync, apply_patch, diff
+from api.websocket.tools import (
+    SESSION_ID_STATE_KEY,
+    edit_context_dict,
+    register_session,
+    unregister_session,
+)
+
+STORY = {
+    "genre": "Fantasy",
+    "characters": {"hero": "Ayla", "mentor": "Oren"},
+    "chapters": ["Prologue"],
+}
+
+class FakeOutbound:
+    def __init__(self):
+        self.messages = []
+
+    def put(self, message, **kwargs):
+        self.messages.append(message)
+
+def test_diff_round_trip():
+    # Arrange
+    new = {
+        "genre": "Fantasy",
+        "characters": {"hero": "Ayla", "rival/foe": "Vex"},
+        "chapters": ["Prologue", "One"],
+        "tone": "Dark",
+    }
+
+    # Act
+    ops = diff(STORY, new)
+
+    # Assert
+    assert apply_patch(STORY, ops) == new
+    assert {"op": "add", "path": "/characters/rival~1foe", "value": "Vex"} in ops
+    assert {"op": "remove", "path": "/characters/mentor"} in ops
+    assert diff(new, new) == []
+
+@pytest.mark.asyncio
+async def test_rapid_edits_are_sent_as_one_patch():
+    # Arrange
+    outbound = FakeOutbound()
+    sync = ContextSync(outbound, STORY, debounce_ms=20, snapshot_every=10, snapshot_interval=0)
+
+    # Act
+    sync.update(dict(STORY, genre="Sci-fi"))
+    sync.update(dict(STORY, genre="Mystery"))
+    await asyncio.sleep(0.05)
+
+    # Assert
+    assert outbound.messages == [{
+        "type": "context_patch",
+        "version": 1,
+        "base_version": 0,
+        "ops": [{"op": "replace", "path": "/genre", "value": "Mystery"}],
+    }]
+
+@pytest.mark.asyncio
+async def test_snapshots_are_sent_periodically():
+    # Arrange
+    outbound = FakeOutbound()
+    sync = ContextSync(outbound, STORY, debounce_ms=0, snapshot_every=3, snapshot_interval=0.02)
+
+    # Act
+    for genre in ("A", "B", "C"):
+        sync.update(dict(STORY, genre=genre))
+    sync.update(dict(STORY, genre="D"))
+    await asyncio.sleep(0.05)
+    sync.update({"genre": "E"})
+
+    # Assert
+    types = [(m["type"], m["version"]) for m in outbound.messages]
+    assert types == [
+        ("context_patch", 1),
+        ("context_patch", 2),
+        ("context_updated", 3),
+        ("context_patch", 4),
+        ("context_updated", 5),  # after snapshot_interval
+        ("context_updated", 6),  # the patch would be larger than the context
+    ]
+    assert outbound.messages[-1]["context_dict"] == {"genre": "E"}
+
+@pytest.mark.asyncio
+async def test_edit_context_dict_updates_the_session_context():
+    # Arrange
+    outbound = FakeOutbound()
+    sync = register_session("s1", outbound, STORY)
+    sync.debounce = 0
+    tool_context = MagicMock(state={SESSION_ID_STATE_KEY: "s1"})
+
+    # Act
+    await edit_context_dict(dict(STORY, genre="Horror"), tool_context)
+    unregister_session("s1")
+    await edit_context_dict(STORY, tool_context)
+
+    # Assert
+    assert sync.context["genre"] == "Horror"
+    assert len(outbound.messages) == 1
+
+@pytest.mark.asyncio
+async def test_snapshot_follows_the_last_patch_of_a_burst():
+    # Arrange
+    outbound = FakeOutbound()
+    sync = ContextSync(outbound, STORY, debounce_ms=0, snapshot_every=10, snapshot_interval=0.1)
+
+    # Act
+    sync.update(dict(STORY, genre="A"))
+    await asyncio.sleep(0.06)
+    sync.update(dict(STORY, genre="B"))
+    await asyncio.sleep(0.06)
+    during_burst = sync.snapshots
+    await asyncio.sleep(0.1)
+
+    # Assert
+    assert during_burst == 0
+    assert sync.snapshots == 1
+    assert [m["type"] for m in outbound.messages] == ["context_patch", "context_patch", "context_updated"]
@@ -0,0 +1,118 @@
+import asyncio
+import base64
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from api.main import app
+from api.websocket.resume import resume_registry
+from api.websocket.session import LiveSession
+from api.websocket.messaging import (
+    BINARY_FRAME_AUDIO,
+    decode_binary_frame,
+    encode_audio_frame,
+    handle_transcription,
+    handle_turn_complete,
+)
+
+client = TestClient(app)
+
+# One full 40 ms ingress frame of 16 kHz, 16-bit PCM.
+PCM_FRAME = b"\x05\x06" * 640
+
+SETTINGS_MESSAGE = {
+    "type": "settings",
+    "settings": {
+        "app_name": "test_app",
+        "agent_description": "A test agent",
+        "context_dict": {"context": {"role": "user"}},
+        "goal_description": "Test goal",
+        "analyse_instruction": "Test instruction",
+        "voice_name": "Test voice",
+        "language_code": "en-US",
+    },
+}
+
+def _audio_event(data: bytes):
+    part = MagicMock(inline_data=MagicMock(mime_type="audio/pcm", data=data))
+    return MagicMock(
+        turn_complete=None,
+        interrupted=None,
+        content=MagicMock(parts=[part]),
+    )
+
+@pytest.fixture
+def mock_session():
+    live_request_queue = MagicMock()
+    received = []
+
+    async def live_events():
+        yield _audio_event(b"\x01\x02\x03\x04")
+        await asyncio.Event().wait()
+
+    async def fake_start_agent_session(user_id, settings, outbound, is_audio=False):
+        return LiveSession("session", MagicMock(), live_events(), live_request_queue, outbound)
+
+    live_request_queue.send_realtime.side_effect = lambda blob: received.append(blob.data)
+    # Each connection runs on its own event loop here, so sessions cannot be parked.
+    with patch("api.websocket.connection.start_agent_session", side_effect=fake_start_agent_session), \
+            patch.object(resume_registry, "grace", 0):
+        yield live_request_queue, received
+
+def test_audio_frame_round_trip():
+    kind, payload = decode_binary_frame(encode_audio_frame(b"\x00\x01"))
+    assert kind == BINARY_FRAME_AUDIO
+    assert payload == b"\x00\x01"
+
+def test_decode_binary_frame_rejects_unknown_version():
+    with pytest.raises(ValueError):
+        decode_binary_frame(b"\x09\x01\x00\x00")
+
+def test_binary_transport(mock_session):
+    # Arrange
+    _, received = mock_session
+
+    # Act
+    with client.websocket_connect("/ws/1?is_audio=true&binary=true") as ws:
+        ws.send_json(SETTINGS_MESSAGE)
+        session_message = ws.receive_json()
+        agent_frame = ws.receive_bytes()
+        ws.send_bytes(encode_audio_frame(PCM_FRAME))
+
+    # Assert
+    assert session_message["type"] == "session_started"
+    assert session_message["session_id"] == "session"
+    assert session_message["resume_token"]
+    assert decode_binary_frame(agent_frame) == (BINARY_FRAME_AUDIO, b"\x01\x02\x03\x04")
+    assert received == [PCM_FRAME]
+
+def test_json_transport_is_kept(mock_session):
+    # Arrange
+    _, received = mock_session
+
+    # Act
+    with client.websocket_connect("/ws/1?is_audio=true") as ws:
+        ws.send_json(SETTINGS_MESSAGE)
+        ws.receive_json()  # session_started
+        agent_message = ws.receive_json()
+        ws.send_json({"type": "audio", "data": base64.b64encode(PCM_FRAME).decode("ascii")})
+
+    # Assert
+    assert base64.b64decode(agent_message["data"]) == b"\x01\x02\x03\x04"
+    assert received == [PCM_FRAME]
+
+def test_transcriptions_and_turns_are_recorded():
+    # Arrange
+    outbound, transcript = MagicMock(), MagicMock()
+    user = MagicMock(partial=False, content=MagicMock(role="user"))
+    model = MagicMock(partial=True, content=MagicMock(role="model"))
+    turn = MagicMock(turn_complete=True, interrupted=None)
+
+    # Act
+    handle_transcription(outbound, user, MagicMock(text="Hi"), transcript)
+    handle_transcription(outbound, model, MagicMock(text="Hello"), transcript)
+    handle_turn_complete(outbound, turn, transcript)
+
+    # Assert
+    transcript.input.assert_called_once_with("Hi")
+    transcript.output.assert_called_once_with("Hello")
+    transcript.turn.assert_called_once_with(True, False)
@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from api.exceptions import OutboundQueueOverflowError
+from api.websocket.outbound import OutboundQueue
+
+def _websocket():
+    websocket = MagicMock()
+    websocket.send_text = AsyncMock()
+    websocket.send_bytes = AsyncMock()
+    return websocket
+
+async def _drain(outbound):
+    task = asyncio.create_task(outbound.run())
+    await asyncio.sleep(0.01)
+    task.cancel()
+
+@pytest.mark.asyncio
+async def test_priority_and_coalescing():
+    # Arrange
+    websocket = _websocket()
+    outbound = OutboundQueue(websocket, maxsize=10)
+
+    # Act
+    outbound.put({"output_transcription": {"text": "Hel"}}, coalesce_key="output_transcription")
+    outbound.put({"output_transcription": {"text": "lo"}}, coalesce_key="output_transcription")
+    outbound.put(b"audio", priority=True)
+    await _drain(outbound)
+
+    # Assert
+    websocket.send_bytes.assert_awaited_once_with(b"audio")
+    websocket.send_text.assert_awaited_once_with('{"output_transcription":{"text":"Hello"}}')
+    assert outbound.coalesced == 1
+
+@pytest.mark.asyncio
+async def test_turn_boundary_keeps_transcripts_in_their_turn():
+    # Arrange
+    websocket = _websocket()
+    outbound = OutboundQueue(websocket, maxsize=10)
+
+    # Act
+    outbound.put({"output_transcription": {"text": "Hi"}}, coalesce_key="output_transcription")
+    outbound.put('{"turn_complete":true}', priority=True, turn_boundary=True)
+    outbound.put({"output_transcription": {"text": "Next"}}, coalesce_key="output_transcription")
+    await _drain(outbound)
+
+    # Assert
+    sent = [call.args[0] for call in websocket.send_text.await_args_list]
+    assert sent == [
+        '{"output_transcription":{"text":"Hi"}}',
+        '{"turn_complete":true}',
+        '{"output_transcription":{"text":"Next"}}',
+    ]
+    assert outbound.coalesced == 0
+
+@pytest.mark.asyncio
+async def test_drop_oldest_policy():
+    # Arrange
+    websocket = _websocket()
+    outbound = OutboundQueue(websocket, maxsize=2, policy="drop_oldest")
+
+    # Act
+    for i in range(3):
+        outbound.put({"n": i})
+    await _drain(outbound)
+
+    # Assert
+    assert outbound.dropped == 1
+    assert [c.args[0] for c in websocket.send_text.await_args_list] == ['{"n":1}', '{"n":2}']
+
+@pytest.mark.asyncio
+async def test_disconnect_policy():
+    # Arrange
+    outbound = OutboundQueue(_websocket(), maxsize=1, policy="disconnect")
+
+    # Act
+    outbound.put({"n": 0})
+    outbound.put({"n": 1})
+
+    # Assert
+    with pytest.raises(OutboundQueueOverflowError):
+        await outbound.run()
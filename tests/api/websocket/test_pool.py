@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from api.exceptions import AppNotFoundError
+from api.settings import AppSettings
+from api.websocket.pool import AgentPool, settings_key
+
+SETTINGS = {
+    "app_name": "test_app",
+    "agent_description": "A test agent",
+    "context_dict": {"context": {"value": "user"}},
+    "goal_description": "Test goal",
+    "analyse_instruction": "Test instruction",
+    "voice_name": "Test voice",
+    "language_code": "en-US",
+    "search_tool": False,
+}
+
+def test_settings_key_ignores_api_key_and_order():
+    reordered = dict(reversed(list(SETTINGS.items())), gemini_api_key="secret")
+    assert settings_key(reordered) == settings_key(SETTINGS)
+    assert settings_key({**SETTINGS, "voice_name": "Other"}) != settings_key(SETTINGS)
+
+@pytest.mark.asyncio
+async def test_acquire_uses_warm_runner():
+    # Arrange
+    pool = AgentPool()
+    await pool.warm([SETTINGS])
+
+    # Act
+    runner = await pool.acquire(SETTINGS)
+    again = await pool.acquire(dict(SETTINGS, gemini_api_key="key"))
+    cold_runner = await pool.acquire({**SETTINGS, "agent_description": "Custom"})
+
+    # Assert
+    assert runner is again
+    assert cold_runner.agent.instruction.count("Custom") == 1
+    assert cold_runner.session_service is runner.session_service
+    assert (pool.hits, pool.misses) == (2, 1)
+
+@pytest.mark.asyncio
+async def test_acquire_waits_only_for_its_own_pending_runner():
+    # Arrange
+    pool = AgentPool()
+    release = threading.Event()
+    custom = {**SETTINGS, "agent_description": "Custom"}
+
+    def fake_build_runner(settings, pinned=False):
+        if pinned:
+            release.wait(5)
+        return MagicMock(settings=settings)
+
+    # Act
+    with patch("api.websocket.pool.build_runner", side_effect=fake_build_runner):
+        warming = asyncio.create_task(pool.warm([SETTINGS]))
+        await asyncio.sleep(0)
+        cold = await pool.acquire(custom)
+        waiting = asyncio.create_task(pool.acquire(SETTINGS))
+        await asyncio.sleep(0.01)
+        waited = not waiting.done()
+        release.set()
+        warm = await waiting
+        await warming
+
+    # Assert
+    assert cold.settings == custom
+    assert waited
+    assert warm is pool._ready[settings_key(SETTINGS)]
+    assert (pool.hits, pool.misses) == (1, 1)
+
+@pytest.mark.asyncio
+async def test_refill_replaces_the_runners_of_changed_apps():
+    # Arrange
+    pool = AgentPool()
+    edited = {**SETTINGS, "goal_description": "Edited goal"}
+    app_settings = {"app": SETTINGS}
+
+    def get_app_settings(app_id):
+        if app_id not in app_settings:
+            raise AppNotFoundError(app_id)
+        return app_settings[app_id]
+
+    with patch("api.websocket.pool.build_runner", side_effect=lambda settings, pinned=False: MagicMock()), \
+            patch("api.services.app_service.get_app_settings", side_effect=get_app_settings):
+        await pool.refill({"app"})
+        before = set(pool._ready)
+
+        # Act
+        app_settings["app"] = edited
+        await pool.refill({"app"})
+        after_edit = set(pool._ready)
+        del app_settings["app"]
+        await pool.refill({"app"})
+
+    # Assert
+    assert before == {settings_key(AppSettings(**SETTINGS).model_dump())}
+    assert after_edit == {settings_key(AppSettings(**edited).model_dump())}
+    assert pool._ready == {}
@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import MagicMock
+from api.websocket.registry import RunnerRegistry
+
+@pytest.mark.asyncio
+async def test_release_deletes_session_without_ttl():
+    # Arrange
+    registry = RunnerRegistry(idle_ttl=0)
+    session = await registry.create_session("app", "user", "s1")
+
+    # Act
+    await registry.release(session.id)
+
+    # Assert
+    session_service = registry.services("app").session_service
+    assert await session_service.get_session(app_name="app", user_id="user", session_id="s1") is None
+    assert registry.stats()["sessions"] == 0
+
+@pytest.mark.asyncio
+async def test_sweep_removes_idle_detached_sessions():
+    # Arrange
+    registry = RunnerRegistry(idle_ttl=60)
+    await registry.create_session("app", "user", "s1")
+    await registry.create_session("app", "user", "s2")
+    await registry.release("s1")
+
+    # Act
+    kept = await registry.sweep()
+    registry.idle_ttl = 0
+    swept = await registry.sweep()
+
+    # Assert
+    assert (kept, swept) == (0, 1)
+    assert registry.stats() == {"apps": 1, "sessions": 1, "attached_sessions": 1, "detached_sessions": 0}
+
+@pytest.mark.asyncio
+async def test_services_of_unpinned_apps_are_dropped_with_their_last_session():
+    # Arrange
+    registry = RunnerRegistry(idle_ttl=0)
+    registry._pinned.add("bundled")
+    for app_name in ("bundled", "custom-1", "custom-2"):
+        await registry.create_session(app_name, "user", f"{app_name}-s1")
+    await registry.create_session("custom-1", "user", "custom-1-s2")
+
+    # Act
+    for session_id in ("bundled-s1", "custom-1-s1", "custom-2-s1"):
+        await registry.release(session_id)
+
+    # Assert
+    assert registry.stats()["apps"] == 2
+    assert set(registry._apps) == {"bundled", "custom-1"}
+
+@pytest.mark.asyncio
+async def test_reserved_app_keeps_the_services_its_runner_binds():
+    # Arrange
+    registry = RunnerRegistry(idle_ttl=0)
+    await registry.create_session("custom", "user", "s1")
+    registry.reserve("custom")
+    runner = MagicMock(session_service=registry.services("custom").session_service)
+
+    # Act: the last session ends while the runner for the next one is built.
+    await registry.release("s1")
+    await registry.create_session("custom", "user", "s2", runner=runner, reserved=True)
+
+    # Assert
+    assert registry.services("custom").session_service is runner.session_service
+    assert await runner.session_service.get_session(app_name="custom", user_id="user", session_id="s2")
@@ -0,0 +1,206 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.metrics import ConnectionMetrics
+from api.websocket.connection import _handle_communication, _reattach
+from api.websocket.messaging import ClientBinding, agent_to_client_messaging
+from api.websocket.outbound import OutboundQueue
+from api.websocket.resume import ResumeRegistry
+from api.websocket.session import LiveSession
+
+SETTINGS_MESSAGE = {
+    "type": "settings",
+    "settings": {
+        "app_name": "test_app",
+        "agent_description": "A test agent",
+        "context_dict": {"context": {"role": "user"}},
+        "goal_description": "Test goal",
+        "analyse_instruction": "Test instruction",
+        "voice_name": "Test voice",
+        "language_code": "en-US",
+    },
+}
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+async def _send_all(outbound):
+    task = asyncio.create_task(outbound.run())
+    await asyncio.sleep(0)
+    task.cancel()
+
+@pytest.mark.asyncio
+async def test_rewind_requeues_undelivered_messages():
+    # Arrange
+    websocket = FakeWebSocket()
+    outbound = OutboundQueue(websocket, replay_size=3)
+    for i in range(5):
+        outbound.put(str(i))
+    await _send_all(outbound)
+
+    # Act
+    complete = outbound.rewind(3)
+    await _send_all(outbound)
+    lost = outbound.rewind(0)
+
+    # Assert
+    assert complete == 0
+    assert websocket.sent == ["0", "1", "2", "3", "4", "3", "4"]
+    assert (lost, outbound.sent) == (2, 0)
+
+@pytest.mark.asyncio
+async def test_rewind_replays_a_message_whose_send_failed():
+    # Arrange
+    websocket = FakeWebSocket()
+    outbound = OutboundQueue(websocket, replay_size=3)
+    outbound.put("0")
+    outbound.put("1")
+    outbound.websocket = MagicMock(send_text=AsyncMock(side_effect=[None, ConnectionError()]))
+
+    # Act
+    with pytest.raises(ConnectionError):
+        await outbound.run()
+    outbound.websocket = websocket
+    lost = outbound.rewind(1)
+    await _send_all(outbound)
+
+    # Assert
+    assert lost == 0
+    assert websocket.sent == ["1"]
+
+@pytest.mark.asyncio
+async def test_parked_session_expires_after_grace():
+    # Arrange
+    registry = ResumeRegistry(grace=0.01)
+    agent_task = asyncio.create_task(asyncio.Event().wait())
+    entry = registry.add(MagicMock(), agent_task)
+
+    # Act
+    with patch("api.websocket.resume.end_agent_session") as end_agent_session:
+        await registry.detach(entry)
+        parked = len(registry)
+        await asyncio.sleep(0.05)
+
+    # Assert
+    assert parked == 1
+    assert len(registry) == 0
+    assert agent_task.cancelled()
+    end_agent_session.assert_called_once_with(entry.live_session)
+    assert await registry.claim(entry.token) is None
+
+@pytest.mark.asyncio
+async def test_claim_takes_over_an_attached_session():
+    # Arrange
+    registry = ResumeRegistry(grace=60)
+    entry = registry.add(MagicMock(), asyncio.create_task(asyncio.Event().wait()))
+
+    async def previous_connection():
+        await entry.takeover.wait()
+        await registry.detach(entry)
+
+    # Act
+    connection = asyncio.create_task(previous_connection())
+    claimed = await registry.claim(entry.token)
+    await connection
+
+    # Assert
+    assert claimed is entry
+    assert entry.attached and entry.expiry is None
+    assert registry.resumed == 1
+    await registry.close()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("code, resumable", [(1000, False), (1001, False), (1005, False), (1006, True)])
+async def test_only_abnormal_closes_keep_the_session_resumable(code, resumable):
+    # Arrange
+    websocket = FakeWebSocket()
+
+    async def receive():
+        return {"type": "websocket.disconnect", "code": code}
+
+    websocket.receive = receive
+    live_session = LiveSession("session", MagicMock(), MagicMock(), MagicMock(), OutboundQueue(websocket))
+    registry = ResumeRegistry(grace=60)
+    entry = registry.add(live_session, asyncio.create_task(asyncio.Event().wait()))
+
+    # Act
+    result = await _handle_communication(websocket, entry, MagicMock(), ConnectionMetrics())
+
+    # Assert
+    assert result is resumable
+    with patch("api.websocket.resume.end_agent_session"):
+        await registry.close()
+
+@pytest.mark.asyncio
+async def test_reattach_rebinds_metrics_and_audio_encoding():
+    # Arrange
+    events = asyncio.Queue()
+
+    async def live_events():
+        while True:
+            yield await events.get()
+
+    part = MagicMock(inline_data=MagicMock(mime_type="audio/pcm", data=b"\x01\x02"))
+    audio_event = MagicMock(turn_complete=None, interrupted=None, content=MagicMock(parts=[part]))
+    outbound = OutboundQueue(FakeWebSocket())
+    live_session = LiveSession("session", MagicMock(), live_events(), MagicMock(), outbound)
+    first, second = MagicMock(), MagicMock()
+    client = ClientBinding(first, binary=True)
+    agent_task = asyncio.create_task(agent_to_client_messaging(outbound, live_session.live_events, client))
+    registry = ResumeRegistry(grace=60)
+    entry = registry.add(live_session, agent_task, client)
+
+    # Act
+    websocket = FakeWebSocket()
+    _reattach(websocket, entry, 0, second, binary=False)
+    events.put_nowait(audio_event)
+    await asyncio.sleep(0)
+    await _send_all(outbound)
+
+    # Assert
+    first.agent_audio.assert_not_called()
+    second.agent_audio.assert_called_once()
+    assert len(websocket.sent) == 1 and isinstance(websocket.sent[0], str)
+    with patch("api.websocket.resume.end_agent_session"):
+        await registry.close()
+
+def test_reconnect_resumes_session_and_replays_missed_messages():
+    # Arrange
+    starts = []
+
+    async def live_events():
+        part = MagicMock(inline_data=MagicMock(mime_type="audio/pcm", data=b"\x01\x02"))
+        yield MagicMock(turn_complete=None, interrupted=None, content=MagicMock(parts=[part]))
+        await asyncio.Event().wait()
+
+    async def fake_start_agent_session(user_id, settings, outbound, is_audio=False):
+        starts.append(user_id)
+        return LiveSession("session", MagicMock(), live_events(), MagicMock(), outbound)
+
+    with patch("api.websocket.connection.start_agent_session", side_effect=fake_start_agent_session), \
+            patch("api.main.agent_pool.warm_bundled_apps"), \
+            TestClient(app) as client:
+        # Act: the server has not seen the first connection drop when the client reconnects.
+        with client.websocket_connect("/ws/1?is_audio=true&binary=true") as first:
+            first.send_json(SETTINGS_MESSAGE)
+            started = first.receive_json()
+            first.receive_bytes()
+            token = started["resume_token"]
+            with client.websocket_connect(f"/ws/1?is_audio=true&binary=true&resume={token}&received=0") as second:
+                second.send_json(SETTINGS_MESSAGE)
+                resumed = second.receive_json()
+                replayed = second.receive_bytes()
+            closed = first.receive()
+
+    # Assert
+    assert starts == ["1"]
+    assert resumed == {"type": "session_resumed", "session_id": "session", "resume_token": token}
+    assert replayed.endswith(b"\x01\x02")
+    assert closed == {"type": "websocket.close", "code": 4001, "reason": ""}
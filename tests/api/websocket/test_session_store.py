@@ -0,0 +1,131 @@
+from unittest.mock import patch
+
+import pytest
+from google.adk.events import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.sessions.base_session_service import GetSessionConfig
+from pydantic import ValidationError
+
+from api.settings import GlobalSettings
+from api.websocket import session_store
+
+from api.websocket.session_store import (
+    LocalRedis,
+    MemoryStore,
+    RedisStore,
+    SqliteStore,
+    StoreSessionService,
+)
+
+@pytest.mark.asyncio
+async def test_sqlite_sessions_survive_a_new_service(tmp_path):
+    # Arrange
+    path = str(tmp_path / "sessions.db")
+    store = SqliteStore(path, batch_size=64, flush_interval_ms=60_000)
+    service = StoreSessionService(store)
+    session = await service.create_session(app_name="app", user_id="user", session_id="s1")
+    event = Event(author="user", actions=EventActions(state_delta={"topic": "jazz"}))
+    await service.append_event(session, event)
+    store.close()
+
+    # Act
+    reopened = SqliteStore(path)
+    restored = await StoreSessionService(reopened).get_session(
+        app_name="app", user_id="user", session_id="s1"
+    )
+    reopened.close()
+
+    # Assert
+    assert restored.state == {"topic": "jazz"}
+    assert [e.id for e in restored.events] == [event.id]
+
+def test_sqlite_store_batches_writes(tmp_path):
+    # Arrange
+    store = SqliteStore(str(tmp_path / "kv.db"), batch_size=3, flush_interval_ms=60_000)
+
+    # Act
+    for i in range(7):
+        store.set(f"key:{i % 4}", str(i))
+    store.delete("key:0")
+    buffered = store.get("key:3"), store.keys("key:")
+    store.close()
+
+    # Assert
+    assert store.commits == 3
+    assert buffered == ("3", ["key:1", "key:2", "key:3"])
+
+@pytest.mark.asyncio
+async def test_list_and_delete_sessions_with_redis_store():
+    # Arrange
+    service = StoreSessionService(RedisStore(LocalRedis(), namespace="test:"))
+    await service.create_session(app_name="app", user_id="user", session_id="s1", state={"a": 1})
+    await service.create_session(app_name="app", user_id="user", session_id="s2")
+    await service.create_session(app_name="app", user_id="user*", session_id="s3")
+
+    # Act
+    await service.delete_session(app_name="app", user_id="user", session_id="s2")
+    listed = await service.list_sessions(app_name="app", user_id="user")
+
+    # Assert
+    assert [s.id for s in listed.sessions] == ["s1"]
+    assert listed.sessions[0].state == {}
+
+@pytest.mark.asyncio
+async def test_get_session_limits_recent_events():
+    # Arrange
+    service = StoreSessionService(MemoryStore())
+    session = await service.create_session(app_name="app", user_id="user")
+    for _ in range(3):
+        await service.append_event(session, Event(author="user"))
+
+    # Act
+    restored = await service.get_session(
+        app_name="app", user_id="user", session_id=session.id,
+        config=GetSessionConfig(num_recent_events=2),
+    )
+
+    # Assert
+    assert [e.id for e in restored.events] == [e.id for e in session.events[-2:]]
+
+@pytest.mark.asyncio
+async def test_append_event_writes_only_the_new_event():
+    # Arrange
+    class RecordingStore(MemoryStore):
+        def __init__(self):
+            super().__init__()
+            self.written = []
+
+        def set(self, key, value):
+            self.written.append(len(value))
+            super().set(key, value)
+
+    store = RecordingStore()
+    service = StoreSessionService(store)
+    session = await service.create_session(app_name="app", user_id="user", session_id="s1")
+    await service.create_session(app_name="app", user_id="user", session_id="s1:x")
+
+    # Act
+    for _ in range(20):
+        await service.append_event(session, Event(author="user"))
+    first, last = store.written[2:4], store.written[-2:]
+    restored = await service.get_session(app_name="app", user_id="user", session_id="s1")
+
+    # Assert
+    assert sum(last) <= sum(first) + 16
+    assert [e.id for e in restored.events] == [e.id for e in session.events]
+
+def test_redis_store_requires_a_url():
+    # Act / Assert
+    with pytest.raises(ValidationError, match="session_store_url"):
+        GlobalSettings(session_store="redis", session_store_url=None)
+
+def test_local_redis_is_only_used_when_requested():
+    # Arrange
+    configured = GlobalSettings(session_store="redis", session_store_url="local")
+
+    # Act
+    with patch.object(session_store, "settings", configured):
+        client = session_store._redis_client()
+
+    # Assert
+    assert isinstance(client, LocalRedis)
@@ -0,0 +1,19 @@
+import pytest
+from api.services import api_key_service, client_pool
+from api.services.transcript_store import JsonlBackend, transcript_log
+
+@pytest.fixture(autouse=True)
+def clear_client_pool():
+    # Pooled clients would otherwise outlive the genai.Client patch of a test.
+    client_pool.clear()
+    api_key_service.clear()
+    yield
+    client_pool.clear()
+    api_key_service.clear()
+
+@pytest.fixture(autouse=True)
+def transcript_dir(tmp_path, monkeypatch):
+    # Keep transcripts recorded by websocket tests out of the working tree.
+    monkeypatch.setattr(transcript_log, "backend", JsonlBackend(str(tmp_path / "transcripts")))
+    yield
+    transcript_log.flush()